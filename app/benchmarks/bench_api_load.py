@@ -0,0 +1,41 @@
+"""
+API load test on a large seeded dataset (see benchmarks.dataset): a weighted mix of UI requests (see
+benchmarks.load.REQUEST_MIX) through the WSGI application and through the API Lambda entry point, with the
+latency percentiles and throughput per endpoint.
+
+Tune with BENCH_LOAD_REQUESTS, BENCH_LOAD_TARGETS (comma separated, "wsgi,lambda") and the dataset size with
+BENCH_RUNS, BENCH_LIBRARIES, BENCH_LIBRARIES_PER_RUN. Compare two runs with benchmarks.compare.
+
+python manage.py test benchmarks.bench_api_load --pattern "bench_*.py"
+"""
+
+import os
+
+from benchmarks.dataset import seed_dataset
+from benchmarks.load import REQUEST_MIX, TARGETS, load_ids, run_load
+from benchmarks.utils import BenchmarkCase, env_int
+
+REQUESTS = env_int("BENCH_LOAD_REQUESTS", 500)
+TARGET_NAMES = os.environ.get("BENCH_LOAD_TARGETS", "wsgi,lambda").split(",")
+RUNS = env_int("BENCH_RUNS", 2000)
+LIBRARIES = env_int("BENCH_LIBRARIES", 500)
+LIBRARIES_PER_RUN = env_int("BENCH_LIBRARIES_PER_RUN", 100)
+
+
+class ApiLoadBenchmark(BenchmarkCase):
+    suite = "api_load"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset(
+            runs=RUNS, libraries=LIBRARIES, libraries_per_run=LIBRARIES_PER_RUN
+        )
+        cls.ids = load_ids()
+
+    def test_request_mix(self):
+        for name in TARGET_NAMES:
+            with self.subTest(target=name):
+                result = run_load(TARGETS[name](), REQUEST_MIX, self.ids, REQUESTS)
+                for endpoint, metrics in result.items():
+                    self.record(f"{name}.{endpoint}", **metrics)
+                self.assertEqual(result["total"]["errors"], 0)
@@ -0,0 +1,69 @@
+"""
+Cold start of the WRU handler Lambda, with and without the reference data warm up (REFERENCE_WARM_UP):
+init time (module import incl. `django.setup()` and warm up) and the latency of the first and second event.
+Each sample is a fresh Python process.
+
+python manage.py test benchmarks.bench_cold_start --pattern "bench_*.py"
+"""
+
+from benchmarks.utils import (
+    TransactionBenchmarkCase,
+    env_int,
+    last_json_line,
+    run_python,
+    summarise,
+)
+from workflow_manager.models import RunContext
+from workflow_manager.tests.factories import WorkflowFactory
+
+COLD_STARTS = env_int("BENCH_COLD_STARTS", 5)
+
+CHILD = """
+    import json, os, time
+    from unittest import mock
+
+    t0 = time.perf_counter()
+    from django.conf import settings
+    settings.DATABASES = {"default": json.loads(os.environ["BENCH_DATABASE"])}
+
+    from workflow_manager_proc.lambdas import handle_wru_event
+    t_init = time.perf_counter() - t0
+
+    from benchmarks.events import load_fixture
+    from workflow_manager_proc.services import workflow_run
+
+    latencies = []
+    with mock.patch.object(workflow_run, "emit_model_event"):
+        for i in range(2):
+            event = load_fixture("WRU_max.json")
+            event["detail"]["portalRunId"] = f"{os.getpid():08d}{i:08d}"
+            t = time.perf_counter()
+            handle_wru_event.handler(event, None)
+            latencies.append(time.perf_counter() - t)
+
+    print(json.dumps({"init": t_init, "first_event": latencies[0], "second_event": latencies[1]}))
+"""
+
+
+class ColdStartBenchmark(TransactionBenchmarkCase):
+    suite = "cold_start"
+
+    def setUp(self):
+        WorkflowFactory()
+        RunContext.objects.create(name="clinical", usecase="COMPUTE")
+        RunContext.objects.create(name="clinical", usecase="STORAGE")
+
+    def test_wru_handler_cold_start(self):
+        for warm_up in ["false", "true"]:
+            samples = [
+                last_json_line(
+                    run_python(CHILD, env={"REFERENCE_WARM_UP": warm_up}).stdout
+                )
+                for _ in range(COLD_STARTS)
+            ]
+            for metric in ["init", "first_event", "second_event"]:
+                self.record(
+                    f"handle_wru_event.{metric}",
+                    warm_up=warm_up,
+                    **summarise([s[metric] for s in samples]),
+                )
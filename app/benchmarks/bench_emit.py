@@ -0,0 +1,89 @@
+"""
+Emitting WRSC events with payloads from 1KB to 10MB, up to the EventBridge `put_events` call (see
+benchmarks.event_bus):
+    - "validated": the event serialised and the JSON validated again (`event_utils.emit_event`)
+    - "model": the event model serialised once (`event_utils.emit_model_event`)
+    - "api_dict" / "api_model": the API emission (`emit_wrsc_api_event`) of the event as dict (dump, validate and
+      dump again) and as model instance
+
+The largest payload size is BENCH_EMIT_MAX (bytes, default 10MB).
+
+python manage.py test benchmarks.bench_emit --pattern "bench_*.py"
+"""
+
+import logging
+import os
+from unittest import mock
+
+from benchmarks.bench_micro import wrsc_event
+from benchmarks.event_bus import local_event_bus
+from benchmarks.events import synthetic_payload
+from benchmarks.utils import BenchmarkCase, env_int, time_call
+from workflow_manager.aws_event_bridge.event import emit_wrsc_api_event
+from workflow_manager_proc.services.event_utils import (
+    EventType,
+    emit_event,
+    emit_model_event,
+)
+
+MAX_SIZE = env_int("BENCH_EMIT_MAX", 10_000_000)
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+class EmitBenchmark(BenchmarkCase):
+    suite = "emit"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # the emitters log the event: keep the formatting cost, but not the output
+        logging.disable(logging.INFO)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+        super().tearDownClass()
+
+    def test_emit(self):
+        for size in [s for s in SIZES if s <= MAX_SIZE]:
+            event = wrsc_event(10)
+            event.payload.data = synthetic_payload(size)
+            event_bytes = len(event.model_dump_json())
+
+            emitters = {
+                "validated": lambda: emit_event(
+                    EventType.WRSC, "bench", event.model_dump_json()
+                ),
+                "model": lambda: emit_model_event("bench", event),
+                "api_dict": lambda: emit_wrsc_api_event(
+                    event.model_dump(mode="json", exclude_none=True)
+                ),
+                "api_model": lambda: emit_wrsc_api_event(event),
+            }
+            timings = {}
+            with (
+                local_event_bus() as bus,
+                mock.patch.dict(os.environ, {"EVENT_BUS_NAME": "bench"}),
+            ):
+                for name, emit in emitters.items():
+                    timings[name] = time_call(emit, repeat=3)
+                    bus.clear()
+                    self.record(
+                        f"{name}[{size}]",
+                        bytes=event_bytes,
+                        mb_per_sec=round(event_bytes / timings[name]["us_per_call"], 1),
+                        **timings[name],
+                    )
+
+            for baseline, trusted in [
+                ("validated", "model"),
+                ("api_dict", "api_model"),
+            ]:
+                self.record(
+                    f"speedup[{trusted},{size}]",
+                    factor=round(
+                        timings[baseline]["us_per_call"]
+                        / timings[trusted]["us_per_call"],
+                        2,
+                    ),
+                )
@@ -0,0 +1,211 @@
+"""
+Query count and latency regression suite on a large seeded dataset (see benchmarks.dataset): every list, detail,
+stats, grouped workflow, state and comment endpoint, and the event processing entry points
+(`create_workflow_run`, `create_analysis_run`).
+
+Each case must stay within its SQL statement budget, which does not depend on the size of the data (so an N+1
+regression fails), and within a (generous) wall time ceiling. Scale the dataset with BENCH_RUNS,
+BENCH_LIBRARIES, BENCH_LIBRARIES_PER_RUN and the ceilings with BENCH_TIME_FACTOR.
+
+python manage.py test benchmarks.bench_endpoints --pattern "bench_*.py"
+"""
+
+import os
+import time
+from unittest import mock
+
+from benchmarks.dataset import seed_dataset
+from benchmarks.events import load_fixture
+from benchmarks.utils import BenchmarkCase, env_int
+from workflow_manager.db.budget import sql_budget
+from workflow_manager.models import (
+    AnalysisRun,
+    Comment,
+    Payload,
+    Workflow,
+    WorkflowRun,
+)
+from workflow_manager.tests.factories import WorkflowFactory
+from workflow_manager.urls.base import api_base
+from workflow_manager_proc.domain.event import aru, wru
+from workflow_manager_proc.services import (
+    analysis_run,
+    reference_cache,
+    workflow_run,
+)
+
+RUNS = env_int("BENCH_RUNS", 2000)
+LIBRARIES = env_int("BENCH_LIBRARIES", 500)
+LIBRARIES_PER_RUN = env_int("BENCH_LIBRARIES_PER_RUN", 100)
+TIME_FACTOR = float(os.environ.get("BENCH_TIME_FACTOR", 1.0))
+
+# (max SQL statements, wall time ceiling in ms)
+LIST = (2, 1000)  # count + page
+DETAIL = (1, 500)
+STATS = (2, 3000)
+# known N+1: 3 statements per run of the page (10), for its contexts, readsets and current state
+WORKFLOW_RUN_LIST = (34, 2000)
+
+API = "/" + api_base
+
+
+class EndpointBenchmark(BenchmarkCase):
+    suite = "endpoints"
+    fixtures = ["./workflow_manager_proc/tests/fixtures/aru_test_fixtures.json"]
+
+    @classmethod
+    def setUpTestData(cls):
+        start = time.perf_counter()
+        cls.dataset = seed_dataset(
+            runs=RUNS, libraries=LIBRARIES, libraries_per_run=LIBRARIES_PER_RUN
+        )
+        cls.seed_seconds = time.perf_counter() - start
+
+        cls.wfr = WorkflowRun.objects.order_by("portal_run_id").first()
+        cls.anr = AnalysisRun.objects.filter(
+            analysis_run_name__startswith="Analysis"
+        ).first()
+        cls.wfl = Workflow.objects.first()
+        cls.pld = Payload.objects.first()
+        cls.cmt = Comment.objects.filter(
+            workflow_run=cls.wfr
+        ).first() or Comment.objects.create(
+            workflow_run=cls.wfr, text="Comment", created_by="bench@umccr.org"
+        )
+
+    def setUp(self):
+        reference_cache.clear()
+
+    def check(self, name: str, budget: tuple, func):
+        max_queries, max_ms = budget
+        max_ms *= TIME_FACTOR
+        with sql_budget(name, max_queries=max_queries, strict=True, report=False) as b:
+            result = func()
+        self.record(
+            name,
+            queries=b.queries,
+            max_queries=max_queries,
+            ms=round(b.total_s * 1000, 2),
+            db_ms=round(b.db_s * 1000, 2),
+            max_ms=max_ms,
+        )
+        b.report()  # raises if over the SQL budget
+        self.assertLessEqual(b.total_s * 1000, max_ms, f"{name} took too long")
+        return result
+
+    def get(self, name: str, budget: tuple, path: str):
+        response = self.check(name, budget, lambda: self.client.get(API + path))
+        self.assertEqual(response.status_code, 200, f"{name}: {response.content[:500]}")
+        return response
+
+    def test_seeded(self):
+        self.record("seed", seconds=round(self.seed_seconds, 2), **self.dataset)
+
+    def test_workflow_endpoints(self):
+        self.get("workflow.list", LIST, "workflow/")
+        self.get("workflow.detail", DETAIL, f"workflow/{self.wfl.orcabus_id}/")
+        self.get("workflow.grouped", (3, 1000), "workflow/grouped/")
+
+    def test_workflow_run_endpoints(self):
+        self.get("workflowrun.list", WORKFLOW_RUN_LIST, "workflowrun/")
+        self.get(
+            "workflowrun.list.filtered",
+            WORKFLOW_RUN_LIST,
+            "workflowrun/?status=SUCCEEDED&search=run_1",
+        )
+        self.get("workflowrun.ongoing", WORKFLOW_RUN_LIST, "workflowrun/ongoing/")
+        self.get("workflowrun.unresolved", WORKFLOW_RUN_LIST, "workflowrun/unresolved/")
+        self.get("workflowrun.detail", (11, 500), f"workflowrun/{self.wfr.orcabus_id}/")
+        self.get(
+            "workflowrun.validate_rerun_workflows",
+            (3, 500),
+            f"workflowrun/{self.wfr.orcabus_id}/validate_rerun_workflows/",
+        )
+
+    def test_analysis_run_endpoints(self):
+        # known N+1: statements per analysis run of the page, for its contexts, readsets and current state
+        self.get("analysisrun.list", (16, 1000), "analysisrun/")
+        self.get("analysisrun.detail", (9, 500), f"analysisrun/{self.anr.orcabus_id}/")
+        self.get("analysis.list", (4, 1000), "analysis/")
+        self.get("analysiscontext.list", LIST, "analysiscontext/")
+        self.get("runcontext.list", LIST, "runcontext/")
+
+    def test_payload_endpoints(self):
+        # (the library endpoints are left out: LibraryViewSet only works nested under a workflow run, and that
+        # route is not registered)
+        self.get("payload.list", LIST, "payload/")
+        self.get("payload.detail", DETAIL, f"payload/{self.pld.orcabus_id}/")
+
+    def test_stats_endpoints(self):
+        for stats in [
+            "workflow_run",
+            "analysis_run",
+            "workflow",
+            "analysis",
+            "grouped_workflow",
+        ]:
+            self.get(f"stats.{stats}", STATS, f"stats/{stats}/status_counts/")
+
+    def test_state_endpoints(self):
+        run = f"workflowrun/{self.wfr.orcabus_id}"
+        self.get("state.list", DETAIL, f"{run}/state/")
+        self.get(
+            "state.validation_map",
+            (0, 100),
+            f"{run}/state/get_states_transition_validation_map/",
+        )
+
+    def test_comment_endpoints(self):
+        run = f"workflowrun/{self.wfr.orcabus_id}"
+        self.get("comment.list", DETAIL, f"{run}/comment/")
+        self.get(
+            "analysisrun.comment.list",
+            DETAIL,
+            f"analysisrun/{self.anr.orcabus_id}/comment/",
+        )
+        response = self.check(
+            "comment.create",
+            (4, 500),
+            lambda: self.client.post(
+                API + f"{run}/comment/",
+                data={"text": "New comment", "created_by": "bench@umccr.org"},
+                content_type="application/json",
+            ),
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.check(
+            "comment.update",
+            (3, 500),
+            lambda: self.client.patch(
+                API + f"{run}/comment/{self.cmt.orcabus_id}/",
+                data={"text": "Updated", "created_by": self.cmt.created_by},
+                content_type="application/json",
+            ),
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @mock.patch.dict(os.environ, {"EVENT_BUS_NAME": "BenchBus"})
+    def test_create_workflow_run(self):
+        WorkflowFactory()  # the workflow of the WRU_max fixture
+        with mock.patch.object(workflow_run, "emit_model_event"):
+            for i, status in enumerate(["DRAFT", "READY", "RUNNING", "SUCCEEDED"]):
+                event = load_fixture("WRU_max.json")
+                event["detail"]["status"] = status
+                event["detail"]["timestamp"] = f"2025-01-01T00:00:0{i}Z"
+                wru_event = wru.AWSEvent.model_validate(event).detail
+                self.check(
+                    f"create_workflow_run.{status}",
+                    # the first event also creates the run and links libraries, readsets and contexts
+                    (54 if i == 0 else 33, 1000),
+                    lambda: workflow_run.create_workflow_run(wru_event),
+                )
+
+    @mock.patch.dict(os.environ, {"EVENT_BUS_NAME": "BenchBus"})
+    def test_create_analysis_run(self):
+        event = aru.AWSEvent.model_validate(load_fixture("ARU_draft_max.json")).detail
+        with mock.patch.object(analysis_run, "emit_model_event"):
+            self.check(
+                "create_analysis_run",
+                (62, 1000),
+                lambda: analysis_run.create_analysis_run(event),
+            )
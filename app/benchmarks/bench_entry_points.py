@@ -0,0 +1,89 @@
+"""
+Cold start and import time of the Lambda entry points (`api`, `handle_wru_event`, `handle_aru_event`).
+Each sample is a fresh Python process (see `benchmarks.entry_points`), timing the cold start phases:
+`django.setup()`, module import, first DB query and first serialized response. An extra `-X importtime` run per
+entry point records the heaviest top level imports.
+
+The API runs with the settings of the calling process, the event processors with their lean profile
+(settings.proc), as deployed.
+
+python manage.py test benchmarks.bench_entry_points --pattern "bench_*.py"
+"""
+
+from benchmarks.entry_points import ENTRY_POINTS
+from benchmarks.utils import (
+    TransactionBenchmarkCase,
+    env_int,
+    last_json_line,
+    run_python,
+    summarise,
+)
+from workflow_manager.models import Readset
+from workflow_manager.tests.factories import WorkflowFactory
+
+COLD_STARTS = env_int("BENCH_COLD_STARTS", 5)
+TOP_IMPORTS = env_int("BENCH_TOP_IMPORTS", 15)
+
+PHASES = ["django_setup", "module_import", "first_query", "first_response", "total"]
+
+SETTINGS = {
+    "handle_wru_event": "workflow_manager.settings.proc",
+    "handle_aru_event": "workflow_manager.settings.proc",
+}
+
+
+def import_time_by_package(stderr: str) -> dict:
+    """
+    Sum the self time of the `python -X importtime` report by top level package, in milliseconds.
+    Report lines look like: `import time:       212 |       1234 |   package.module`
+    """
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1000
+    return packages
+
+
+def _probe(entry: str, python_args=None):
+    env = {"DJANGO_SETTINGS_MODULE": SETTINGS[entry]} if entry in SETTINGS else {}
+    return run_python(
+        f"from benchmarks.entry_points import probe; probe({entry!r})",
+        env=env,
+        python_args=python_args,
+    )
+
+
+class EntryPointColdStartBenchmark(TransactionBenchmarkCase):
+    suite = "entry_points"
+    fixtures = ["./workflow_manager_proc/tests/fixtures/aru_test_fixtures.json"]
+
+    def setUp(self):
+        # the workflow of WRU_max.json (its run contexts are part of the fixtures)
+        WorkflowFactory()
+
+    def test_cold_start(self):
+        for entry in ENTRY_POINTS:
+            samples = [last_json_line(_probe(entry).stdout) for _ in range(COLD_STARTS)]
+            for phase in PHASES:
+                self.record(
+                    f"{entry}.{phase}", **summarise([s[phase] for s in samples])
+                )
+            self.record(f"{entry}.response", bytes=samples[0]["response_bytes"])
+            # the WRU and ARU fixtures share readset IDs, but link them to different libraries
+            Readset.objects.all().delete()
+
+    def test_import_time(self):
+        for entry in ENTRY_POINTS:
+            Readset.objects.all().delete()
+            packages = import_time_by_package(
+                _probe(entry, python_args=["-X", "importtime"]).stderr
+            )
+            top = sorted(packages.items(), key=lambda x: x[1], reverse=True)
+            self.record(
+                f"{entry}.import_time",
+                total_ms=round(sum(packages.values()), 3),
+                top_packages_ms={p: round(ms, 3) for p, ms in top[:TOP_IMPORTS]},
+            )
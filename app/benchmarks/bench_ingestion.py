@@ -0,0 +1,100 @@
+"""
+End-to-end ingestion throughput of the WRU event processor: replays synthetic workflow run lifecycles
+(DRAFT -> READY -> RUNNING -> terminal, with payloads and libraries, see benchmarks.events.wru_lifecycle)
+through `handle_wru_event.handler`, with the emitted WRSC events going to an in-process EventBridge stand-in
+(benchmarks.event_bus).
+
+Reports events/s, the latency distribution and the SQL statements per event, overall and per status. The events
+of all runs are replayed interleaved, in timestamp order, as they would arrive from the bus. Tune with
+BENCH_INGEST_RUNS, BENCH_INGEST_LIBRARIES (per run) and BENCH_INGEST_PAYLOAD_BYTES.
+
+python manage.py test benchmarks.bench_ingestion --pattern "bench_*.py"
+"""
+
+import random
+import time
+from collections import defaultdict
+
+from benchmarks.event_bus import local_event_bus
+from benchmarks.events import wru_lifecycle
+from benchmarks.utils import BenchmarkCase, env_int, summarise
+from workflow_manager.db.budget import sql_budget
+from workflow_manager.models import State, WorkflowRun
+from workflow_manager.tests.factories import WorkflowFactory
+from workflow_manager_proc.lambdas import handle_wru_event
+from workflow_manager_proc.services import reference_cache
+
+RUNS = env_int("BENCH_INGEST_RUNS", 100)
+LIBRARIES = env_int("BENCH_INGEST_LIBRARIES", 2)
+PAYLOAD_BYTES = env_int("BENCH_INGEST_PAYLOAD_BYTES", 2000)
+
+
+class IngestionBenchmark(BenchmarkCase):
+    suite = "ingestion"
+
+    def setUp(self):
+        wfl = WorkflowFactory()
+        workflow = {
+            "orcabusId": wfl.orcabus_id,
+            "name": wfl.name,
+            "version": wfl.version,
+            "codeVersion": wfl.code_version,
+            "executionEngine": wfl.execution_engine,
+            "executionEnginePipelineId": wfl.execution_engine_pipeline_id,
+            "validationState": wfl.validation_state,
+        }
+        rnd = random.Random(42)
+        self.events = sorted(
+            (
+                event
+                for i in range(RUNS)
+                for event in wru_lifecycle(
+                    i, rnd, workflow, libraries=LIBRARIES, payload_bytes=PAYLOAD_BYTES
+                )
+            ),
+            key=lambda e: e["detail"]["timestamp"],
+        )
+        reference_cache.clear()
+
+    def tearDown(self):
+        reference_cache.clear()
+
+    def test_wru_throughput(self):
+        samples, queries = [], []
+        by_status = defaultdict(lambda: ([], []))
+        with local_event_bus() as bus:
+            start = time.perf_counter()
+            for event in self.events:
+                # run the on-commit hooks, as a committed Lambda transaction would
+                with (
+                    self.captureOnCommitCallbacks(execute=True),
+                    sql_budget("ingest", report=False) as b,
+                ):
+                    handle_wru_event.handler(event, None)
+                status = event["detail"]["status"]
+                for values, value in zip(by_status[status], [b.total_s, b.queries]):
+                    values.append(value)
+                samples.append(b.total_s)
+                queries.append(b.queries)
+            elapsed = time.perf_counter() - start
+
+        emitted = bus.events_of("WorkflowRunStateChange")
+        self.assertEqual(WorkflowRun.objects.count(), RUNS)
+        self.assertEqual(len(emitted), State.objects.count())
+
+        self.record(
+            "handle_wru_event",
+            runs=RUNS,
+            events=len(self.events),
+            emitted=len(emitted),
+            events_per_sec=round(len(self.events) / elapsed, 1),
+            queries_per_event=round(sum(queries) / len(queries), 2),
+            max_queries=max(queries),
+            **summarise(samples),
+        )
+        for status, (status_samples, status_queries) in by_status.items():
+            self.record(
+                f"handle_wru_event.{status}",
+                queries_per_event=round(sum(status_queries) / len(status_queries), 2),
+                **summarise(status_samples),
+            )
@@ -0,0 +1,228 @@
+"""
+Microbenchmarks of the pure Python helpers that run on every event or every row, each with a range of input
+sizes: the WRSC / ARSC / State hashes, payload hashing (RFC 8785 canonicalisation + SHA-256), status conventions,
+version sort keys, ID list normalisation, camel casing and the OrcaBus ID field conversion.
+
+Results (best time per call, see benchmarks.utils.time_call) are compared against the committed baseline
+(benchmarks/baselines/micro.json) and the differences logged. BENCH_MICRO_STRICT=1 fails on regressions over
+BENCH_MICRO_THRESHOLD percent (default 25), BENCH_MICRO_UPDATE_BASELINE=1 writes the results as the new
+baseline. The largest payload size is BENCH_MICRO_MAX_PAYLOAD (bytes, default 1MB).
+
+python manage.py test benchmarks.bench_micro --pattern "bench_*.py"
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+from benchmarks.compare import compare, format_rows, load_results
+from benchmarks.events import synthetic_payload
+from benchmarks.utils import BenchmarkCase, env_int, time_call, write_results
+from workflow_manager.models import Payload, State, WorkflowRun
+from workflow_manager.models.common import Status
+from workflow_manager.models.utils import StateUtil
+from workflow_manager.serializers.base import OrcabusIdListUtils, to_camel_case
+from workflow_manager.viewsets.utils import version_sort_key
+from workflow_manager_proc.domain.event import arsc, wrsc
+from workflow_manager_proc.services.analysis_run import get_arsc_hash
+from workflow_manager_proc.services.event_utils import hash_payload_data
+from workflow_manager_proc.services.workflow_run import get_wrsc_hash
+
+logger = logging.getLogger(__name__)
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+MAX_PAYLOAD = env_int("BENCH_MICRO_MAX_PAYLOAD", 1_000_000)
+THRESHOLD = env_int("BENCH_MICRO_THRESHOLD", 25)
+STRICT = os.environ.get("BENCH_MICRO_STRICT", "false").lower() in ("1", "true")
+UPDATE_BASELINE = os.environ.get("BENCH_MICRO_UPDATE_BASELINE", "false").lower() in (
+    "1",
+    "true",
+)
+ULID = "01J5M2JFE1JPYV62RYQEG99CPW"
+
+
+def libraries(count: int) -> list:
+    return [
+        {
+            "orcabusId": f"lib.{ULID[:-6]}{i:06d}",
+            "libraryId": f"L{i:07d}",
+            "readsets": [
+                {"orcabusId": f"fqr.{ULID[:-7]}{i:06d}{r}", "rgid": f"RG.{i}.{r}"}
+                for r in range(2)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def wrsc_event(library_count: int) -> wrsc.WorkflowRunStateChange:
+    return wrsc.WorkflowRunStateChange.model_validate(
+        {
+            "id": "",
+            "version": "1.0.0",
+            "timestamp": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "orcabusId": f"wfr.{ULID}",
+            "portalRunId": "20250101abcdef01",
+            "executionId": "exec-1",
+            "workflowRunName": "umccr--automated--wgs--20250101abcdef01",
+            "workflow": {
+                "orcabusId": f"wfl.{ULID}",
+                "name": "wgs_alignment_qc",
+                "version": "4.2.0",
+                "codeVersion": "0.0.0",
+                "executionEngine": "ICA",
+                "executionEnginePipelineId": "pipeline",
+                "validationState": "VALIDATED",
+            },
+            "libraries": libraries(library_count),
+            "payload": {
+                "orcabusId": f"pld.{ULID}",
+                "refId": "0" * 64,
+                "version": "2024.07.01",
+                "data": {},
+            },
+            "computeEnv": "clinical",
+            "storageEnv": "clinical",
+            "status": "SUCCEEDED",
+        }
+    )
+
+
+def arsc_event(library_count: int) -> arsc.AnalysisRunStateChange:
+    return arsc.AnalysisRunStateChange.model_validate(
+        {
+            "id": "",
+            "version": "1.0.0",
+            "timestamp": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "orcabusId": f"anr.{ULID}",
+            "analysisRunName": "wgts-dna",
+            "analysis": {"orcabusId": f"ana.{ULID}", "name": "WGTS", "version": "1.0"},
+            "libraries": libraries(library_count),
+            "computeEnv": "clinical",
+            "storageEnv": "clinical",
+            "status": "READY",
+        }
+    )
+
+
+class MicroBenchmark(BenchmarkCase):
+    suite = "micro"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # the hash helpers log their inputs: keep the formatting cost, but not the output
+        logging.disable(logging.INFO)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+        if cls.results:
+            cls.check_baseline(cls.results)
+        super().tearDownClass()
+
+    @classmethod
+    def check_baseline(cls, results: list):
+        if UPDATE_BASELINE:
+            write_results(cls.suite, results, path=BASELINE)
+            logger.warning(f"Microbenchmark baseline written to {BASELINE}")
+            return
+        if not os.path.exists(BASELINE):
+            return
+
+        rows = compare(
+            load_results(BASELINE),
+            {r["name"]: r for r in results},
+            THRESHOLD / 100,
+        )
+        logger.warning(f"Microbenchmarks vs. baseline:\n{format_rows(rows)}")
+        regressed = [r["name"] for r in rows if r["regressed"]]
+        if STRICT and regressed:
+            raise AssertionError(
+                f"Microbenchmark regressions over {THRESHOLD}%: {regressed}"
+            )
+
+    def bench(self, name: str, func, **params):
+        self.record(name, **params, **time_call(func))
+
+    def test_event_hashes(self):
+        for count in [1, 10, 100]:
+            out_wrsc = wrsc_event(count)
+            self.bench(
+                f"get_wrsc_hash[{count}]",
+                lambda: get_wrsc_hash(out_wrsc),
+                libraries=count,
+            )
+            out_arsc = arsc_event(count)
+            self.bench(
+                f"get_arsc_hash[{count}]",
+                lambda: get_arsc_hash(out_arsc),
+                libraries=count,
+            )
+
+    def test_state_hash(self):
+        state = State(status="RUNNING", comment="Restarted by the operator")
+        self.bench(
+            "create_state_hash[no_payload]", lambda: StateUtil.create_state_hash(state)
+        )
+        state.payload = Payload(payload_ref_id="0" * 64, version="1.0.0", data={})
+        self.bench(
+            "create_state_hash[payload]", lambda: StateUtil.create_state_hash(state)
+        )
+
+    def test_hash_payload_data(self):
+        for size in [1_000, 10_000, 100_000, 1_000_000, 10_000_000]:
+            if size > MAX_PAYLOAD:
+                break
+            data = synthetic_payload(size)
+            self.bench(
+                f"hash_payload_data[{size}]",
+                lambda: hash_payload_data(data),
+                bytes=len(json.dumps(data)),
+            )
+
+    def test_status_convention(self):
+        for status in ["SUCCEEDED", "in-progress", "Cancelled", "UNKNOWN_STATUS"]:
+            self.bench(
+                f"get_convention[{status}]", lambda: Status.get_convention(status)
+            )
+
+    def test_version_sort_key(self):
+        for version in ["1.2.3", "10.200.3000", "v1.2-beta", ""]:
+            self.bench(
+                f"version_sort_key[{version or 'empty'}]",
+                lambda: version_sort_key(version),
+            )
+
+    def test_normalize_ids(self):
+        for count in [1, 10, 100, 1000]:
+            ids = [f"wfr.{ULID[:-6]}{i:06d}" for i in range(count)]
+            joined = ",".join(ids)
+            self.bench(
+                f"normalize[str,{count}]",
+                lambda: OrcabusIdListUtils.normalize(joined),
+                ids=count,
+            )
+            self.bench(
+                f"normalize[list,{count}]",
+                lambda: OrcabusIdListUtils.normalize(ids),
+                ids=count,
+            )
+
+    def test_to_camel_case(self):
+        for parts in [1, 3, 10]:
+            key = "_".join(["field"] * parts)
+            self.bench(
+                f"to_camel_case[{parts}]", lambda: to_camel_case(key), parts=parts
+            )
+
+    def test_orcabus_id_from_db_value(self):
+        field = WorkflowRun._meta.pk
+        for count in [1, 100, 10000]:
+            values = [ULID] * count
+            self.bench(
+                f"from_db_value[{count}]",
+                lambda: [field.from_db_value(v, None, None) for v in values],
+                values=count,
+            )
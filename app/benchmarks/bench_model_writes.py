@@ -0,0 +1,102 @@
+"""
+Write throughput of the model save paths, comparing:
+    - legacy: `full_clean` + INSERT + `refresh_from_db` (the former `OrcaBusBaseModel.save`)
+    - save: `OrcaBusBaseModel.save` (ID prefix applied in Python, no reload)
+    - bulk: `OrcaBusBaseManager.bulk_create_validated`
+
+python manage.py test benchmarks.bench_model_writes --pattern "bench_*.py"
+"""
+
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+from benchmarks.utils import BenchmarkCase, env_int, measure
+from workflow_manager.models import (
+    Comment,
+    Library,
+    LibraryAssociation,
+    State,
+)
+from workflow_manager.tests.factories import WorkflowRunFactory
+
+WRITE_COUNT = env_int("BENCH_WRITE_COUNT", 200)
+
+
+def legacy_save(obj):
+    obj.full_clean()
+    models.Model.save(obj)
+    obj.refresh_from_db()
+
+
+class ModelWriteBenchmark(BenchmarkCase):
+    suite = "model_writes"
+
+    def setUp(self):
+        self.wfr = WorkflowRunFactory()
+        self.libraries = Library.objects.bulk_create_validated(
+            [Library(library_id=f"L{i:07d}") for i in range(WRITE_COUNT * 3)]
+        )
+        self.ts = timezone.now()
+
+    def _run(self, model_name: str, make_objs):
+        for mode in ["legacy", "save", "bulk"]:
+            objs = make_objs(mode)
+            if mode == "legacy":
+                m = measure(lambda: [legacy_save(o) for o in objs])
+            elif mode == "save":
+                m = measure(lambda: [o.save() for o in objs])
+            else:
+                m = measure(
+                    lambda: objs[0].__class__.objects.bulk_create_validated(objs)
+                )
+            self.record(
+                f"{model_name}.{mode}",
+                rows=len(objs),
+                seconds=round(m["seconds"], 4),
+                rows_per_sec=round(len(objs) / m["seconds"], 1),
+                queries_per_row=round(m["queries"] / len(objs), 2),
+            )
+
+    def test_state(self):
+        offsets = {"legacy": 0, "save": 1, "bulk": 2}
+
+        def make_objs(mode):
+            base = offsets[mode] * WRITE_COUNT
+            return [
+                State(
+                    workflow_run=self.wfr,
+                    status="RUNNING",
+                    timestamp=self.ts + timedelta(seconds=base + i),
+                )
+                for i in range(WRITE_COUNT)
+            ]
+
+        self._run("State", make_objs)
+
+    def test_comment(self):
+        def make_objs(mode):
+            return [
+                Comment(workflow_run=self.wfr, text=f"{mode} {i}", created_by="bench")
+                for i in range(WRITE_COUNT)
+            ]
+
+        self._run("Comment", make_objs)
+
+    def test_library_association(self):
+        offsets = {"legacy": 0, "save": 1, "bulk": 2}
+
+        def make_objs(mode):
+            libs = self.libraries[offsets[mode] * WRITE_COUNT :][:WRITE_COUNT]
+            return [
+                LibraryAssociation(
+                    workflow_run=self.wfr,
+                    library=lib,
+                    association_date=self.ts,
+                    status="ACTIVE",
+                )
+                for lib in libs
+            ]
+
+        self._run("LibraryAssociation", make_objs)
@@ -0,0 +1,52 @@
+"""
+Payload hashing (canonical JSON + SHA-256) of payloads from 1KB to 10MB: the `rfc8785` canonicaliser vs.
+`event_utils.canonical_json` (json encoder for the common JSON subset, `rfc8785` fallback).
+
+The largest payload size is BENCH_PAYLOAD_HASH_MAX (bytes, default 10MB).
+
+python manage.py test benchmarks.bench_payload_hash --pattern "bench_*.py"
+"""
+
+import hashlib
+import json
+
+import rfc8785
+
+from benchmarks.events import synthetic_payload
+from benchmarks.utils import BenchmarkCase, env_int, time_call
+from workflow_manager_proc.services.event_utils import canonical_json
+
+MAX_SIZE = env_int("BENCH_PAYLOAD_HASH_MAX", 10_000_000)
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+class PayloadHashBenchmark(BenchmarkCase):
+    suite = "payload_hash"
+
+    def test_canonicalisers(self):
+        for size in [s for s in SIZES if s <= MAX_SIZE]:
+            data = synthetic_payload(size)
+            self.assertEqual(canonical_json(data), rfc8785.dumps(data))
+
+            timings = {}
+            for name, canonicalise in [
+                ("rfc8785", rfc8785.dumps),
+                ("canonical_json", canonical_json),
+            ]:
+                timings[name] = time_call(
+                    lambda: hashlib.sha256(canonicalise(data)).hexdigest(), repeat=3
+                )
+                self.record(
+                    f"{name}[{size}]",
+                    bytes=len(json.dumps(data)),
+                    mb_per_sec=round(size / timings[name]["us_per_call"], 1),
+                    **timings[name],
+                )
+            self.record(
+                f"speedup[{size}]",
+                factor=round(
+                    timings["rfc8785"]["us_per_call"]
+                    / timings["canonical_json"]["us_per_call"],
+                    2,
+                ),
+            )
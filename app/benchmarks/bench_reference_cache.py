@@ -0,0 +1,51 @@
+"""
+Queries per WRU event with a cold vs. a warm reference data cache (Workflow, RunContext lookups).
+
+python manage.py test benchmarks.bench_reference_cache --pattern "bench_*.py"
+"""
+
+from unittest import mock
+
+from benchmarks.events import load_fixture
+from benchmarks.utils import BenchmarkCase, env_int, measure, summarise
+from workflow_manager.tests.factories import WorkflowFactory
+from workflow_manager_proc.domain.event import wru
+from workflow_manager_proc.services import reference_cache, workflow_run
+
+EVENT_COUNT = env_int("BENCH_EVENT_COUNT", 100)
+
+
+class ReferenceCacheBenchmark(BenchmarkCase):
+    suite = "reference_cache"
+
+    def setUp(self):
+        WorkflowFactory()
+        reference_cache.clear()
+        self.emit_mock = mock.patch.object(workflow_run, "emit_model_event")
+        self.emit_mock.start()
+
+    def tearDown(self):
+        self.emit_mock.stop()
+        reference_cache.clear()
+
+    def _process(self, portal_run_id: str):
+        event = wru.AWSEvent.model_validate(load_fixture("WRU_max.json")).detail
+        event.portalRunId = portal_run_id
+        # run the on-commit hooks, as a committed Lambda transaction would
+        with self.captureOnCommitCallbacks(execute=True):
+            return measure(workflow_run.create_workflow_run, event)
+
+    def test_queries_per_event(self):
+        for mode in ["cold", "warm"]:
+            samples, queries = [], []
+            for i in range(EVENT_COUNT):
+                if mode == "cold":
+                    reference_cache.clear()
+                m = self._process(f"{mode}{i:012d}")
+                samples.append(m["seconds"])
+                queries.append(m["queries"])
+            self.record(
+                f"create_workflow_run.{mode}",
+                queries_per_event=round(sum(queries) / len(queries), 2),
+                **summarise(samples),
+            )
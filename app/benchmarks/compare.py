@@ -0,0 +1,101 @@
+"""
+Compare two benchmark result files (see benchmarks.utils.write_results), e.g. a baseline and the current run:
+
+    cp .benchmarks/api_load.json /tmp/baseline.json
+    ... change, run the benchmark again ...
+    python -m benchmarks.compare /tmp/baseline.json .benchmarks/api_load.json
+
+Prints the change of the latency percentiles and throughput of every result present in both files, and exits
+with 1 if any of them got worse by more than the threshold (default 10%).
+"""
+
+import argparse
+import json
+import sys
+from typing import List
+
+# metric -> True if higher is better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "req_per_sec": True,
+    "events_per_sec": True,
+    "queries_per_event": False,
+    "us_per_call": False,
+}
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return {r["name"]: r for r in json.load(f)["results"]}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> List[dict]:
+    """One row per result and metric present in both, with the relative change and whether it regressed."""
+    rows = []
+    for name, base in baseline.items():
+        if name not in current:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = base.get(metric), current[name].get(metric)
+            if not isinstance(before, (int, float)) or not isinstance(
+                after, (int, float)
+            ):
+                continue
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            rows.append(
+                {
+                    "name": name,
+                    "metric": metric,
+                    "before": before,
+                    "after": after,
+                    "change": change,
+                    "regressed": worse > threshold,
+                }
+            )
+    return rows
+
+
+def format_rows(rows: List[dict]) -> str:
+    width = max([len(r["name"]) for r in rows] + [4])
+    lines = [
+        f"{'name':<{width}}  {'metric':<17} {'before':>10} {'after':>10} {'change':>8}"
+    ]
+    for r in rows:
+        flag = "  REGRESSED" if r["regressed"] else ""
+        lines.append(
+            f"{r['name']:<{width}}  {r['metric']:<17} {r['before']:>10} {r['after']:>10} "
+            f"{r['change']:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="Regression threshold in percent (default 10)",
+    )
+    args = parser.parse_args(argv)
+
+    rows = compare(
+        load_results(args.baseline), load_results(args.current), args.threshold / 100
+    )
+    if not rows:
+        print("Nothing to compare.")
+        return 0
+    print(format_rows(rows))
+    regressed = [r for r in rows if r["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} regression(s) over {args.threshold}%")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+A larger, more realistic dataset for the benchmarks than the test fixtures: many workflow runs with a typical
+state history, many libraries per run, comments, and analysis runs. Built with plain `bulk_create` (no
+validation), so it seeds a few hundred thousand rows in seconds.
+"""
+
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+from workflow_manager.models import (
+    Analysis,
+    AnalysisRun,
+    AnalysisRunState,
+    Comment,
+    Library,
+    LibraryAssociation,
+    Payload,
+    RunContext,
+    State,
+    Workflow,
+    WorkflowRun,
+)
+from workflow_manager.models.run_context import RunContextUseCase
+
+BATCH_SIZE = 5000
+
+WORKFLOW_NAMES = [
+    "bclconvert",
+    "bssh_fastq_copy",
+    "tso_ctdna_tumor_only",
+    "wgs_alignment_qc",
+    "wts_alignment_qc",
+    "wgs_tumor_normal",
+    "wts_tumor_only",
+    "umccrise",
+    "rnasum",
+    "star_alignment",
+    "oncoanalyser_wgts_dna",
+    "sash",
+]
+
+# status paths of a run and how common they are
+STATUS_PATHS = [
+    (["DRAFT", "READY", "RUNNING", "SUCCEEDED"], 70),
+    (["DRAFT", "READY", "RUNNING", "FAILED"], 10),
+    (["DRAFT", "READY", "RUNNING", "FAILED", "RESOLVED"], 5),
+    (["DRAFT", "READY", "RUNNING"], 8),
+    (["DRAFT", "READY"], 4),
+    (["DRAFT"], 3),
+]
+
+
+def seed_dataset(
+    runs: int = 2000,
+    libraries: int = 500,
+    libraries_per_run: int = 100,
+    comments_per_run: float = 0.2,
+    analysis_runs: int = 200,
+    seed: int = 42,
+) -> dict:
+    """Seed the dataset, returns the number of rows created per model."""
+    rnd = random.Random(seed)
+    now = timezone.now()
+
+    workflows = Workflow.objects.bulk_create(
+        [
+            Workflow(
+                name=name,
+                version=f"4.{minor}.0",
+                execution_engine="ICA",
+                validation_state="VALIDATED" if minor == 2 else "DEPRECATED",
+            )
+            for name in WORKFLOW_NAMES
+            for minor in range(3)
+        ]
+    )
+    contexts = [
+        RunContext.objects.get_or_create(name=name, usecase=usecase)[0]
+        for name in ["clinical", "research"]
+        for usecase in [RunContextUseCase.COMPUTE, RunContextUseCase.STORAGE]
+    ]
+    libs = Library.objects.bulk_create(
+        [Library(library_id=f"L{2400000 + i:07d}") for i in range(libraries)],
+        batch_size=BATCH_SIZE,
+    )
+    analyses = Analysis.objects.bulk_create(
+        [
+            Analysis(analysis_name=name, analysis_version="bench")
+            for name in ["WGS", "WTS", "ctTSO", "WGTS"]
+        ]
+    )
+    analysis_run_objs = AnalysisRun.objects.bulk_create(
+        [
+            AnalysisRun(
+                analysis_run_name=f"AnalysisRun_{i}", analysis=rnd.choice(analyses)
+            )
+            for i in range(analysis_runs)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    AnalysisRunState.objects.bulk_create(
+        [
+            AnalysisRunState(
+                analysis_run=ar,
+                status=status,
+                timestamp=now - timedelta(days=i % 365, minutes=j),
+            )
+            for i, ar in enumerate(analysis_run_objs)
+            for j, status in enumerate(["DRAFT", "READY"][: rnd.randint(1, 2)])
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    paths, weights = zip(*STATUS_PATHS)
+    wfr_objs = []
+    run_paths = []
+    for i in range(runs):
+        wfr_objs.append(
+            WorkflowRun(
+                portal_run_id=f"{20240101 + i // 1000:08d}{i:08x}",
+                execution_id=f"exec-{i}",
+                workflow_run_name=f"run_{i}",
+                workflow=workflows[rnd.randrange(len(workflows))],
+                analysis_run=(
+                    analysis_run_objs[i % len(analysis_run_objs)]
+                    if analysis_run_objs and rnd.random() < 0.3
+                    else None
+                ),
+            )
+        )
+        run_paths.append(rnd.choices(paths, weights)[0])
+    wfr_objs = WorkflowRun.objects.bulk_create(wfr_objs, batch_size=BATCH_SIZE)
+
+    payloads = []
+    states = []
+    for i, (wfr, path) in enumerate(zip(wfr_objs, run_paths)):
+        start = now - timedelta(days=i % 365, hours=rnd.randint(0, 23))
+        for j, status in enumerate(path):
+            payload = Payload(
+                payload_ref_id=f"{i:032x}{j:032x}",
+                version="2024.07.01",
+                data={
+                    "inputs": {"libraryId": libs[i % len(libs)].library_id},
+                    "outputs": {"outputUri": f"s3://bucket/run_{i}/{status.lower()}/"},
+                    "tags": {"subjectId": f"SBJ{i % 997:05d}"},
+                },
+            )
+            payloads.append(payload)
+            states.append(
+                State(
+                    workflow_run=wfr,
+                    status=status,
+                    timestamp=start + timedelta(minutes=10 * j),
+                    payload=payload,
+                )
+            )
+    Payload.objects.bulk_create(payloads, batch_size=BATCH_SIZE)
+    State.objects.bulk_create(states, batch_size=BATCH_SIZE)
+
+    associations = []
+    for i, wfr in enumerate(wfr_objs):
+        offset = rnd.randrange(len(libs))
+        for k in range(min(libraries_per_run, len(libs))):
+            associations.append(
+                LibraryAssociation(
+                    workflow_run=wfr,
+                    library=libs[(offset + k) % len(libs)],
+                    association_date=now,
+                    status="ACTIVE",
+                )
+            )
+        if len(associations) >= BATCH_SIZE:
+            LibraryAssociation.objects.bulk_create(associations, batch_size=BATCH_SIZE)
+            associations = []
+    LibraryAssociation.objects.bulk_create(associations, batch_size=BATCH_SIZE)
+
+    through = WorkflowRun.contexts.through
+    through.objects.bulk_create(
+        [
+            through(workflowrun_id=wfr.pk[-26:], runcontext_id=ctx.pk[-26:])
+            for wfr in wfr_objs
+            for ctx in rnd.sample(contexts, 2)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    comments = [
+        Comment(
+            workflow_run=wfr,
+            text=f"Comment {k} on {wfr.workflow_run_name}",
+            created_by="bench@umccr.org",
+        )
+        for wfr in wfr_objs
+        for k in range(int(comments_per_run) + (rnd.random() < comments_per_run % 1))
+    ]
+    Comment.objects.bulk_create(comments, batch_size=BATCH_SIZE)
+
+    return {
+        "workflows": len(workflows),
+        "workflow_runs": len(wfr_objs),
+        "states": len(states),
+        "payloads": len(payloads),
+        "libraries": len(libs),
+        "library_associations": LibraryAssociation.objects.count(),
+        "comments": len(comments),
+        "analysis_runs": len(analysis_run_objs),
+    }
@@ -0,0 +1,88 @@
+"""
+Cold start probe for the Lambda entry points. Run by `bench_entry_points` in a fresh interpreter per sample:
+
+    python -c "from benchmarks.entry_points import probe; probe('handle_wru_event')"
+
+Prints one JSON line with the duration (seconds) of each cold start phase:
+    - django_setup: settings and `django.setup()` (apps and models)
+    - module_import: the remaining import of the entry point module
+    - first_query: the first DB query (incl. connection establishment)
+    - first_response: the first request/event through the handler, up to its serialized response (API response
+      body or emitted state change event)
+
+Imports nothing but the standard library before the measurement starts.
+"""
+
+import json
+import os
+import sys
+import time
+from unittest import mock
+
+ENTRY_POINTS = {
+    "api": "api",
+    "handle_wru_event": "workflow_manager_proc.lambdas.handle_wru_event",
+    "handle_aru_event": "workflow_manager_proc.lambdas.handle_aru_event",
+}
+
+
+def _first_response(entry: str, module):
+    from benchmarks.events import api_gateway_event, load_fixture
+
+    suffix = f"{os.getpid():08d}"
+    if entry == "api":
+        response = module.handler(
+            api_gateway_event("GET", "/api/v1/workflowrun/"), None
+        )
+        assert response["statusCode"] == 200, response
+        return response["body"]
+
+    if entry == "handle_wru_event":
+        from workflow_manager_proc.services import workflow_run as service
+
+        event = load_fixture("WRU_max.json")
+        event["detail"]["portalRunId"] = f"{suffix:0>16}"
+    else:
+        from workflow_manager_proc.services import analysis_run as service
+
+        event = load_fixture("ARU_draft_max.json")
+        event["detail"]["analysisRunName"] = f"ColdStart_{suffix}"
+
+    with mock.patch.object(service, "emit_model_event") as emit:
+        module.handler(event, None)
+    # the serialized state change event that would have been emitted
+    return emit.call_args.kwargs["event"].model_dump_json()
+
+
+def probe(entry: str) -> None:
+    timings = {}
+
+    t = time.perf_counter()
+    import django
+    from django.conf import settings
+
+    if "BENCH_DATABASE" in os.environ:
+        # run against the DB of the calling benchmark
+        settings.DATABASES = {"default": json.loads(os.environ["BENCH_DATABASE"])}
+    django.setup()
+    timings["django_setup"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    # not importlib.import_module, which bypasses the `-X importtime` instrumentation
+    __import__(ENTRY_POINTS[entry])
+    module = sys.modules[ENTRY_POINTS[entry]]
+    timings["module_import"] = time.perf_counter() - t
+
+    from django.db import connection
+
+    t = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    timings["first_query"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    body = _first_response(entry, module)
+    timings["first_response"] = time.perf_counter() - t
+
+    timings["total"] = sum(timings.values())
+    print(json.dumps({"entry": entry, "response_bytes": len(body), **timings}))
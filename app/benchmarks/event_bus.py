@@ -0,0 +1,61 @@
+"""
+In-process EventBridge stand-in: records the events the service emits instead of sending them to AWS.
+
+    with local_event_bus() as bus:
+        handle_wru_event.handler(event, None)
+    bus.events_of("WorkflowRunStateChange")
+
+It replaces the EventBridge client behind both emit paths, `event_utils` (the event processors) and
+`libeb.emit_event` (the API), so everything up to the `put_events` call (schema validation, serialisation) still
+runs as it would in AWS.
+"""
+
+import contextlib
+import json
+import threading
+import uuid
+from typing import List
+from unittest import mock
+
+from libumccr.aws import libeb
+
+from workflow_manager_proc.services import event_utils
+
+
+class LocalEventBus:
+    """Minimal `put_events` of the boto3 EventBridge client, keeping the entries in memory."""
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+
+    def put_events(self, Entries: List[dict], **kwargs) -> dict:
+        response = []
+        with self._lock:
+            for entry in Entries:
+                event_id = str(uuid.uuid4())
+                self.events.append({**entry, "Id": event_id})
+                response.append({"EventId": event_id})
+        return {"FailedEntryCount": 0, "Entries": response}
+
+    def events_of(self, detail_type: str) -> List[dict]:
+        """The (parsed) details of the events of the given type, in the order they were emitted."""
+        return [
+            json.loads(e["Detail"])
+            for e in self.events
+            if e["DetailType"] == detail_type
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events.clear()
+
+
+@contextlib.contextmanager
+def local_event_bus():
+    bus = LocalEventBus()
+    with (
+        mock.patch.object(event_utils, "client", bus),
+        mock.patch.object(libeb, "eb_client", return_value=bus),
+    ):
+        yield bus
@@ -0,0 +1,175 @@
+"""
+Event builders for the benchmarks. Standard library only, so they can be used in cold start subprocesses
+without skewing the import timings.
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "workflow_manager_proc",
+    "tests",
+    "fixtures",
+)
+
+
+def load_fixture(name: str) -> dict:
+    """Load one of the event fixtures of the processor tests (e.g. `WRU_max.json`)."""
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+def api_gateway_event(
+    method: str,
+    path: str,
+    query_string: str = "",
+    body: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> dict:
+    """A synthetic API Gateway (HTTP API, payload format 2.0) event, as received by `api.handler`."""
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": query_string,
+        "headers": {
+            "host": "localhost",
+            "content-type": "application/json",
+            **(headers or {}),
+        },
+        "requestContext": {
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+            },
+            "stage": "$default",
+        },
+        "body": json.dumps(body) if body is not None else None,
+        "isBase64Encoded": False,
+    }
+
+
+def synthetic_payload(size: int, seed: int = 0) -> dict:
+    """
+    A payload (data) of about `size` bytes of JSON, shaped like the real ones: a few top level sections, a list of
+    output file records with nested tags, numbers (int, float), booleans, nulls and some non-ASCII text.
+    """
+    rnd = random.Random(seed)
+    data = {
+        "inputs": {
+            "subjectId": "SBJ00001",
+            "libraryIds": ["L2400001", "L2400002"],
+            "sampleName": "PRJ240001_Tumour_ðøß",
+        },
+        "engineParameters": {
+            "outputUri": "s3://pipeline-prod-cache/analysis/",
+            "cacheUri": None,
+            "threads": 16,
+        },
+        "outputs": {"files": []},
+    }
+    files = data["outputs"]["files"]
+    current = len(json.dumps(data))
+    while current < size:
+        k = len(files)
+        record = {
+            "path": f"s3://pipeline-prod-cache/analysis/file_{k:07d}.bam",
+            "sizeBytes": rnd.randint(1, 10**12),
+            "coverage": round(rnd.uniform(0, 200), 4),
+            "passed": rnd.random() < 0.9,
+            "tags": {"lane": rnd.randint(1, 8), "md5": f"{rnd.getrandbits(128):032x}"},
+        }
+        files.append(record)
+        current += len(json.dumps(record)) + 2
+    return data
+
+
+# status paths of the replayed workflow runs and how common they are
+LIFECYCLES = [
+    (["DRAFT", "READY", "RUNNING", "SUCCEEDED"], 85),
+    (["DRAFT", "READY", "RUNNING", "FAILED"], 10),
+    (["DRAFT", "READY", "RUNNING", "RUNNING", "SUCCEEDED"], 5),
+]
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def _orcabus_id(prefix: str, rnd: random.Random) -> str:
+    return f"{prefix}.{''.join(rnd.choice(CROCKFORD) for _ in range(26))}"
+
+
+def wru_lifecycle(
+    index: int,
+    rnd: random.Random,
+    workflow: dict,
+    libraries: int = 2,
+    payload_bytes: int = 2000,
+    start: Optional[datetime] = None,
+) -> List[dict]:
+    """
+    The WorkflowRunUpdate events (AWS envelope) of one synthetic workflow run, from DRAFT to a terminal status:
+    new libraries with a readset each, a payload on every status but RUNNING, of (about) `payload_bytes`.
+    """
+    start = start or datetime(2025, 1, 1, tzinfo=timezone.utc)
+    portal_run_id = f"{start:%Y%m%d}{index:08x}"
+    path = rnd.choices(*zip(*LIFECYCLES))[0]
+    libs = [
+        {
+            "libraryId": f"L{index:07d}_{k}",
+            "orcabusId": _orcabus_id("lib", rnd),
+            "readsets": [
+                {
+                    "orcabusId": _orcabus_id("fqr", rnd),
+                    "rgid": f"AAGCAGTC+ACGCCAAC.{k}.{portal_run_id}",
+                }
+            ],
+        }
+        for k in range(libraries)
+    ]
+    events = []
+    timestamp = start + timedelta(seconds=index)
+    for step, status in enumerate(path):
+        detail = {
+            "version": "1.0.0",
+            "timestamp": timestamp.isoformat().replace("+00:00", "Z"),
+            "portalRunId": portal_run_id,
+            "workflowRunName": f"umccr--automated--{workflow['name']}--{portal_run_id}",
+            "workflow": workflow,
+            "libraries": libs,
+            "computeEnv": "clinical",
+            "storageEnv": "clinical",
+            "status": status,
+        }
+        if step > 1:
+            detail["executionId"] = f"exec-{portal_run_id}"
+        if status != "RUNNING":
+            output = f"s3://bucket/analysis/{workflow['name']}/{portal_run_id}/{status.lower()}"
+            files = [
+                f"{output}/file_{k:05d}.bam"
+                for k in range(max(payload_bytes // (len(output) + 20), 1))
+            ]
+            detail["payload"] = {
+                "version": "2024.07.01",
+                "data": {"outputUri": output, "files": files},
+            }
+        events.append(
+            {
+                "version": "0",
+                "id": f"{index:08x}-{step:04x}",
+                "detail-type": "WorkflowRunUpdate",
+                "source": "orcabus.bench",
+                "account": "123456789012",
+                "time": detail["timestamp"],
+                "region": "ap-southeast-2",
+                "resources": [],
+                "detail": detail,
+            }
+        )
+        timestamp += timedelta(minutes=rnd.randint(1, 120))
+    return events
@@ -0,0 +1,197 @@
+"""
+API load-test harness: fires a weighted mix of the requests the UI makes (lists with filters, search, ongoing,
+stats, detail, payload) at the API, in-process, and reports the latency distribution and throughput per endpoint.
+
+Two targets:
+    - "wsgi": the Django WSGI application (workflow_manager.wsgi), called with a plain WSGI environ
+    - "lambda": the API Lambda entry point (`api.handler`) with synthetic API Gateway events, so the
+      serverless-wsgi translation is included
+
+Requests are sent one at a time from the calling thread (on its DB connection, so a test case sees its own
+data): the numbers are service times and the throughput of one worker, not behaviour under contention.
+
+    ids = load_ids()
+    result = run_load(WsgiTarget(), REQUEST_MIX, ids, requests=1000)
+
+Results of two runs (any benchmark suite file) can be compared with benchmarks.compare.
+"""
+
+import contextlib
+import io
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+from urllib.parse import urlencode
+
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+
+from benchmarks.events import api_gateway_event
+from benchmarks.utils import summarise
+from workflow_manager.urls.base import api_base
+
+API = "/" + api_base
+
+
+class Request(NamedTuple):
+    name: str
+    weight: int
+    path: str  # may refer to the ids of `load_ids`, e.g. "workflowrun/{wfr}/"
+    queries: List[dict]  # query parameters, one set is picked per request
+
+
+REQUEST_MIX = [
+    Request(
+        "workflowrun.list",
+        20,
+        "workflowrun/",
+        [
+            {},
+            {"page": 2},
+            {"ordering": "-timestamp"},
+            {"status": "SUCCEEDED"},
+            {"status": "FAILED", "ordering": "-portal_run_id"},
+        ],
+    ),
+    Request(
+        "workflowrun.search",
+        10,
+        "workflowrun/",
+        [{"search": "run_1"}, {"search": "umccrise"}, {"search": "2024"}],
+    ),
+    Request("workflowrun.ongoing", 8, "workflowrun/ongoing/", [{}]),
+    Request("workflowrun.unresolved", 4, "workflowrun/unresolved/", [{}]),
+    Request("workflowrun.detail", 15, "workflowrun/{wfr}/", [{}]),
+    Request("workflowrun.state", 10, "workflowrun/{wfr}/state/", [{}]),
+    Request(
+        "stats.workflow_run",
+        8,
+        "stats/workflow_run/status_counts/",
+        [{}, {"search": "umccrise"}, {"start_time": "2024-06-01T00:00:00Z"}],
+    ),
+    Request("stats.grouped_workflow", 3, "stats/grouped_workflow/status_counts/", [{}]),
+    Request("workflow.grouped", 5, "workflow/grouped/", [{}]),
+    Request("payload.detail", 10, "payload/{pld}/", [{}]),
+    Request("analysisrun.list", 4, "analysisrun/", [{}]),
+    Request("analysisrun.detail", 3, "analysisrun/{anr}/", [{}]),
+]
+
+
+def load_ids(sample: int = 100) -> Dict[str, List[str]]:
+    """A sample of existing record ids to fill in the request paths with."""
+    from workflow_manager.models import AnalysisRun, Payload, WorkflowRun
+
+    return {
+        "wfr": list(WorkflowRun.objects.values_list("orcabus_id", flat=True)[:sample]),
+        "pld": list(Payload.objects.values_list("orcabus_id", flat=True)[:sample]),
+        "anr": list(AnalysisRun.objects.values_list("orcabus_id", flat=True)[:sample]),
+    }
+
+
+@contextlib.contextmanager
+def keep_connections():
+    """
+    Keep the DB connections open across requests (as the test client does), so requests run on the connection
+    (and in the transaction) of the caller.
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        yield
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+class WsgiTarget:
+    name = "wsgi"
+
+    def __init__(self):
+        from workflow_manager.wsgi import application
+
+        self.application = application
+
+    def request(self, method: str, path: str, query_string: str) -> int:
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query_string,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "HTTP_HOST": "localhost",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": io.StringIO(),
+        }
+        status = []
+        response = self.application(
+            environ, lambda s, headers, exc_info=None: status.append(s)
+        )
+        try:
+            b"".join(response)
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+        return int(status[0].split(" ", 1)[0])
+
+
+class LambdaTarget:
+    name = "lambda"
+
+    def __init__(self):
+        import api
+
+        self.handler = api.handler
+
+    def request(self, method: str, path: str, query_string: str) -> int:
+        event = api_gateway_event(method, path, query_string)
+        return self.handler(event, None)["statusCode"]
+
+
+TARGETS = {t.name: t for t in [WsgiTarget, LambdaTarget]}
+
+
+def run_load(
+    target, mix: List[Request], ids: Dict[str, List[str]], requests: int, seed=42
+) -> dict:
+    """
+    Send `requests` requests, picked from the mix by weight, and return the summary (see `summarise`) per
+    endpoint, with its throughput and error count, and the overall throughput as "total".
+    """
+    rnd = random.Random(seed)
+    picks = rnd.choices(mix, [r.weight for r in mix], k=requests)
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+
+    with keep_connections():
+        start = time.perf_counter()
+        for request in picks:
+            path = API + request.path.format(
+                **{key: rnd.choice(values) for key, values in ids.items() if values}
+            )
+            query_string = urlencode(rnd.choice(request.queries))
+            t = time.perf_counter()
+            status = target.request("GET", path, query_string)
+            samples[request.name].append(time.perf_counter() - t)
+            if status >= 400:
+                errors[request.name] += 1
+        elapsed = time.perf_counter() - start
+
+    result = {
+        "total": {
+            "requests": requests,
+            "seconds": round(elapsed, 3),
+            "req_per_sec": round(requests / elapsed, 1),
+            "errors": sum(errors.values()),
+            **summarise([s for values in samples.values() for s in values]),
+        }
+    }
+    for name, values in sorted(samples.items()):
+        result[name] = {
+            "req_per_sec": round(len(values) / sum(values), 1),
+            "errors": errors[name],
+            **summarise(values),
+        }
+    return result
@@ -0,0 +1,174 @@
+"""
+Shared helpers for the benchmark suite.
+
+Benchmarks are regular Django test cases living in `bench_*.py` modules, so the default test discovery
+(`test*.py`) leaves them out of the normal test run. Run them (against the test DB) with:
+
+    python manage.py test benchmarks --pattern "bench_*.py"
+
+Every benchmark prints a short summary and writes its measurements as JSON into `BENCHMARK_RESULTS_DIR`
+(default: `.benchmarks/`), one file per benchmark suite, for later comparison.
+"""
+
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import textwrap
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+RESULTS_DIR = os.environ.get("BENCHMARK_RESULTS_DIR", ".benchmarks")
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def env_int(name: str, default: int) -> int:
+    """Benchmark sizes can be tuned via environment variables (e.g. BENCH_WRITE_COUNT=1000)."""
+    return int(os.environ.get(name, default))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the given samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarise(samples: List[float]) -> dict:
+    """Latency summary (in milliseconds) of a list of durations (in seconds)."""
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "total_s": round(total, 6),
+        "mean_ms": round(total / len(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples, default=0.0) * 1000, 3),
+    }
+
+
+def measure(func: Callable, *args, **kwargs) -> dict:
+    """
+    Run `func` once and return its wall time (seconds) and the number of DB queries it issued.
+    """
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "queries": len(ctx.captured_queries), "result": result}
+
+
+def time_call(func: Callable, repeat: int = 5, min_seconds: float = 0.2) -> dict:
+    """
+    Microbenchmark `func` (no arguments): call it in loops of at least `min_seconds`, `repeat` times, and return
+    the best and the median time per call (in microseconds). The best is the least noisy estimate.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(int(number * min_seconds / 0.2), 1)
+    per_call = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    return {
+        "calls": number,
+        "us_per_call": round(per_call[0] * 1e6, 3),
+        "median_us": round(per_call[len(per_call) // 2] * 1e6, 3),
+    }
+
+
+def write_results(suite: str, results: List[dict], path: Optional[str] = None) -> str:
+    """Write the results of a benchmark suite as JSON and return the file path."""
+    path = path or os.path.join(RESULTS_DIR, f"{suite}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    doc = {
+        "suite": suite,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2, default=str)
+    return path
+
+
+def run_python(
+    code: str,
+    env: Optional[dict] = None,
+    python_args: Optional[List[str]] = None,
+    timeout: int = 300,
+) -> subprocess.CompletedProcess:
+    """
+    Run `code` in a fresh Python interpreter (e.g. to measure a cold start). The child inherits the environment of
+    this process, plus the settings of the current (test) DB as JSON in BENCH_DATABASE.
+    """
+    child_env = {
+        **os.environ,
+        "BENCH_DATABASE": json.dumps(connection.settings_dict, default=str),
+        **(env or {}),
+    }
+    proc = subprocess.run(
+        [sys.executable, *(python_args or []), "-c", textwrap.dedent(code)],
+        cwd=APP_DIR,
+        env=child_env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark subprocess failed:\n{proc.stderr[-5000:]}")
+    return proc
+
+
+def last_json_line(output: str) -> dict:
+    """The JSON document a benchmark subprocess printed as the last line of its output."""
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class BenchmarkMixin:
+    """
+    Collects the results of all benchmark methods of the class and writes them out as one suite once the class
+    is done.
+    """
+
+    suite: str = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.results:
+            path = write_results(cls.suite or cls.__name__, cls.results)
+            logger.info(f"Benchmark results written to {path}")
+        super().tearDownClass()
+
+    def record(self, name: str, **metrics) -> dict:
+        entry = {"name": name, **metrics}
+        self.results.append(entry)
+        logger.info(" | ".join(f"{k}={v}" for k, v in entry.items()))
+        return entry
+
+
+class BenchmarkCase(BenchmarkMixin, TestCase):
+    pass
+
+
+class TransactionBenchmarkCase(BenchmarkMixin, TransactionTestCase):
+    """For benchmarks that need committed data, e.g. to be visible to a subprocess."""
+
+    pass
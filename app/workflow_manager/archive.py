@@ -0,0 +1,157 @@
+"""
+Retention of workflow runs: terminal runs whose latest state is older than the retention period
+(WORKFLOW_RUN_RETENTION_DAYS) are moved out of the live tables into `ArchivedWorkflowRun`, one compressed JSON
+document per run holding the run with its states, payloads, comments and library associations (in the form of the
+API), and optionally also written to a gzipped NDJSON file.
+
+Runs are moved in batches, one transaction each. A run that is being updated (its advisory lock held by the
+ingestion, see `lock_workflow_run`) is skipped, and each run is checked to still qualify once locked. The payloads
+the states of a run referenced are left to `delete_orphan_payloads`, as they may be shared with other runs.
+
+Archived runs can still be fetched from the API with `include_archived` (see `WorkflowRunViewSet`). Late updates
+(WRU) of an archived run are ignored by the ingestion, rather than creating a new live run with its portal run id.
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from typing import IO, List, Optional, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from workflow_manager.models import ArchivedWorkflowRun, State, WorkflowRun
+from workflow_manager.models.payload import CODECS, PAYLOAD_COMPRESSION
+from workflow_manager.models.utils import get_workflow_run_lock_key
+from workflow_manager.serializers.comment import CommentSerializer
+from workflow_manager.serializers.payload import PayloadSerializer
+from workflow_manager.serializers.state import StateSerializer
+from workflow_manager.serializers.workflow_run import WorkflowRunDetailSerializer
+from workflow_manager.viewsets.utils import WORKFLOW_RUN_TERMINATION_STATUSES
+
+WORKFLOW_RUN_RETENTION_DAYS = int(os.environ.get("WORKFLOW_RUN_RETENTION_DAYS", 365))
+ARCHIVE_CODEC = PAYLOAD_COMPRESSION if PAYLOAD_COMPRESSION in CODECS else "zlib"
+
+
+def retention_cutoff(days: Optional[float] = None) -> datetime:
+    days = WORKFLOW_RUN_RETENTION_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_runs(cutoff: datetime) -> QuerySet:
+    """The runs whose latest state is terminal and older than `cutoff`."""
+    latest_state = State.objects.filter(workflow_run=OuterRef("pk")).order_by(
+        "-timestamp", "-orcabus_id"
+    )
+    return WorkflowRun.objects.annotate(
+        latest_status=Subquery(latest_state.values("status")[:1]),
+        latest_state_time=Subquery(latest_state.values("timestamp")[:1]),
+    ).filter(
+        latest_status__in=WORKFLOW_RUN_TERMINATION_STATUSES,
+        latest_state_time__lt=cutoff,
+    )
+
+
+def run_document(wfr: WorkflowRun) -> dict:
+    """The archived form of a workflow run: as returned by the API, with its history."""
+    states = sorted(wfr.states.all(), key=lambda s: (s.timestamp, s.orcabus_id))
+    payloads = {s.payload.orcabus_id: s.payload for s in states if s.payload}
+    return {
+        **WorkflowRunDetailSerializer(wfr).data,
+        "states": StateSerializer(states, many=True).data,
+        "payloads": PayloadSerializer(payloads.values(), many=True).data,
+        "comments": CommentSerializer(wfr.comments.all(), many=True).data,
+        "library_associations": [
+            {
+                "library": a.library_id,
+                "association_date": a.association_date,
+                "status": a.status,
+            }
+            for a in wfr.libraryassociation_set.all()
+        ],
+    }
+
+
+def lock_runs(runs: List[WorkflowRun]) -> List[WorkflowRun]:
+    """The runs whose advisory lock could be taken (until the end of the transaction), the others are in use."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT key, pg_try_advisory_xact_lock(key) FROM unnest(%s::bigint[]) AS key",
+            [[get_workflow_run_lock_key(r.portal_run_id) for r in runs]],
+        )
+        locked = {key for key, acquired in cursor.fetchall() if acquired}
+    return [r for r in runs if get_workflow_run_lock_key(r.portal_run_id) in locked]
+
+
+def archive_batch(
+    cutoff: datetime,
+    after: str,
+    batch_size: int,
+    dry_run: bool = False,
+    export: Optional[IO] = None,
+) -> Tuple[List[str], int]:
+    """
+    Archive the next batch of runs (by orcabus id, after `after`) in one transaction, and write them to `export`
+    once committed. Returns the ids of the candidates (to continue from) and the number of runs archived.
+    """
+    with transaction.atomic():
+        candidates = list(
+            archivable_runs(cutoff)
+            .filter(orcabus_id__gt=after)
+            .order_by("orcabus_id")
+            .only("orcabus_id", "portal_run_id")[:batch_size]
+        )
+        candidate_ids = [r.orcabus_id for r in candidates]
+        if not candidates or dry_run:
+            return candidate_ids, len(candidates)
+
+        # check again once locked, the runs may have changed in the meantime
+        locked = [r.orcabus_id for r in lock_runs(candidates)]
+        runs = list(
+            archivable_runs(cutoff)
+            .filter(orcabus_id__in=locked)
+            .order_by("orcabus_id")
+            .select_related("workflow", "analysis_run")
+            .prefetch_related(
+                "states__payload",
+                "comments",
+                "libraries",
+                "contexts",
+                "readsets",
+                "libraryassociation_set",
+            )
+        )
+
+        archived_at = timezone.now()
+        documents, archived = [], []
+        for wfr in runs:
+            document = run_document(wfr)
+            archived_run = ArchivedWorkflowRun(
+                orcabus_id=wfr.orcabus_id,
+                portal_run_id=wfr.portal_run_id,
+                workflow_run_name=wfr.workflow_run_name,
+                status=wfr.latest_status,
+                timestamp=wfr.latest_state_time,
+                archived_at=archived_at,
+                document_codec=ARCHIVE_CODEC,
+            )
+            archived_run.document = document
+            archived.append(archived_run)
+            documents.append(document)
+
+        ArchivedWorkflowRun.objects.bulk_create_validated(archived)
+        # the states, comments and (library, context, readset) associations go with their runs
+        WorkflowRun.objects.filter(orcabus_id__in=[r.orcabus_id for r in runs]).delete()
+
+    if export:
+        for document in documents:
+            export.write(json.dumps(document, cls=DjangoJSONEncoder) + "\n")
+    return candidate_ids, len(runs)
+
+
+def open_export(path: str) -> IO:
+    """The (appended) gzipped NDJSON file to also write the archived runs to."""
+    return gzip.open(path, "at", encoding="utf-8")
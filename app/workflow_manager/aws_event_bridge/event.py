@@ -2,6 +2,7 @@ import os
 import logging
 from libumccr.aws import libeb
 from workflow_manager_proc.domain.event import wrsc, wru
+from workflow_manager_proc.services.event_utils import type_adapter
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -25,7 +26,7 @@ def emit_wru_api_event(event: dict):
     if event_bus_name is None:
         raise ValueError("EVENT_BUS_NAME environment variable is not set.")
 
-    validated = wru.WorkflowRunUpdate.model_validate(event)
+    validated = type_adapter(wru.WorkflowRunUpdate).validate_python(event)
 
     # Omit keys with value null: JSON schema marks optional fields as non-required string types,
     # not as nullable; emitting null violates the schema.
@@ -45,19 +46,34 @@ def emit_wru_api_event(event: dict):
     return response
 
 
-def emit_wrsc_api_event(event: dict, attempt_count: int = 1):
-    """Validate and emit a WorkflowRunStateChange created through the API."""
+def emit_wrsc_api_event(
+    event: wrsc.WorkflowRunStateChange | dict, attempt_count: int = 1
+):
+    """
+    Emit a WorkflowRunStateChange created through the API.
+    A model instance (built by the service) is trusted and only serialised, a dict is validated first.
+    """
     source = "orcabus.workflowmanager"
-    event_id = event.get("id", "unknown")
-    workflow_run_id = event.get("orcabusId", "unknown")
-    event_status = event.get("status", "unknown")
+    if isinstance(event, dict):
+        event_id = event.get("id", "unknown")
+        workflow_run_id = event.get("orcabusId", "unknown")
+        event_status = event.get("status", "unknown")
+    else:
+        event_id, workflow_run_id, event_status = (
+            event.id,
+            event.orcabusId,
+            event.status,
+        )
 
     try:
         event_bus_name = os.environ.get("EVENT_BUS_NAME", None)
         if event_bus_name is None:
             raise ValueError("EVENT_BUS_NAME environment variable is not set.")
 
-        validated = wrsc.WorkflowRunStateChange.model_validate(event)
+        if isinstance(event, wrsc.WorkflowRunStateChange):
+            validated = event
+        else:
+            validated = type_adapter(wrsc.WorkflowRunStateChange).validate_python(event)
         detail_json = validated.model_dump_json(exclude_none=True)
         event_id = validated.id
         workflow_run_id = validated.orcabusId
@@ -0,0 +1,67 @@
+"""
+Database connection handling for the Lambdas: the IAM auth Postgres backend (see `db.postgresql`), IAM token
+caching (see `db.iam_auth`) and connection metrics.
+"""
+
+import threading
+
+from django.db import connections
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def _reset() -> None:
+    with _lock:
+        _stats.update(
+            connections=0,
+            connect_total_s=0.0,
+            connect_max_s=0.0,
+            connect_last_s=None,
+            iam_tokens=0,
+            iam_token_total_s=0.0,
+            iam_token_cache_hits=0,
+        )
+
+
+_reset()
+
+
+def record_connection(seconds: float) -> None:
+    with _lock:
+        _stats["connections"] += 1
+        _stats["connect_total_s"] += seconds
+        _stats["connect_max_s"] = max(_stats["connect_max_s"], seconds)
+        _stats["connect_last_s"] = seconds
+
+
+def record_iam_token(seconds: float = None) -> None:
+    """Record a newly generated IAM auth token (`seconds` to generate it) or a cache hit (no `seconds`)."""
+    with _lock:
+        if seconds is None:
+            _stats["iam_token_cache_hits"] += 1
+        else:
+            _stats["iam_tokens"] += 1
+            _stats["iam_token_total_s"] += seconds
+
+
+def connection_stats() -> dict:
+    """Connections established (and IAM auth tokens generated) by this process so far, with their timings."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset_connection_stats() -> None:
+    _reset()
+
+
+def refresh_connections() -> None:
+    """
+    Connection housekeeping at the start of a Lambda invocation. The event processing Lambdas don't go through
+    Django's request cycle, which otherwise takes care of this: close connections that are past their
+    CONN_MAX_AGE or unusable, and have the next use of the others run a health check (CONN_HEALTH_CHECKS).
+    Connections in a transaction (e.g. in tests) are left alone.
+    """
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
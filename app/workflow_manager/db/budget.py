@@ -0,0 +1,228 @@
+"""
+SQL budget: per request / Lambda event instrumentation of the DB work.
+
+    with sql_budget("handle_wru_event") as budget:
+        ...
+
+records the number of SQL statements, the total DB time, the slowest statements, the time spent in named
+phases (e.g. "serialization" of an emitted event, see `phase`) and named counts (e.g. "wrscPayloadReferenced", see
+`count`). The API requests are covered by db.middleware.SqlBudgetMiddleware (with a "render" phase).
+
+On exit, also if the block raises, the metrics are reported (SQL_METRICS):
+    - "log": one structured (JSON) log line (default)
+    - "emf": CloudWatch Embedded Metric Format, printed to stdout for CloudWatch to extract the metrics
+    - "off": not at all
+
+A budget with limits (`max_queries`, `max_db_ms`) logs a warning when they are exceeded, or raises
+SqlBudgetExceeded if `strict` (for tests to hold endpoints to a query budget).
+"""
+
+import contextlib
+import heapq
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SQL_METRICS = os.environ.get("SQL_METRICS", "log").lower()
+SQL_METRICS_NAMESPACE = os.environ.get(
+    "SQL_METRICS_NAMESPACE", "OrcaBus/WorkflowManager"
+)
+SQL_BUDGET_MAX_QUERIES = os.environ.get("SQL_BUDGET_MAX_QUERIES")  # default budget
+SLOWEST_STATEMENTS = 5
+MAX_STATEMENT_LENGTH = 500
+
+_current: ContextVar[Optional["SqlBudget"]] = ContextVar("sql_budget", default=None)
+
+
+class SqlBudgetExceeded(AssertionError):
+    pass
+
+
+class SqlBudget:
+    def __init__(
+        self,
+        name: str,
+        max_queries: Optional[int] = None,
+        max_db_ms: Optional[float] = None,
+        strict: bool = False,
+    ):
+        self.name = name
+        self.max_queries = max_queries
+        self.max_db_ms = max_db_ms
+        self.strict = strict
+        self.queries = 0
+        self.db_s = 0.0
+        self.total_s = 0.0
+        self.phases = {}  # phase name -> seconds
+        self.counts = {}  # count name -> value
+        self._slowest = []  # min-heap of (seconds, sequence, sql)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper, see https://docs.djangoproject.com/en/5.2/topics/db/instrumentation/"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_s += elapsed
+            entry = (elapsed, self.queries, sql[:MAX_STATEMENT_LENGTH])
+            if len(self._slowest) < SLOWEST_STATEMENTS:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_count(self, name: str, value: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    @property
+    def slowest(self) -> List[dict]:
+        return [
+            {"ms": round(s * 1000, 3), "sql": sql}
+            for s, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+    def exceeded(self) -> List[str]:
+        """The limits that were exceeded (empty if within budget)."""
+        exceeded = []
+        if self.max_queries is not None and self.queries > self.max_queries:
+            exceeded.append(f"{self.queries} queries > {self.max_queries}")
+        if self.max_db_ms is not None and self.db_s * 1000 > self.max_db_ms:
+            exceeded.append(f"{self.db_s * 1000:.1f}ms DB time > {self.max_db_ms}ms")
+        return exceeded
+
+    def metrics(self) -> dict:
+        return {
+            "name": self.name,
+            "queries": self.queries,
+            "dbMs": round(self.db_s * 1000, 3),
+            "totalMs": round(self.total_s * 1000, 3),
+            **{
+                f"{phase}Ms": round(seconds * 1000, 3)
+                for phase, seconds in self.phases.items()
+            },
+            **self.counts,
+            "slowest": self.slowest,
+        }
+
+    def server_timing(self) -> str:
+        """The metrics as `Server-Timing` response header value."""
+        timings = [
+            f'db;dur={self.db_s * 1000:.1f};desc="{self.queries} queries"',
+            *(f"{p};dur={s * 1000:.1f}" for p, s in self.phases.items()),
+        ]
+        return ", ".join(timings)
+
+    def emf(self) -> dict:
+        """The metrics in CloudWatch Embedded Metric Format."""
+        values = {
+            "SqlQueries": (self.queries, "Count"),
+            "DbTime": (self.db_s * 1000, "Milliseconds"),
+            "Duration": (self.total_s * 1000, "Milliseconds"),
+            **{
+                f"{phase.capitalize()}Time": (seconds * 1000, "Milliseconds")
+                for phase, seconds in self.phases.items()
+            },
+            **{
+                name[0].upper() + name[1:]: (value, "Count")
+                for name, value in self.counts.items()
+            },
+        }
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": SQL_METRICS_NAMESPACE,
+                        "Dimensions": [["Operation"]],
+                        "Metrics": [
+                            {"Name": name, "Unit": unit}
+                            for name, (_, unit) in values.items()
+                        ],
+                    }
+                ],
+            },
+            "Operation": self.name,
+            **{name: round(value, 3) for name, (value, _) in values.items()},
+            "slowest": self.slowest,
+        }
+
+    def report(self) -> None:
+        if SQL_METRICS == "emf":
+            print(json.dumps(self.emf()), flush=True)
+        elif SQL_METRICS == "log":
+            logger.info(json.dumps({"sqlBudget": self.metrics()}))
+
+        exceeded = self.exceeded()
+        if exceeded:
+            message = f"SQL budget of '{self.name}' exceeded: {', '.join(exceeded)}"
+            if self.strict:
+                raise SqlBudgetExceeded(f"{message}\n{json.dumps(self.slowest)}")
+            logger.warning(message)
+
+
+@contextlib.contextmanager
+def sql_budget(
+    name: str,
+    max_queries: Optional[int] = None,
+    max_db_ms: Optional[float] = None,
+    strict: bool = False,
+    report: bool = True,
+):
+    """Record the DB work of this block (all DB connections), see module docs."""
+    if max_queries is None and SQL_BUDGET_MAX_QUERIES and not strict:
+        max_queries = int(SQL_BUDGET_MAX_QUERIES)
+    budget = SqlBudget(name, max_queries, max_db_ms, strict)
+
+    token = _current.set(budget)
+    start = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(budget))
+            yield budget
+    except BaseException:
+        # a failing block is reported as well, without replacing its error by the one of a strict budget
+        budget.strict = False
+        raise
+    finally:
+        budget.total_s = time.perf_counter() - start
+        _current.reset(token)
+        if report:
+            budget.report()
+
+
+def current_budget() -> Optional[SqlBudget]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """Time a phase (e.g. "serialization") of the current budget, if any."""
+    budget = _current.get()
+    if budget is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        budget.add_phase(name, time.perf_counter() - start)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a count (e.g. "wrscPayloadReferenced") of the current budget, if any."""
+    budget = _current.get()
+    if budget is not None:
+        budget.add_count(name, value)
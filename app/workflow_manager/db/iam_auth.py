@@ -0,0 +1,70 @@
+"""
+RDS IAM auth tokens, cached until shortly before they expire.
+
+A token is valid for 15 minutes and only checked when a connection is established, so a warm Lambda container
+can reuse one for all the connections it (re-)opens in that time instead of signing a new one (and creating a
+boto3 session and client) each time.
+"""
+
+import getpass
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from workflow_manager import db
+
+# tokens are valid for 15 min, refresh them well before
+IAM_TOKEN_TTL = int(os.environ.get("IAM_TOKEN_TTL", 600))  # seconds
+
+_lock = threading.Lock()
+_tokens = {}  # (hostname, port, user) -> (token, expires)
+
+
+@lru_cache(maxsize=None)
+def _rds_client(region_name: Optional[str] = None):
+    import boto3
+
+    return boto3.session.Session().client(service_name="rds", region_name=region_name)
+
+
+@lru_cache(maxsize=None)
+def resolve_hostname(hostname: str) -> str:
+    """The RDS endpoint (part of the signed token) behind a CNAME, resolved once per process."""
+    from django_iam_dbauth.utils import resolve_cname
+
+    return resolve_cname(hostname)
+
+
+def get_token(
+    hostname: Optional[str],
+    port: int = 5432,
+    user: Optional[str] = None,
+    region_name: Optional[str] = None,
+    resolve_cname: bool = True,
+) -> str:
+    hostname = hostname or "localhost"
+    if resolve_cname:
+        hostname = resolve_hostname(hostname)
+    user = user or getpass.getuser()
+    key = (hostname, int(port), user)
+
+    with _lock:
+        token, expires = _tokens.get(key, (None, 0.0))
+        if token and time.monotonic() < expires:
+            db.record_iam_token()
+            return token
+
+        start = time.monotonic()
+        token = _rds_client(region_name).generate_db_auth_token(
+            DBHostname=hostname, Port=int(port), DBUsername=user
+        )
+        _tokens[key] = (token, start + IAM_TOKEN_TTL)
+        db.record_iam_token(time.monotonic() - start)
+        return token
+
+
+def clear() -> None:
+    with _lock:
+        _tokens.clear()
@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+
+from workflow_manager.db.budget import current_budget, sql_budget
+from workflow_manager.db.routers import (
+    get_replica_alias,
+    mark_replica_unavailable,
+    read_alias,
+)
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve safe (GET/HEAD) requests from the read replica, see db.routers. Views that need to see the caller's own
+    writes stay on the primary with a `db_read_primary = True` class attribute.
+
+    The replica is checked once per request. Should it fail during the request (OperationalError), it is marked
+    unavailable and the whole request is served again from the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = read_alias.set(DEFAULT_DB_ALIAS)
+        try:
+            return self.get_response(request)
+        finally:
+            read_alias.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF views carry their class as `cls`, Django's class based views as `view_class`
+        view_class = getattr(view_func, "cls", None) or getattr(
+            view_func, "view_class", None
+        )
+        if request.method in SAFE_METHODS and not getattr(
+            view_class, "db_read_primary", False
+        ):
+            read_alias.set(get_replica_alias() or DEFAULT_DB_ALIAS)
+        return None
+
+    def process_exception(self, request, exception):
+        alias = read_alias.get()
+        if alias == DEFAULT_DB_ALIAS or not isinstance(exception, OperationalError):
+            return None
+
+        mark_replica_unavailable(alias, exception)
+        read_alias.set(DEFAULT_DB_ALIAS)
+        match = request.resolver_match
+        return match.func(request, *match.args, **match.kwargs)
+
+
+class SqlBudgetMiddleware:
+    """
+    Record the DB work of each request with an SQL budget (see db.budget), and the time it takes to render the
+    response ("render": the JSON encoding of the response data by the renderer). DRF serializers build that data
+    within the view, so their time (and the queries of lazily evaluated relations) is not part of "render" but of
+    the total. Adds a `Server-Timing` header if settings.SQL_BUDGET_SERVER_TIMING.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with sql_budget(request.method, report=False) as budget:
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        budget.name = f"{request.method} {match.view_name if match else request.path}"
+        budget.report()
+
+        if getattr(settings, "SQL_BUDGET_SERVER_TIMING", False):
+            response["Server-Timing"] = budget.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        budget = current_budget()
+        if budget is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: budget.add_phase("render", time.perf_counter() - start)
+            )
+        return response
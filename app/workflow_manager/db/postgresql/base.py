@@ -0,0 +1,83 @@
+"""
+Postgres backend with IAM auth (drop-in for `django_iam_dbauth.aws.postgresql`, same OPTIONS), that
+
+- reuses IAM auth tokens until shortly before they expire (see db.iam_auth)
+- signs a fresh token for each new pooled connection, if pooling is enabled (OPTIONS "pool")
+- records how many connections are established and how long that takes (see db.connection_stats)
+"""
+
+import logging
+import time
+
+from django.db.backends.postgresql import base
+from psycopg import Connection
+
+from workflow_manager import db
+from workflow_manager.db import iam_auth
+
+logger = logging.getLogger(__name__)
+
+IAM_AUTH_OPTIONS = ["use_iam_auth", "region_name", "resolve_cname_enabled"]
+
+
+class IamAuthConnection(Connection):
+    """
+    Connection class for the psycopg pool: the pool keeps the connection parameters it was created with, so each
+    connection it opens needs a current token.
+    """
+
+    iam_options = {}  # the IAM auth OPTIONS of the DB, see DatabaseWrapper
+
+    @classmethod
+    def connect(cls, conninfo: str = "", **kwargs):
+        kwargs["password"] = iam_auth.get_token(
+            kwargs.get("host"),
+            kwargs.get("port", 5432),
+            kwargs.get("user"),
+            region_name=cls.iam_options.get("region_name"),
+            resolve_cname=cls.iam_options.get("resolve_cname_enabled", True),
+        )
+        return super().connect(conninfo, **kwargs)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__(settings_dict, *args, **kwargs)
+        options = self.settings_dict["OPTIONS"]
+        if options.get("use_iam_auth") and options.get("pool"):
+            if options["pool"] is True:
+                options["pool"] = {}
+            iam_options = {k: options[k] for k in IAM_AUTH_OPTIONS if k in options}
+            options["pool"].setdefault(
+                "connection_class",
+                type(
+                    "IamAuthConnection",
+                    (IamAuthConnection,),
+                    {"iam_options": iam_options},
+                ),
+            )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.setdefault("port", 5432)
+        iam_options = {k: params.pop(k) for k in IAM_AUTH_OPTIONS if k in params}
+        if iam_options.get("use_iam_auth"):
+            params["password"] = iam_auth.get_token(
+                params.get("host"),
+                params["port"],
+                params.get("user"),
+                region_name=iam_options.get("region_name"),
+                resolve_cname=iam_options.get("resolve_cname_enabled", True),
+            )
+        return params
+
+    def get_new_connection(self, conn_params):
+        start = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        elapsed = time.perf_counter() - start
+        db.record_connection(elapsed)
+        logger.info(
+            f"DB connection established in {elapsed * 1000:.1f}ms "
+            f"({db.connection_stats()['connections']} by this process)."
+        )
+        return connection
@@ -0,0 +1,87 @@
+"""
+Read replica routing for the API.
+
+Reads go to the replica (settings.DATABASE_READ_REPLICA) only where it's been asked for: for safe (GET/HEAD)
+requests, see db.middleware.ReplicaRoutingMiddleware, or within `read_from_replica()`. Everything else, and all
+writes, stay on the primary ("default"). Views that read what the caller has just written (e.g. the states or
+comments of a run) opt out with `db_read_primary = True`.
+
+The replica is checked once, when a request (or `read_from_replica()` block) starts, and the chosen alias is used for
+all its reads (`read_alias`). Should the replica be unavailable, or fail during a request (in which case the request
+is served again from the primary), reads fall back to the primary and the replica is retried after
+DB_REPLICA_RETRY_AFTER seconds.
+"""
+
+import contextlib
+import logging
+import os
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+DB_REPLICA_RETRY_AFTER = int(os.environ.get("DB_REPLICA_RETRY_AFTER", 30))  # seconds
+
+# the DB alias the reads (of the current request) go to
+read_alias: ContextVar[str] = ContextVar("read_alias", default=DEFAULT_DB_ALIAS)
+_replica_unavailable_until = 0.0
+
+
+@contextlib.contextmanager
+def read_from_replica(enabled: bool = True):
+    """Route the reads within this block to the read replica (if one is configured and available)."""
+    alias = (get_replica_alias() if enabled else None) or DEFAULT_DB_ALIAS
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+def read_from_primary():
+    return read_from_replica(False)
+
+
+def get_replica_alias():
+    """The alias of the read replica, None if there is none (or it is currently unavailable)."""
+    alias = getattr(settings, "DATABASE_READ_REPLICA", None)
+    if not alias or time.monotonic() < _replica_unavailable_until:
+        return None
+
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError as e:
+        mark_replica_unavailable(alias, e)
+        return None
+    return alias
+
+
+def mark_replica_unavailable(alias: str, error: Exception) -> None:
+    """Read from the primary for the next DB_REPLICA_RETRY_AFTER seconds."""
+    global _replica_unavailable_until
+
+    _replica_unavailable_until = time.monotonic() + DB_REPLICA_RETRY_AFTER
+    logger.warning(
+        f"Read replica '{alias}' unavailable, reading from the primary for the next "
+        f"{DB_REPLICA_RETRY_AFTER}s: {error}"
+    )
+
+
+def reset_replica_availability() -> None:
+    global _replica_unavailable_until
+    _replica_unavailable_until = 0.0
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same data as the primary
+        return True
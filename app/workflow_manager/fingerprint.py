@@ -0,0 +1,104 @@
+"""
+Fingerprints (dedup hashes) of the WorkflowRunStateChange (WRSC) and AnalysisRunStateChange (ARSC) events (their
+`id`) and of workflow run States (to detect repeated states).
+
+A fingerprint is a digest over the (field, value) pairs of the record; repeated fields (e.g. libraries) are
+order-insensitive. The scheme is versioned (FINGERPRINT_SCHEME):
+    1: the original hashes, bit for bit: the MD5 (hex) of the sorted, concatenated values, without their field
+       names (default, so the ids of the events stay the same as those emitted before)
+    2: field-tagged, length-prefixed encoding of the pairs, BLAKE2b-128 (hex) digest, prefixed "v2." so it is
+       never mistaken for a scheme 1 fingerprint. Values can not collide across fields.
+"""
+
+import hashlib
+import os
+from typing import Iterable, List, Optional, Tuple
+
+FINGERPRINT_SCHEME = int(os.environ.get("FINGERPRINT_SCHEME", 1))
+SCHEMES = (1, 2)
+
+Fields = List[Tuple[str, Optional[str]]]
+
+
+def digest(kind: str, fields: Fields, scheme: Optional[int] = None) -> str:
+    """The fingerprint of a record of the given kind (e.g. "wrsc") from its (field, value) pairs."""
+    scheme = scheme or FINGERPRINT_SCHEME
+    if scheme == 1:
+        # empty values are left out, the rest sorted to be independent of the order of records
+        keywords = sorted(value for _, value in fields if value)
+        return hashlib.md5("".join(keywords).encode("utf-8")).hexdigest()
+    if scheme == 2:
+        h = hashlib.blake2b(kind.encode("utf-8"), digest_size=16)
+        for field, value in sorted((f, v) for f, v in fields if v is not None):
+            encoded = value.encode("utf-8")
+            h.update(f"\n{field}:{len(encoded)}:".encode("utf-8"))
+            h.update(encoded)
+        return f"v2.{h.hexdigest()}"
+    raise ValueError(f"Unknown fingerprint scheme: {scheme}")
+
+
+def _library_fields(libraries: Optional[Iterable]) -> Fields:
+    fields = []
+    for lib in libraries or []:
+        fields.append(("library", lib.orcabusId))
+        for rs in lib.readsets or []:
+            fields.append(("readset", rs.orcabusId))
+    return fields
+
+
+def wrsc_fingerprint(out_wrsc, scheme: Optional[int] = None) -> str:
+    """The id of a WorkflowRunStateChange (ignoring its timestamp and the payload data, but not its refId)."""
+    fields = [
+        ("version", out_wrsc.version),
+        ("orcabusId", out_wrsc.orcabusId),
+        ("portalRunId", out_wrsc.portalRunId),
+        ("workflowRunName", out_wrsc.workflowRunName),
+        ("executionId", out_wrsc.executionId),
+        ("status", out_wrsc.status),
+        ("workflow", out_wrsc.workflow.orcabusId),
+        ("payload", out_wrsc.payload.refId if out_wrsc.payload else None),
+        (
+            "analysisRun",
+            out_wrsc.analysisRun.orcabusId if out_wrsc.analysisRun else None,
+        ),
+        *_library_fields(out_wrsc.libraries),
+        ("computeEnv", out_wrsc.computeEnv),
+        ("storageEnv", out_wrsc.storageEnv),
+    ]
+    return digest("wrsc", fields, scheme)
+
+
+def arsc_fingerprint(ar_state, scheme: Optional[int] = None) -> str:
+    """The id of an AnalysisRunStateChange (ignoring its timestamp)."""
+    fields = [
+        ("version", ar_state.version),
+        ("orcabusId", ar_state.orcabusId),
+        ("status", ar_state.status),
+        ("analysisRunName", ar_state.analysisRunName),
+        ("computeEnv", ar_state.computeEnv),
+        ("storageEnv", ar_state.storageEnv),
+        ("analysis", ar_state.analysis.orcabusId),
+        *_library_fields(ar_state.libraries),
+    ]
+    return digest("arsc", fields, scheme)
+
+
+def state_fingerprint(state, scheme: Optional[int] = None) -> str:
+    """The fingerprint of a State: its status, comment and payload (by refId)."""
+    scheme = scheme or FINGERPRINT_SCHEME
+    payload_ref_id = state.payload.payload_ref_id if state.payload else None
+    if scheme == 1:
+        # scheme 1 State hashes did tag their values (and include a missing comment as "None")
+        fields = [
+            ("status", f"status={state.status}"),
+            ("comment", f"comment={state.comment}"),
+        ]
+        if state.payload:
+            fields.append(("payload", f"payload_ref_id={payload_ref_id}"))
+        return digest("state", fields, scheme)
+    fields = [
+        ("status", state.status),
+        ("comment", state.comment),
+        ("payload", payload_ref_id),
+    ]
+    return digest("state", fields, scheme)
@@ -0,0 +1,73 @@
+import contextlib
+import time
+
+from django.core.management import BaseCommand
+
+from workflow_manager import archive
+
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = """
+        Move terminal workflow runs whose latest state is older than the retention period (WORKFLOW_RUN_RETENTION_DAYS)
+        into the archive, with their states, payloads, comments and library associations, in batches (see
+        workflow_manager.archive). Archived runs can still be fetched with `include_archived=true`.
+
+        The payloads left unreferenced are deleted with `delete_orphan_payloads`.
+
+        python manage.py archive_workflow_runs --older-than-days 365 --export archive.ndjson.gz --dry-run
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=float,
+            default=archive.WORKFLOW_RUN_RETENTION_DAYS,
+            help="Archive runs whose latest state is older than this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--export",
+            help="Also append the archived runs to this gzipped NDJSON file",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the runs that would be archived",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        cutoff = archive.retention_cutoff(options["older_than_days"])
+        print(f"Archiving terminal workflow runs with no state since {cutoff}")
+
+        scanned = archived = 0
+        start = time.perf_counter()
+        last_id = ""
+        with contextlib.ExitStack() as stack:
+            export = None
+            if options["export"] and not dry_run:
+                export = stack.enter_context(archive.open_export(options["export"]))
+
+            while True:
+                candidates, count = archive.archive_batch(
+                    cutoff, last_id, options["batch_size"], dry_run, export
+                )
+                if not candidates:
+                    break
+                last_id = candidates[-1]
+                scanned += len(candidates)
+                archived += count
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{archived} of {scanned} runs {'found' if dry_run else 'archived'} "
+                    f"({scanned / elapsed:.0f}/s)"
+                )
+
+        skipped = (
+            f" ({scanned - archived} in use, skipped)" if archived < scanned else ""
+        )
+        print(
+            f"{'Would archive' if dry_run else 'Archived'} {archived} workflow runs{skipped}"
+        )
+        print("Done")
@@ -0,0 +1,161 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import F, Func, IntegerField, Sum, TextField, Value
+from django.db.models.functions import Cast, Coalesce
+
+from workflow_manager.models.payload import (
+    CODECS,
+    PAYLOAD_COMPRESSION,
+    PAYLOAD_COMPRESSION_MIN_BYTES,
+    Payload,
+    encode_data,
+)
+
+STORAGE_UPDATE_FIELDS = ["data", *Payload.STORAGE_FIELDS]
+
+
+def column_size(field: str) -> Func:
+    return Coalesce(
+        Func(F(field), function="pg_column_size", output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def stored_bytes(ids: list) -> int:
+    """The bytes the data of the payloads takes up in the table (after TOAST compression)."""
+    return Payload.objects.filter(orcabus_id__in=ids).aggregate(
+        size=Coalesce(Sum(column_size("data") + column_size("data_compressed")), 0)
+    )["size"]
+
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = """
+        Convert existing payloads to the compressed storage of large data (see PAYLOAD_COMPRESSION), in batches,
+        and report the bytes saved. With --decompress, convert compressed payloads back.
+
+        python manage.py compress_payloads --codec zlib --min-bytes 64000 --dry-run
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--codec",
+            choices=CODECS,
+            default=PAYLOAD_COMPRESSION if PAYLOAD_COMPRESSION in CODECS else "zlib",
+        )
+        parser.add_argument(
+            "--min-bytes",
+            type=int,
+            default=PAYLOAD_COMPRESSION_MIN_BYTES,
+            help="Compress payloads with at least this many bytes of JSON",
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be converted (with the estimated savings)",
+        )
+        parser.add_argument(
+            "--decompress",
+            action="store_true",
+            help="Store compressed payloads uncompressed again",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        if options["decompress"]:
+            candidates = Payload.objects.filter(data_codec__isnull=False)
+        else:
+            # payloads whose (jsonb text) data is large enough, the compact JSON is checked again for each one
+            candidates = (
+                Payload.objects.filter(data_codec__isnull=True)
+                .alias(
+                    text_bytes=Func(
+                        Cast("data", TextField()),
+                        function="octet_length",
+                        output_field=IntegerField(),
+                    )
+                )
+                .filter(text_bytes__gte=options["min_bytes"])
+            )
+
+        totals = dict(scanned=0, converted=0, json_bytes=0, before=0, after=0)
+        start = time.perf_counter()
+        last_id = None
+        while True:
+            qs = candidates.order_by("orcabus_id")
+            if last_id:
+                qs = qs.filter(orcabus_id__gt=last_id)
+            batch = list(qs[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].orcabus_id
+
+            if options["decompress"]:
+                converted = self.decompress(batch)
+            else:
+                converted = self.compress(batch, options["codec"], options["min_bytes"])
+            ids = [p.orcabus_id for p in converted]
+
+            totals["scanned"] += len(batch)
+            totals["converted"] += len(converted)
+            totals["json_bytes"] += sum(
+                len(encode_data(p.full_data)) for p in converted
+            )
+            before = stored_bytes(ids)
+            if dry_run:
+                after = self.estimate(converted, options["decompress"])
+            else:
+                with transaction.atomic():
+                    Payload.objects.bulk_update(converted, STORAGE_UPDATE_FIELDS)
+                after = stored_bytes(ids)
+            totals["before"] += before
+            totals["after"] += after
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"{totals['scanned']} payloads scanned, {totals['converted']} converted "
+                f"({totals['scanned'] / elapsed:.0f}/s)"
+            )
+
+        saved = totals["before"] - totals["after"]
+        share = saved / totals["before"] if totals["before"] else 0
+        print(
+            f"{'Would convert' if dry_run else 'Converted'} {totals['converted']} of {totals['scanned']} payloads "
+            f"({totals['json_bytes']} bytes of JSON): {totals['before']} bytes stored before, "
+            f"{totals['after']} after, {saved} bytes ({share:.1%}) saved"
+        )
+        print("Done")
+
+    @staticmethod
+    def compress(batch: list, codec: str, min_bytes: int) -> list:
+        converted = []
+        for payload in batch:
+            data = payload.data
+            column_value = payload.pack_data(codec=codec, min_bytes=min_bytes)
+            if payload.data_codec is None:
+                continue
+            # bulk_update writes the attributes as they are: the column gets the summary
+            payload.data = column_value
+            payload.full_data = data
+            converted.append(payload)
+        return converted
+
+    @staticmethod
+    def decompress(batch: list) -> list:
+        for payload in batch:
+            payload.data_compressed = payload.data_codec = payload.data_size = None
+            payload.full_data = payload.data
+        return batch
+
+    @staticmethod
+    def estimate(converted: list, decompress: bool) -> int:
+        """Estimated stored bytes (ignores the TOAST compression of large values)."""
+        if decompress:
+            return sum(len(encode_data(p.full_data)) for p in converted)
+        # the data attribute holds the summary
+        return sum(len(p.data_compressed) + len(encode_data(p.data)) for p in converted)
@@ -0,0 +1,116 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import ulid
+from django.core.management import BaseCommand
+from django.db import IntegrityError, connection, transaction
+
+from workflow_manager.models import Payload, State
+
+BATCH_RETRIES = 3
+
+
+def ulid_cutoff(before: datetime) -> str:
+    """The smallest ULID of the given time: the ids of all records created before it sort lower."""
+    return ulid.from_timestamp(before.timestamp()).timestamp().str + "0" * 16
+
+
+def orphans_sql(lock: bool) -> str:
+    """
+    The next batch of payloads that no state references (after the given id and created before the cutoff), with
+    the bytes of their rows.
+    """
+    payload = Payload._meta.db_table
+    state = State._meta.db_table
+    return (
+        f"SELECT p.orcabus_id, pg_column_size(p.*) AS size FROM {payload} p "
+        f"WHERE p.orcabus_id > %s AND p.orcabus_id < %s "
+        f"AND NOT EXISTS (SELECT 1 FROM {state} s WHERE s.payload_id = p.orcabus_id) "
+        f"ORDER BY p.orcabus_id LIMIT %s"
+        + (" FOR UPDATE OF p SKIP LOCKED" if lock else "")
+    )
+
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = """
+        Delete the payloads no state references any more (e.g. replaced by a rerun or left behind when their states
+        were deleted), in batches, and report the bytes reclaimed (the space is reused by the table after VACUUM).
+
+        Safe to run alongside the ingestion: payloads created recently (--min-age-hours) are left alone, and a payload
+        that is being reused by a new state is locked (see PayloadManager.get_or_insert) and skipped.
+
+        python manage.py delete_orphan_payloads --batch-size 1000 --dry-run
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=1,
+            help="Only delete payloads created at least this many hours ago",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the orphan payloads (and their bytes)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        cutoff = ulid_cutoff(
+            datetime.now(timezone.utc) - timedelta(hours=options["min_age_hours"])
+        )
+
+        deleted = reclaimed = 0
+        start = time.perf_counter()
+        last_id = ""
+        while True:
+            if dry_run:
+                with connection.cursor() as cursor:
+                    cursor.execute(orphans_sql(False), [last_id, cutoff, batch_size])
+                    rows = cursor.fetchall()
+            else:
+                rows = self.delete_batch(last_id, cutoff, batch_size)
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            deleted += len(rows)
+            reclaimed += sum(size for _, size in rows)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{deleted} orphan payloads {'found' if dry_run else 'deleted'}, {reclaimed} bytes "
+                f"({deleted / elapsed:.0f}/s)"
+            )
+
+        print(
+            f"{'Would delete' if dry_run else 'Deleted'} {deleted} orphan payloads, "
+            f"{'would reclaim' if dry_run else 'reclaimed'} {reclaimed} bytes"
+        )
+        print("Done")
+
+    @staticmethod
+    def delete_batch(last_id: str, cutoff: str, batch_size: int) -> list:
+        """
+        Lock and delete the next batch of orphan payloads in one transaction. A state committed concurrently for one
+        of them fails the foreign key check: the batch is rolled back and selected again.
+        """
+        for attempt in range(BATCH_RETRIES):
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(orphans_sql(True), [last_id, cutoff, batch_size])
+                    rows = cursor.fetchall()
+                    if rows:
+                        cursor.execute(
+                            f"DELETE FROM {Payload._meta.db_table} WHERE orcabus_id = ANY(%s)",
+                            [[orcabus_id for orcabus_id, _ in rows]],
+                        )
+                        # check the (deferred) foreign keys now, within the retry
+                        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                return rows
+            except IntegrityError:
+                if attempt == BATCH_RETRIES - 1:
+                    raise
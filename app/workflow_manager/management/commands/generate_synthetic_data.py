@@ -0,0 +1,382 @@
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import ulid
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from workflow_manager.models import (
+    Library,
+    LibraryAssociation,
+    Payload,
+    RunContext,
+    State,
+    Workflow,
+    WorkflowRun,
+)
+from workflow_manager.models.run_context import RunContextUseCase
+
+# name, share of the runs, (min, max) libraries per run, median payload size (bytes)
+WORKFLOWS = [
+    ("bclconvert", 2, (40, 400), 64_000),
+    ("bssh_fastq_copy", 2, (40, 400), 32_000),
+    ("tso_ctdna_tumor_only", 10, (1, 1), 3_000),
+    ("wgs_alignment_qc", 25, (1, 1), 2_000),
+    ("wts_alignment_qc", 12, (1, 1), 2_000),
+    ("wgs_tumor_normal", 12, (2, 2), 4_000),
+    ("wts_tumor_only", 8, (1, 1), 3_000),
+    ("umccrise", 8, (2, 2), 6_000),
+    ("rnasum", 6, (1, 2), 3_000),
+    ("star_alignment", 6, (1, 1), 2_000),
+    ("oncoanalyser_wgts_dna", 5, (2, 3), 8_000),
+    ("sash", 4, (2, 2), 6_000),
+]
+WORKFLOW_VERSIONS = ["4.0.0", "4.1.0", "4.2.0"]
+
+# status paths of a run and how common they are
+STATUS_PATHS = [
+    (["DRAFT", "READY", "RUNNING", "SUCCEEDED"], 70),
+    (["DRAFT", "READY", "RUNNING", "FAILED"], 10),
+    (["DRAFT", "READY", "RUNNING", "FAILED", "RESOLVED"], 5),
+    (["DRAFT", "READY", "RUNNING", "ABORTED"], 2),
+    (["DRAFT", "READY", "RUNNING"], 6),
+    (["DRAFT", "READY"], 4),
+    (["DRAFT"], 3),
+]
+
+# median time (minutes) from a status to the next one
+STATUS_DURATIONS = {"DRAFT": 5, "READY": 2, "RUNNING": 240, "FAILED": 1440}
+
+PAYLOAD_VERSION = "2024.07.01"
+MAX_PAYLOAD_SIZE = 2_000_000
+CONTEXTS = [
+    ("clinical", RunContextUseCase.COMPUTE),
+    ("research", RunContextUseCase.COMPUTE),
+    ("clinical", RunContextUseCase.STORAGE),
+    ("research", RunContextUseCase.STORAGE),
+]
+
+
+def make_ulid(rnd: random.Random, at: datetime) -> str:
+    """A ULID for the given time, with its randomness taken from `rnd` (so it is reproducible)."""
+    return ulid.from_int((int(at.timestamp() * 1000) << 80) | rnd.getrandbits(80)).str
+
+
+def columns(model, fields):
+    return ", ".join(model._meta.get_field(f).column for f in fields)
+
+
+def copy_rows(cursor, model, fields, rows) -> int:
+    """Stream the rows into the model's table with COPY, returns the number of rows."""
+    count = 0
+    sql = f"COPY {model._meta.db_table} ({columns(model, fields)}) FROM STDIN"
+    with cursor.copy(sql) as copy:
+        for row in rows:
+            copy.write_row(row)
+            count += 1
+    return count
+
+
+# https://docs.djangoproject.com/en/5.0/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = """
+        Generate a large synthetic dataset (workflow runs with their states, payloads, libraries and library
+        associations) for capacity and load testing, e.g. of the list, search and stats queries.
+
+        Rows are streamed into the DB with Postgres COPY, one transaction per chunk of runs. The data (including
+        the OrcaBus IDs) is fully determined by the seed, so the same dataset can be loaded again into an empty
+        DB (see `make clean`) for comparable results.
+
+        python manage.py generate_synthetic_data --runs 1000000 --libraries 200000 --seed 42
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=100_000)
+        parser.add_argument("--libraries", type=int, default=20_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--days", type=int, default=730, help="Time span of the runs"
+        )
+        parser.add_argument(
+            "--end",
+            default="2025-01-01",
+            help="Date (YYYY-MM-DD) of the end of the time span",
+        )
+        parser.add_argument(
+            "--payload-scale",
+            type=float,
+            default=1.0,
+            help="Factor on the payload sizes",
+        )
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+        parser.add_argument(
+            "--no-analyze", action="store_true", help="Skip ANALYZE after loading"
+        )
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options["seed"])
+        end = datetime.strptime(options["end"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        start = end - timedelta(days=options["days"])
+        runs = options["runs"]
+        chunk_size = options["chunk_size"]
+
+        workflows = self.create_workflows(rnd, start)
+        contexts = self.create_contexts(rnd, start)
+        library_ids = [make_ulid(rnd, start) for _ in range(options["libraries"])]
+        if Library.objects.filter(orcabus_id__in=library_ids[:1]).exists():
+            print("Synthetic data of this seed found, clean the DB first (make clean).")
+            return
+
+        started = time.perf_counter()
+        totals = {}
+        with transaction.atomic(), connection.cursor() as cursor:
+            totals["libraries"] = copy_rows(
+                cursor,
+                Library,
+                ["orcabus_id", "library_id"],
+                ((lib, f"L{2000000 + i:07d}") for i, lib in enumerate(library_ids)),
+            )
+
+        generator = RunGenerator(
+            rnd,
+            start,
+            end,
+            runs,
+            workflows,
+            contexts,
+            library_ids,
+            options["payload_scale"],
+        )
+        for offset in range(0, runs, chunk_size):
+            chunk = generator.generate(offset, min(chunk_size, runs - offset))
+            with transaction.atomic(), connection.cursor() as cursor:
+                for table, count in chunk.copy(cursor).items():
+                    totals[table] = totals.get(table, 0) + count
+
+            done = offset + len(chunk.runs)
+            elapsed = time.perf_counter() - started
+            rows = sum(totals.values())
+            print(
+                f"{done}/{runs} runs, {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)"
+            )
+
+        if not options["no_analyze"]:
+            with connection.cursor() as cursor:
+                for model in [Library, WorkflowRun, Payload, State, LibraryAssociation]:
+                    cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+        print(", ".join(f"{count} {table}" for table, count in totals.items()))
+        print("Done")
+
+    @staticmethod
+    def create_workflows(rnd: random.Random, start: datetime) -> list:
+        workflows = []
+        for name, share, fan_out, payload_size in WORKFLOWS:
+            for version in WORKFLOW_VERSIONS:
+                workflow, _ = Workflow.objects.get_or_create(
+                    name=name,
+                    version=version,
+                    execution_engine="ICA",
+                    defaults={
+                        "orcabus_id": make_ulid(rnd, start),
+                        "validation_state": (
+                            "VALIDATED"
+                            if version == WORKFLOW_VERSIONS[-1]
+                            else "DEPRECATED"
+                        ),
+                    },
+                )
+                workflows.append((workflow.orcabus_id[-26:], name, version))
+        return workflows
+
+    @staticmethod
+    def create_contexts(rnd: random.Random, start: datetime) -> dict:
+        return {
+            (name, usecase): RunContext.objects.get_or_create(
+                name=name,
+                usecase=usecase,
+                defaults={"orcabus_id": make_ulid(rnd, start)},
+            )[0].orcabus_id[-26:]
+            for name, usecase in CONTEXTS
+        }
+
+
+def portal_run_id(at: datetime, index: int) -> str:
+    return f"{at:%Y%m%d}{index:08x}"
+
+
+class Chunk:
+    def __init__(self):
+        self.runs = []
+        self.run_contexts = []
+        self.payloads = []
+        self.states = []
+        self.associations = []
+
+    def copy(self, cursor) -> dict:
+        through = WorkflowRun.contexts.through
+        return {
+            "workflow_runs": copy_rows(
+                cursor,
+                WorkflowRun,
+                [
+                    "orcabus_id",
+                    "portal_run_id",
+                    "execution_id",
+                    "workflow_run_name",
+                    "workflow",
+                ],
+                self.runs,
+            ),
+            "run_contexts": copy_rows(
+                cursor, through, ["workflowrun", "runcontext"], self.run_contexts
+            ),
+            "payloads": copy_rows(
+                cursor,
+                Payload,
+                ["orcabus_id", "payload_ref_id", "version", "data"],
+                self.payloads,
+            ),
+            "states": copy_rows(
+                cursor,
+                State,
+                ["orcabus_id", "status", "timestamp", "workflow_run", "payload"],
+                self.states,
+            ),
+            "library_associations": copy_rows(
+                cursor,
+                LibraryAssociation,
+                ["orcabus_id", "workflow_run", "library", "association_date", "status"],
+                self.associations,
+            ),
+        }
+
+
+class RunGenerator:
+    """Generates the rows of the workflow runs, in order, from a single random sequence."""
+
+    def __init__(
+        self,
+        rnd: random.Random,
+        start: datetime,
+        end: datetime,
+        runs: int,
+        workflows: list,
+        contexts: dict,
+        library_ids: list,
+        payload_scale: float,
+    ):
+        self.rnd = rnd
+        self.start = start
+        self.span = (end - start).total_seconds()
+        self.runs = runs
+        self.workflows = {name: [] for name, *_ in WORKFLOWS}
+        for orcabus_id, name, version in workflows:
+            self.workflows[name].append((orcabus_id, version))
+        self.profiles = [(name, fan_out, size) for name, _, fan_out, size in WORKFLOWS]
+        self.profile_weights = [share for _, share, _, _ in WORKFLOWS]
+        self.paths, self.path_weights = zip(*STATUS_PATHS)
+        self.contexts = contexts
+        self.library_ids = library_ids
+        self.payload_scale = payload_scale
+
+    def generate(self, offset: int, count: int) -> Chunk:
+        chunk = Chunk()
+        rnd = self.rnd
+        # runs spread evenly across the time span, in order
+        for index in range(offset, offset + count):
+            at = self.start + timedelta(
+                seconds=self.span * (index + rnd.random()) / self.runs
+            )
+            self.generate_run(chunk, index, at)
+        return chunk
+
+    def generate_run(self, chunk: Chunk, index: int, at: datetime):
+        rnd = self.rnd
+        name, fan_out, payload_size = rnd.choices(self.profiles, self.profile_weights)[
+            0
+        ]
+        # most runs use the latest workflow version
+        workflow_id, version = rnd.choices(self.workflows[name], [1, 2, 7])[0]
+        path = rnd.choices(self.paths, self.path_weights)[0]
+
+        run_id = make_ulid(rnd, at)
+        prid = portal_run_id(at, index)
+        chunk.runs.append(
+            (
+                run_id,
+                prid,
+                f"{rnd.getrandbits(128):032x}" if len(path) > 2 else None,
+                f"umccr--automated--{name}--{version.replace('.', '-')}--{prid}",
+                workflow_id,
+            )
+        )
+        usage = "clinical" if rnd.random() < 0.7 else "research"
+        for usecase in [RunContextUseCase.COMPUTE, RunContextUseCase.STORAGE]:
+            chunk.run_contexts.append((run_id, self.contexts[(usage, usecase)]))
+
+        # the libraries of a run are mostly from the same sequencing run, i.e. close to each other
+        libraries = rnd.randint(*fan_out)
+        first = rnd.randrange(len(self.library_ids)) if self.library_ids else 0
+        library_ids = [
+            self.library_ids[(first + k) % len(self.library_ids)]
+            for k in range(min(libraries, len(self.library_ids)))
+        ]
+        for library_id in library_ids:
+            chunk.associations.append(
+                (make_ulid(rnd, at), run_id, library_id, at, "ACTIVE")
+            )
+
+        timestamp = at
+        for status in path:
+            payload_id = None
+            # not every RUNNING update carries a payload
+            if status != "RUNNING" or rnd.random() < 0.5:
+                payload_id = make_ulid(rnd, timestamp)
+                size = rnd.lognormvariate(
+                    math.log(payload_size * self.payload_scale), 0.8
+                )
+                chunk.payloads.append(
+                    (
+                        payload_id,
+                        f"{rnd.getrandbits(128):032x}",
+                        PAYLOAD_VERSION,
+                        self.payload_data(name, prid, status, len(library_ids), size),
+                    )
+                )
+            chunk.states.append(
+                (make_ulid(rnd, timestamp), status, timestamp, run_id, payload_id)
+            )
+            median = STATUS_DURATIONS.get(status, 60)
+            timestamp += timedelta(
+                minutes=rnd.lognormvariate(math.log(median), 0.6) + 0.001
+            )
+
+    @staticmethod
+    def payload_data(
+        name: str, prid: str, status: str, libraries: int, size: float
+    ) -> str:
+        """The JSON of a payload of (about) the given size: a few fields and a list of output files."""
+        output = (
+            f"s3://pipeline-prod-cache/byob-icav2/production/analysis/{name}/{prid}"
+        )
+        data = {
+            "inputs": {"libraryCount": libraries, "workflowName": name},
+            "engineParameters": {
+                "outputUri": f"{output}/",
+                "logsUri": f"s3://pipeline-prod-cache/logs/{name}/{prid}/",
+            },
+            "tags": {"portalRunId": prid, "status": status},
+        }
+        base = len(json.dumps(data))
+        target = min(int(size), MAX_PAYLOAD_SIZE)
+        # each file entry is ~len(output) + 20 bytes
+        files = max(0, (target - base) // (len(output) + 20))
+        if files:
+            data["outputs"] = {
+                "files": [f"{output}/file_{k:06d}.bam" for k in range(files)]
+            }
+        return json.dumps(data)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.15 on 2026-10-19 17:11
+
+import django.core.serializers.json
+import workflow_manager.models.payload
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_manager", "0023_alter_payload_payload_ref_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payload",
+            name="data_codec",
+            field=models.CharField(blank=True, max_length=8, null=True),
+        ),
+        migrations.AddField(
+            model_name="payload",
+            name="data_compressed",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="payload",
+            name="data_size",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="payload",
+            name="data",
+            field=workflow_manager.models.payload.PayloadDataField(
+                encoder=django.core.serializers.json.DjangoJSONEncoder
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # the index is built concurrently, without locking the payload table against ingestion
+    atomic = False
+
+    dependencies = [
+        ("workflow_manager", "0024_payload_data_compression"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="payload",
+            index=GinIndex(
+                fields=["data"],
+                name="payload_data_path_ops_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
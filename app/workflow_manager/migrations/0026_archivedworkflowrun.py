@@ -0,0 +1,38 @@
+# Generated by Django 5.2.15 on 2026-10-19 17:26
+
+import workflow_manager.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflow_manager", "0025_payload_data_path_ops_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedWorkflowRun",
+            fields=[
+                (
+                    "orcabus_id",
+                    workflow_manager.fields.OrcaBusIdField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                ("portal_run_id", models.CharField(db_index=True, max_length=255)),
+                (
+                    "workflow_run_name",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("status", models.CharField(max_length=255)),
+                ("timestamp", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+                ("document_compressed", models.BinaryField()),
+                ("document_codec", models.CharField(max_length=8)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
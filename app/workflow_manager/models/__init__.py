@@ -14,3 +14,4 @@ from .utils import WorkflowRunUtil
 from .workflow import Workflow, ValidationState
 from .workflow_run import WorkflowRun, LibraryAssociation
 from .comment import Comment
+from .archived_workflow_run import ArchivedWorkflowRun
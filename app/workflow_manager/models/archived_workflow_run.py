@@ -0,0 +1,45 @@
+import json
+
+from django.db import models
+
+from workflow_manager.fields import OrcaBusIdField
+from workflow_manager.models.base import OrcaBusBaseModel, OrcaBusBaseManager
+from workflow_manager.models.payload import compress, decompress, encode_data
+
+
+class ArchivedWorkflowRunManager(OrcaBusBaseManager):
+    pass
+
+
+class ArchivedWorkflowRun(OrcaBusBaseModel):
+    """
+    A (terminal) workflow run moved out of the live tables (see `workflow_manager.archive`): the run with its states,
+    payloads, comments and library associations, as one compressed JSON document.
+    """
+
+    # the id of the archived workflow run
+    orcabus_id = OrcaBusIdField(primary_key=True, prefix="wfr")
+    portal_run_id = models.CharField(max_length=255, db_index=True)
+    workflow_run_name = models.CharField(max_length=255, null=True, blank=True)
+    # the latest state of the run
+    status = models.CharField(max_length=255)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    document_compressed = models.BinaryField()
+    document_codec = models.CharField(max_length=8)
+
+    objects = ArchivedWorkflowRunManager()
+
+    def __str__(self):
+        return f"ID: {self.orcabus_id}, portal_run_id: {self.portal_run_id}, archived_at: {self.archived_at}"
+
+    @property
+    def document(self) -> dict:
+        return json.loads(
+            decompress(bytes(self.document_compressed), self.document_codec)
+        )
+
+    @document.setter
+    def document(self, document: dict):
+        self.document_compressed = compress(encode_data(document), self.document_codec)
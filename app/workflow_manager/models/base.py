@@ -1,10 +1,10 @@
 import logging
 import operator
 from functools import reduce
-from typing import List
+from typing import List, Optional
 
 from django.core.exceptions import FieldError
-from django.db import models
+from django.db import models, connections
 from django.db.models import (
     Q,
     ManyToManyField,
@@ -17,8 +17,7 @@ from django.db.models import (
     OneToOneRel,
     QuerySet,
 )
-from rest_framework.settings import api_settings
-from workflow_manager.pagination import PaginationConstant
+from workflow_manager.fields import OrcaBusIdField
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +57,9 @@ class OrcaBusBaseManager(models.Manager):
         )
 
     def get_model_fields_query(self, qs: QuerySet, **kwargs) -> QuerySet:
+        # imported here, so the models can be used without DRF (see settings.proc)
+        from rest_framework.settings import api_settings
+        from workflow_manager.pagination import PaginationConstant
 
         def exclude_params(params):
             for param in params:
@@ -92,6 +94,75 @@ class OrcaBusBaseManager(models.Manager):
 
         return qs
 
+    def insert_on_conflict(
+        self,
+        obj: "OrcaBusBaseModel",
+        conflict_fields: List[str],
+        conflict_action: str = "DO NOTHING",
+    ) -> Optional[bool]:
+        """
+        Persist a new (not yet saved) model instance with a single `INSERT ... ON CONFLICT (...) ... RETURNING`
+        statement.
+
+        The instance is validated in Python only (see `OrcaBusBaseModel.lean_clean`), uniqueness is left to the
+        database and there is no post-save reload: the returned row is loaded back into `obj` directly
+        (including the prefixed OrcaBus ID).
+
+        Parameters:
+            obj: the model instance to insert
+            conflict_fields: the (unique) model fields making up the conflict target
+            conflict_action: the SQL conflict action, i.e. `DO NOTHING` or `DO UPDATE SET ...`
+                (the existing row is aliased as `t`)
+
+        Returns:
+            True if the record was inserted, False if the conflict action updated the existing record,
+            None if no record was returned (i.e. `DO NOTHING` on a conflict), in which case `obj` is left untouched.
+        """
+        obj.lean_clean()
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        fields = opts.local_concrete_fields
+
+        columns = ", ".join(qn(f.column) for f in fields)
+        placeholders = ", ".join(["%s"] * len(fields))
+        targets = ", ".join(qn(opts.get_field(f).column) for f in conflict_fields)
+        params = [f.get_db_prep_save(f.pre_save(obj, True), connection) for f in fields]
+
+        sql = (
+            f"INSERT INTO {qn(opts.db_table)} AS t ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({targets}) {conflict_action} "
+            f"RETURNING t.*, (t.xmax = 0) AS _inserted"
+        )
+        rows = list(self.raw(sql, params))
+        if not rows:
+            return None
+
+        # load the persisted values (runs the `from_db_value` converters, e.g. OrcaBus ID prefix)
+        row = rows[0]
+        for f in fields:
+            setattr(obj, f.attname, getattr(row, f.attname))
+        obj._state.adding = False
+        obj._state.db = self.db
+        return row._inserted
+
+    def bulk_create_validated(
+        self, objs: List["OrcaBusBaseModel"], batch_size: Optional[int] = None
+    ) -> List["OrcaBusBaseModel"]:
+        """
+        Bulk counterpart of `OrcaBusBaseModel.save`: each object is validated once, in Python only
+        (`OrcaBusBaseModel.lean_clean`, the DB constraints cover relations and uniqueness), and all objects are
+        written with a single INSERT per batch. The returned objects carry their prefixed OrcaBus IDs.
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.lean_clean()
+        objs = self.bulk_create(objs, batch_size=batch_size)
+        for obj in objs:
+            obj.apply_db_converters()
+        return objs
+
 
 class OrcaBusBaseModel(models.Model):
     class Meta:
@@ -101,9 +172,31 @@ class OrcaBusBaseModel(models.Model):
         self.full_clean()  # make sure we are validating the inputs (especially the OrcaBus ID)
         super(OrcaBusBaseModel, self).save(*args, **kwargs)
 
-        # Reload the object from the database to ensure custom fields like OrcaBusIdField
-        # invoke the `from_db_value` method (which provides the annotation) after saving.
-        self.refresh_from_db()
+        # Custom fields like OrcaBusIdField only provide their annotation (prefix) in `from_db_value`, i.e. when
+        # loaded from the database. Apply the same conversion in Python rather than reloading the object.
+        self.apply_db_converters()
+
+    def apply_db_converters(self):
+        """
+        Bring the OrcaBus ID values (own and foreign keys) into the form they take when loaded from the database,
+        as if the object had been refreshed from the DB.
+        """
+        for f in self._meta.concrete_fields:
+            target = f.target_field if f.is_relation else f
+            if not isinstance(target, OrcaBusIdField):
+                continue
+            value = getattr(self, f.attname)
+            if value:
+                value = target.from_db_value(target.get_prep_value(value), None, None)
+                setattr(self, f.attname, value)
+
+    def lean_clean(self):
+        """
+        Like `full_clean`, but without the validation steps that need a DB round trip (relation and uniqueness
+        checks). Use with writes that rely on the DB constraints for those instead.
+        """
+        self.clean_fields(exclude=[f.name for f in self._meta.fields if f.is_relation])
+        self.clean()
 
     @classmethod
     def get_fields(cls):
@@ -59,9 +59,5 @@ class Comment(OrcaBusBaseModel):
                 "A comment must be linked to exactly one of workflow_run or analysis_run."
             )
 
-    def save(self, *args, **kwargs):
-        self.clean()
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return f"ID: {self.orcabus_id}, workflow_run: {self.workflow_run}, text: {self.text}"
@@ -1,24 +1,285 @@
+import json
+import os
+import zlib
+
+from django.contrib.postgres.indexes import GinIndex
+from django.core.exceptions import FieldError, ImproperlyConfigured
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db import models
+from django.db import connections, models
+from django.db.models import F
+from django.db.models.fields.json import DataContains, KeyTransform
+from django.db.models.functions import JSONObject
 
 from workflow_manager.fields import OrcaBusIdField
 from workflow_manager.models.base import OrcaBusBaseModel, OrcaBusBaseManager
 
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+# Compression of large payload data: "off" (default), "zlib" or "zstd" (requires the zstandard package)
+PAYLOAD_COMPRESSION = os.environ.get("PAYLOAD_COMPRESSION", "off").lower()
+# payloads with less JSON (bytes) than this are stored as is
+PAYLOAD_COMPRESSION_MIN_BYTES = int(
+    os.environ.get("PAYLOAD_COMPRESSION_MIN_BYTES", 64_000)
+)
+CODECS = ("zlib", "zstd")
+SUMMARY_MAX_STRING_LENGTH = 256
+
+
+def encode_data(data) -> bytes:
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def compress(raw: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(raw, 6)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImproperlyConfigured("zstd compression requires zstandard")
+        return zstandard.ZstdCompressor(level=9).compress(raw)
+    raise ImproperlyConfigured(f"Unknown payload compression: {codec}")
+
+
+def decompress(blob: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(blob)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImproperlyConfigured("zstd compression requires zstandard")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    raise ImproperlyConfigured(f"Unknown payload compression: {codec}")
+
+
+def compression_enabled() -> bool:
+    return PAYLOAD_COMPRESSION != "off"
+
+
+def is_summary_value(value) -> bool:
+    """If a top level value of the data is kept in the summary of compressed data (see `summarise_data`)."""
+    return (
+        value is None
+        or isinstance(value, (bool, int, float))
+        or (isinstance(value, str) and len(value) <= SUMMARY_MAX_STRING_LENGTH)
+    )
+
+
+def summarise_data(data):
+    """
+    The summary kept in the `data` column of a compressed payload: the top level members whose value is null, a
+    boolean, a number or a string of at most SUMMARY_MAX_STRING_LENGTH characters. Nested objects, arrays and long
+    strings are left out (e.g. `{"status": "READY", "inputs": {...}}` is summarised as `{"status": "READY"}`).
+    """
+    if not isinstance(data, dict):
+        return {}
+    return {key: value for key, value in data.items() if is_summary_value(value)}
+
+
+def summary_covers(document) -> bool:
+    """
+    If the containment filter `document` (`data @> document`) gives the same results on the summary of compressed
+    data as on the full data: a JSON object of top level keys with values kept in the summary.
+    """
+    return isinstance(document, dict) and all(
+        is_summary_value(value) for value in document.values()
+    )
+
+
+def data_projection(paths: list[str]) -> JSONObject:
+    """
+    The JSON object of the values of the data at the given paths `<key>.<key>...` (keyed by path, null if absent), built in the
+    database (`data #> '{<key>,<key>...}'`) so only these fragments are transferred.
+    """
+    fields = {}
+    for path in paths:
+        value = F("data")
+        for key in path.split("."):
+            value = KeyTransform(key, value)
+        fields[path] = value
+    return JSONObject(**fields)
+
+
+def project_data(data, paths: list[str]) -> dict:
+    """The Python counterpart of `data_projection`."""
+    projection = {}
+    for path in paths:
+        value = data
+        for key in path.split("."):
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                value = None
+        projection[path] = value
+    return projection
+
+
+SUMMARY_LOOKUP_ERROR = (
+    "While payload data is stored compressed (PAYLOAD_COMPRESSION), the data column only holds the summary of "
+    "large data: lookups on it are limited to `data__contains` of top level keys with null, boolean, number or "
+    f"short (up to {SUMMARY_MAX_STRING_LENGTH} characters) string values."
+)
+
+
+class SummaryDataContains(DataContains):
+    """`data__contains`, refused while compression is enabled unless the summary answers it (see `summary_covers`)."""
+
+    def get_prep_lookup(self):
+        if compression_enabled() and not summary_covers(self.rhs):
+            raise FieldError(SUMMARY_LOOKUP_ERROR)
+        return super().get_prep_lookup()
+
+
+class PayloadDataField(models.JSONField):
+    """
+    The payload data. Large data is stored compressed in `data_compressed`, the column then holds a summary (see
+    `Payload.pack_data` and `summarise_data`). In Python the field always holds the full data.
+
+    While compression is enabled, lookups that the summary can not answer (anything but `data__contains` of top
+    level short scalar values, `data__isnull`) raise a FieldError rather than silently missing the large payloads.
+    """
+
+    def get_lookup(self, lookup_name):
+        if lookup_name == "contains":
+            return SummaryDataContains
+        if compression_enabled() and lookup_name != "isnull":
+            raise FieldError(SUMMARY_LOOKUP_ERROR)
+        return super().get_lookup(lookup_name)
+
+    def get_transform(self, name):
+        if compression_enabled():
+            raise FieldError(SUMMARY_LOOKUP_ERROR)
+        return super().get_transform(name)
+
+    def pre_save(self, model_instance, add):
+        return model_instance.data_column()
+
 
 class PayloadManager(OrcaBusBaseManager):
-    pass
+    GET_OR_INSERT_ATTEMPTS = 3
+
+    def get_or_insert(self, payload: "Payload") -> bool:
+        """
+        Insert the (new) payload unless an identical one (same refId and version) exists already, in which case
+        `payload` is pointed at the existing record. The payload data is never read back from the DB.
+        Returns True if the record was inserted.
+
+        An existing record is locked (FOR KEY SHARE, until the end of the transaction), so the orphan payload
+        cleanup (see `delete_orphan_payloads`) cannot delete it before the state referencing it is committed. If it
+        was deleted in the meantime, the payload is inserted again.
+        """
+        qn = connections[self.db].ops.quote_name
+        sql = (
+            f"SELECT {qn('orcabus_id')} FROM {qn(self.model._meta.db_table)} "
+            f"WHERE {qn('payload_ref_id')} = %s AND {qn('version')} = %s FOR KEY SHARE"
+        )
+        # the storage fields follow from the data: set them before any field is written
+        payload.pack_data()
+        for _ in range(self.GET_OR_INSERT_ATTEMPTS):
+            if self.insert_on_conflict(payload, ["payload_ref_id", "version"]):
+                return True
+
+            rows = list(self.raw(sql, [payload.payload_ref_id, payload.version]))
+            if rows:
+                payload.orcabus_id = rows[0].orcabus_id
+                payload._state.adding = False
+                payload._state.db = self.db
+                return False
+        raise self.model.DoesNotExist(
+            f"Payload {payload.payload_ref_id} ({payload.version}) deleted while inserted"
+        )
 
 
 class Payload(OrcaBusBaseModel):
+    """
+    The payload of a state, content-addressed by `payload_ref_id` (the hash of the data) and `version`.
+
+    Large data is stored compressed (PAYLOAD_COMPRESSION, from PAYLOAD_COMPRESSION_MIN_BYTES of JSON), and the `data`
+    column (and its GIN index) then only holds its summary: the top level keys whose value is null, a boolean, a
+    number or a string of at most SUMMARY_MAX_STRING_LENGTH characters. While compression is enabled, the lookups on
+    `data` are limited to what that summary answers exactly (see `PayloadDataField`).
+    """
+
     class Meta:
         unique_together = ["payload_ref_id", "version"]
+        indexes = [
+            # containment (@>) filters on the data, see `viewsets.utils.payload_data_filters` (on the summary only for
+            # compressed data)
+            GinIndex(
+                fields=["data"],
+                name="payload_data_path_ops_idx",
+                opclasses=["jsonb_path_ops"],
+            )
+        ]
+
+    # how the data is stored, not part of the API
+    STORAGE_FIELDS = ["data_compressed", "data_codec", "data_size"]
 
     orcabus_id = OrcaBusIdField(primary_key=True, prefix="pld")
     payload_ref_id = models.CharField(max_length=255)
     version = models.CharField(max_length=255)
-    data = models.JSONField(encoder=DjangoJSONEncoder)
+    data = PayloadDataField(encoder=DjangoJSONEncoder)
+    # the compressed JSON of large data, its codec and (uncompressed) size
+    data_compressed = models.BinaryField(null=True, blank=True)
+    data_codec = models.CharField(max_length=8, null=True, blank=True)
+    data_size = models.PositiveIntegerField(null=True, blank=True)
 
     objects = PayloadManager()
 
+    # the bytes of the JSON of the data, where the caller knows it already (not stored)
+    data_json_size = None
+    # the data last packed and the value of its `data` column (see `pack_data`)
+    _packed = None
+
     def __str__(self):
         return f"ID: {self.orcabus_id}, payload_ref_id: {self.payload_ref_id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        blob = instance.__dict__.get("data_compressed")
+        if blob is not None:
+            instance.data = json.loads(decompress(bytes(blob), instance.data_codec))
+        return instance
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # the storage fields follow from the data: set them before any field is written, and write them with it
+        self.pack_data()
+        if update_fields is not None and "data" in update_fields:
+            update_fields = [
+                *update_fields,
+                *(f for f in self.STORAGE_FIELDS if f not in update_fields),
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def data_column(self):
+        """The value of the `data` column: as packed for the current data (see `pack_data`), else packed now."""
+        if self._packed is None or self._packed[0] is not self.data:
+            return self.pack_data()
+        return self._packed[1]
+
+    def pack_data(self, codec: str = None, min_bytes: int = None):
+        """
+        Decide how the data is stored: compressed (with `codec`, default PAYLOAD_COMPRESSION) if its JSON has at
+        least `min_bytes` (default PAYLOAD_COMPRESSION_MIN_BYTES), else as is. Sets the storage fields and returns
+        the value for the `data` column. Done by `save` and `PayloadManager.get_or_insert` before the fields are
+        written, so the order of the fields does not matter.
+        """
+        codec = codec or PAYLOAD_COMPRESSION
+        min_bytes = PAYLOAD_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+
+        raw = encode_data(self.data) if codec != "off" else None
+        if raw is None or len(raw) < min_bytes:
+            self.data_compressed = self.data_codec = self.data_size = None
+            column = self.data
+        else:
+            self.data_compressed = compress(raw, codec)
+            self.data_codec = codec
+            self.data_size = len(raw)
+            column = summarise_data(self.data)
+        self._packed = (self.data, column)
+        return column
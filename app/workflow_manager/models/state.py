@@ -8,7 +8,16 @@ from workflow_manager.models.common import Status
 
 
 class StateManager(OrcaBusBaseManager):
-    pass
+
+    def insert_if_absent(self, state: "State") -> bool:
+        """
+        Insert the (new) state unless the workflow run already has a state with the same status and timestamp
+        (e.g. a redelivered event). Returns True if the record was inserted.
+        """
+        inserted = self.insert_on_conflict(
+            state, ["workflow_run", "status", "timestamp"]
+        )
+        return bool(inserted)
 
 
 class State(OrcaBusBaseModel):
@@ -4,6 +4,10 @@ import hashlib
 from datetime import timedelta, datetime, timezone
 from typing import List
 
+from django.db import connection, transaction
+
+from workflow_manager import fingerprint
+from workflow_manager.models.payload import Payload
 from workflow_manager.models.state import State
 from workflow_manager.models.workflow_run import WorkflowRun
 from workflow_manager.models.common import Status
@@ -62,7 +66,8 @@ class WorkflowRunUtil:
         Return:
             False: if the transition is not possible
             True: if the state was updated
-        # TODO: consider race conditions?
+        NOTE: concurrent transitions of the same WorkflowRun are not safe on their own. Callers are expected
+              to hold the per-run lock (see `lock_workflow_run`) for the duration of the enclosing transaction.
         """
         # enforce status conventions on new state
         new_state.status = Status.get_convention(
@@ -96,16 +101,13 @@ class WorkflowRunUtil:
         #       BCL Convert may not create a DRAFT state
         if not self.get_current_state():
             if new_state.is_draft():
-                self.persist_state(new_state)
-                return True
+                return self.persist_state(new_state)
             else:
                 logger.warning(
                     f"WorkflowRun does not have state yet, but new state is not DRAFT: {new_state}"
                 )
-                self.persist_state(
-                    new_state
-                )  # FIXME: remove once convention is enforced
-                return True
+                # FIXME: remove once convention is enforced
+                return self.persist_state(new_state)
 
         # Ignore any state that's older than the current one
         if new_state.timestamp < self.get_current_state().timestamp:
@@ -122,11 +124,9 @@ class WorkflowRunUtil:
         if self.is_draft():
             if new_state.is_draft():  # allow "updates" of the DRAFT state
                 # FIXME: check if new state is same as current one (i.e. limit updates to actual data changes)
-                self.persist_state(new_state)
-                return True
+                return self.persist_state(new_state)
             elif new_state.is_ready():  # allow transition from DRAFT to READY state
-                self.persist_state(new_state)
-                return True
+                return self.persist_state(new_state)
             else:
                 return False  # Don't allow any other transitions from DRAFT state
 
@@ -151,8 +151,7 @@ class WorkflowRunUtil:
                     # Avoid too frequent updates for RUNNING state
                     return False
                 else:
-                    self.persist_state(new_state)
-                    return True
+                    return self.persist_state(new_state)
 
         # Allowed transitions from other state
         if self.contains_status(new_state.status):
@@ -160,14 +159,22 @@ class WorkflowRunUtil:
             return False
 
         # Assume other state transitions are OK
-        self.persist_state(new_state)
-        return True
+        return self.persist_state(new_state)
 
-    def persist_state(self, new_state):
+    def persist_state(self, new_state: State) -> bool:
+        """
+        Persist the new state (and its payload) with conflict aware inserts. Identical payloads are shared and a
+        state the workflow run already holds (same status and timestamp) is not persisted again.
+        Returns True if the state was persisted.
+        """
         new_state.workflow_run = self.workflow_run
         if new_state.payload:
-            new_state.payload.save()  # Need to save Payload before we can save State
-        new_state.save()
+            # Need to save Payload before we can save State
+            payload = new_state.payload
+            Payload.objects.get_or_insert(payload)
+            # the state copied the payload id on assignment, and an existing record has another one: assign again
+            new_state.payload = payload
+        return State.objects.insert_if_absent(new_state)
 
     @staticmethod
     def get_latest_state(states: List[State]) -> State:
@@ -183,25 +190,41 @@ class StateUtil:
 
     @staticmethod
     def create_state_hash(state: State) -> str:
-        # collect all relevant fields into a string and hash it to create a unique identifier for the state
+        # a fingerprint of all relevant fields, a unique identifier for the state
         # this can be used to detect duplicate states (e.g. due to retries)
-        keywords = list()
-        keywords.append(str(f"status={state.status}"))
-        keywords.append(str(f"comment={state.comment}"))
-        if state.payload:
-            keywords.append(str(f"payload_ref_id={state.payload.payload_ref_id}"))
-
-        # filter out any None values
-        keywords = list(filter(None, keywords))
-        # sort the list of keywords to avoid issues with record order
-        keywords.sort()
-
-        # create hash value
-        md5_object = hashlib.md5()
-        for key in keywords:
-            md5_object.update(key.encode("utf-8"))
-
-        return md5_object.hexdigest()
+        return fingerprint.state_fingerprint(state)
+
+
+def get_workflow_run_lock_key(portal_run_id: str) -> int:
+    """
+    Derive a stable signed 64-bit Postgres advisory lock key from a portal run id.
+    The key is namespaced, so it does not collide with other advisory locks keyed on the same value.
+    """
+    digest = hashlib.blake2b(
+        f"workflow_run:{portal_run_id}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, byteorder="big", signed=True)
+
+
+def lock_workflow_run(portal_run_id: str) -> None:
+    """
+    Serialise the processing of a single WorkflowRun across concurrent workers (e.g. Lambda invocations).
+
+    Acquires a transaction-scoped Postgres advisory lock keyed on the portal run id. Any other transaction
+    requesting the lock for the same portal run id blocks until this transaction commits or rolls back.
+    This covers the case where the WorkflowRun record does not exist yet, which `SELECT ... FOR UPDATE` can't.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        # a transaction-scoped lock taken in autocommit mode is released immediately
+        raise transaction.TransactionManagementError(
+            "lock_workflow_run must be called inside an atomic block."
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(%s)",
+            [get_workflow_run_lock_key(portal_run_id)],
+        )
 
 
 def create_portal_run_id() -> str:
@@ -10,7 +10,29 @@ from workflow_manager.models.workflow import Workflow
 
 
 class WorkflowRunManager(OrcaBusBaseManager):
-    pass
+
+    def upsert(self, wfr: "WorkflowRun") -> bool:
+        """
+        Insert the (new) workflow run or, if a record with the same portal_run_id exists already, load that one
+        into `wfr` instead. An execution_id is only ever filled in, never overwritten: the existing row is only
+        updated when it gains one, otherwise it is read with a plain SELECT (an update would rewrite the row on every
+        event). Returns True if the record was created.
+        """
+        created = self.insert_on_conflict(
+            wfr,
+            ["portal_run_id"],
+            "DO UPDATE SET execution_id = EXCLUDED.execution_id "
+            "WHERE t.execution_id IS NULL AND EXCLUDED.execution_id IS NOT NULL",
+        )
+        if created is not None:
+            return created
+
+        existing = self.get(portal_run_id=wfr.portal_run_id)
+        for f in self.model._meta.local_concrete_fields:
+            setattr(wfr, f.attname, getattr(existing, f.attname))
+        wfr._state.adding = False
+        wfr._state.db = self.db
+        return False
 
 
 class WorkflowRun(OrcaBusBaseModel):
@@ -0,0 +1,128 @@
+"""
+Structural diff of JSON documents (payload data), as a list of changes at JSON Pointer paths (RFC 6901):
+    {"op": "add", "path": "/inputs/genome", "b": "hg38"}
+    {"op": "remove", "path": "/tags/0", "a": "wgs"}
+    {"op": "replace", "path": "/inputs/dataset", "a": "X", "b": "Y"}
+
+Objects are compared by key and arrays by index, walking both documents side by side with a stack of iterators,
+so the memory needed on top of the documents is bounded by their depth (and the changes, of which there are at most
+PAYLOAD_DIFF_MAX_CHANGES).
+
+As payloads are content-addressed (the refId is the hash of the data), diffs are cached in-process by their pair of
+refIds (`cached_diff`). The cache is bounded by the size of the JSON of the cached changes (PAYLOAD_DIFF_CACHE_BYTES),
+diffs larger than that are not cached.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Iterator, List, Tuple
+
+from cachetools import LRUCache
+
+PAYLOAD_DIFF_MAX_CHANGES = int(os.environ.get("PAYLOAD_DIFF_MAX_CHANGES", 1000))
+# bytes of the JSON of all cached changes
+PAYLOAD_DIFF_CACHE_BYTES = int(os.environ.get("PAYLOAD_DIFF_CACHE_BYTES", 16_000_000))
+
+Change = dict
+
+
+def _result_size(result: Tuple[List[Change], bool]) -> int:
+    changes, _ = result
+    return len(json.dumps(changes, separators=(",", ":"), default=str))
+
+
+_cache = LRUCache(maxsize=PAYLOAD_DIFF_CACHE_BYTES, getsizeof=_result_size)
+_lock = threading.Lock()
+
+
+def _pointer(path: str, key) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _same_scalar(a: Any, b: Any) -> bool:
+    # True == 1 in Python, not in JSON
+    return a == b and isinstance(a, bool) == isinstance(b, bool)
+
+
+def _children(path: str, a: Any, b: Any) -> Iterator[Tuple[str, str, Any, Any]]:
+    """The (op, path, a, b) of the members of two containers of the same type, in order."""
+    if isinstance(a, dict):
+        for key, value in a.items():
+            if key in b:
+                yield "compare", _pointer(path, key), value, b[key]
+            else:
+                yield "remove", _pointer(path, key), value, None
+        for key, value in b.items():
+            if key not in a:
+                yield "add", _pointer(path, key), None, value
+    else:
+        for i in range(max(len(a), len(b))):
+            if i >= len(b):
+                yield "remove", _pointer(path, i), a[i], None
+            elif i >= len(a):
+                yield "add", _pointer(path, i), None, b[i]
+            else:
+                yield "compare", _pointer(path, i), a[i], b[i]
+
+
+def diff(a: Any, b: Any, max_changes: int = None) -> Tuple[List[Change], bool]:
+    """
+    The changes from document `a` to document `b` (at most `max_changes`, default PAYLOAD_DIFF_MAX_CHANGES), and
+    whether there were more.
+    """
+    max_changes = PAYLOAD_DIFF_MAX_CHANGES if max_changes is None else max_changes
+    changes = []
+    stack = [iter([("compare", "", a, b)])]
+    while stack:
+        op, path, value_a, value_b = next(stack[-1], (None, None, None, None))
+        if op is None:
+            stack.pop()
+            continue
+        if op == "compare":
+            if isinstance(value_a, (dict, list)) and type(value_a) is type(value_b):
+                stack.append(_children(path, value_a, value_b))
+                continue
+            if _same_scalar(value_a, value_b):
+                continue
+            op = "replace"
+
+        if len(changes) == max_changes:
+            return changes, True
+        change = {"op": op, "path": path}
+        if op != "add":
+            change["a"] = value_a
+        if op != "remove":
+            change["b"] = value_b
+        changes.append(change)
+    return changes, False
+
+
+def cached_diff(
+    ref_id_a: str, ref_id_b: str, load: Callable[[], Tuple[Any, Any]]
+) -> Tuple[List[Change], bool]:
+    """
+    The diff of the payload data with the given refIds, from the cache or computed from the documents returned by
+    `load` (only called on a cache miss).
+    """
+    key = (ref_id_a, ref_id_b)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    if ref_id_a == ref_id_b:
+        result = ([], False)
+    else:
+        result = diff(*load())
+    with _lock:
+        try:
+            _cache[key] = result
+        except ValueError:  # larger than the whole cache, not cached
+            pass
+    return result
+
+
+def clear():
+    with _lock:
+        _cache.clear()
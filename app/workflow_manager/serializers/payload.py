@@ -1,9 +1,12 @@
+from rest_framework import serializers
+
 from workflow_manager.serializers.base import (
     SerializersBase,
     OptionalFieldsMixin,
     OrcabusIdSerializerMetaMixin,
 )
 from workflow_manager.models import Payload
+from workflow_manager.models.payload import project_data
 
 
 class PayloadBaseSerializer(SerializersBase):
@@ -11,12 +14,68 @@ class PayloadBaseSerializer(SerializersBase):
 
 
 class PayloadListParamSerializer(OptionalFieldsMixin, PayloadBaseSerializer):
+    data_contains = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text=(
+            'JSON object the data contains, e.g. {"inputs": {"dataset": "X"}}. Repeat to require several. While '
+            "payloads are stored compressed, only top level keys with null, boolean, number or short string values."
+        ),
+    )
+    data_path = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text=(
+            "Path equality <key>.<key>...=<value>, e.g. inputs.dataset=X (the value is taken as JSON if it is a "
+            "number, boolean, null or quoted string). Repeat to require several. While payloads are stored "
+            "compressed, only top level keys (e.g. status=READY)."
+        ),
+    )
+
     class Meta(OrcabusIdSerializerMetaMixin):
         model = Payload
-        fields = "__all__"
+        exclude = Payload.STORAGE_FIELDS
+
+    paths = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text=(
+            "Only return the data at these paths <key>.<key>... (comma separated, e.g. outputs,inputs.dataset): "
+            "`data` is then an object of the values keyed by path (null if absent)."
+        ),
+    )
+    include_data = serializers.BooleanField(
+        required=False,
+        allow_null=True,
+        help_text="If 'false', the payloads are returned without their data.",
+    )
 
 
 class PayloadSerializer(PayloadBaseSerializer):
     class Meta(OrcabusIdSerializerMetaMixin):
         model = Payload
-        fields = "__all__"
+        exclude = Payload.STORAGE_FIELDS
+
+
+class PayloadMinSerializer(PayloadBaseSerializer):
+    class Meta(OrcabusIdSerializerMetaMixin):
+        model = Payload
+        exclude = ["data", *Payload.STORAGE_FIELDS]
+
+
+class PayloadProjectionSerializer(PayloadBaseSerializer):
+    """
+    The payload with the data at the requested paths only (see `PayloadViewSet`).
+    """
+
+    data = serializers.SerializerMethodField()
+
+    class Meta(OrcabusIdSerializerMetaMixin):
+        model = Payload
+        exclude = Payload.STORAGE_FIELDS
+
+    def get_data(self, obj) -> dict:
+        if obj.data_codec:
+            # the data column only holds the summary of compressed data, project the (decompressed) data instead
+            return project_data(obj.data, self.context["data_paths"])
+        return obj.data_projection
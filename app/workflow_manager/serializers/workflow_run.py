@@ -67,6 +67,21 @@ class WorkflowRunListQueryParamSerializer(WorkflowRunListParamSerializer):
         allow_blank=True,
         help_text="Filter by latest state status (e.g. SUCCEEDED, FAILED).",
     )
+    payload_contains = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text='Runs with a state whose payload data contains this JSON object, e.g. {"inputs": {"dataset": "X"}}.',
+    )
+    payload_path = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Runs with a state whose payload data has <key>.<key>...=<value>, e.g. inputs.dataset=X.",
+    )
+    payload_status = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text="Only match the payload filters against the states of this status (e.g. READY).",
+    )
     # Attribute names must match ``api_settings.SEARCH_PARAM`` / ``ORDERING_PARAM`` (defaults: search, ordering).
     search = serializers.CharField(
         required=False,
@@ -91,6 +106,9 @@ class WorkflowRunListQueryParamSerializer(WorkflowRunListParamSerializer):
             "end_time",
             "is_ongoing",
             "status",
+            "payload_contains",
+            "payload_path",
+            "payload_status",
             api_settings.SEARCH_PARAM,
             api_settings.ORDERING_PARAM,
         ]
@@ -13,23 +13,13 @@ from .base import *  # noqa
 logger = logging.getLogger(__name__)
 
 DEBUG = False
-PG_HOST = os.environ.get("PG_HOST")
-PG_USER = os.environ.get("PG_USER")
-PG_DB_NAME = os.environ.get("PG_DB_NAME")
-
-DATABASES = {
-    "default": {
-        "HOST": PG_HOST,
-        "USER": PG_USER,
-        "NAME": PG_DB_NAME,
-        "ENGINE": "django_iam_dbauth.aws.postgresql",
-        "OPTIONS": {
-            "use_iam_auth": True,
-            "sslmode": "require",
-            "resolve_cname_enabled": False,
-        },
-    }
-}
+from .database import (  # noqa
+    PG_HOST,
+    PG_USER,
+    PG_DB_NAME,
+    DATABASES,
+    DATABASE_READ_REPLICA,
+)
 
 CORS_ORIGIN_ALLOW_ALL = False
 CORS_ALLOW_CREDENTIALS = False
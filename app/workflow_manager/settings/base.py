@@ -36,6 +36,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "aws_xray_sdk.ext.django.middleware.XRayMiddleware",
+    "workflow_manager.db.middleware.SqlBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -45,6 +46,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "djangorestframework_camel_case.middleware.CamelCaseMiddleWare",
+    "workflow_manager.db.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "workflow_manager.urls.base"
@@ -74,6 +76,16 @@ DATABASES = {
     }
 }
 
+# Safe API requests read from this DB alias, if set (see workflow_manager.db.routers)
+DATABASE_READ_REPLICA = None
+
+DATABASE_ROUTERS = ["workflow_manager.db.routers.ReplicaRouter"]
+
+# Add the SQL budget of each request as `Server-Timing` response header (see workflow_manager.db.budget)
+SQL_BUDGET_SERVER_TIMING = (
+    os.getenv("SQL_BUDGET_SERVER_TIMING", "false").lower() == "true"
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""AWS database settings (RDS with IAM auth), shared by the aws and proc settings
+
+Kept free of any heavy imports, see settings.proc
+"""
+
+import copy
+import os
+
+PG_HOST = os.environ.get("PG_HOST")
+PG_USER = os.environ.get("PG_USER")
+PG_DB_NAME = os.environ.get("PG_DB_NAME")
+# read replica (e.g. an Aurora reader endpoint) for the API, optional
+PG_REPLICA_HOST = os.environ.get("PG_REPLICA_HOST")
+
+# Keep connections open across requests / Lambda invocations (checked before reuse), unless pooled (requires
+# psycopg[pool]; Django does not support persistent connections with a pool).
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 600))  # seconds
+DB_POOL = os.environ.get("DB_POOL", "false").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 4))
+
+DATABASES = {
+    "default": {
+        "HOST": PG_HOST,
+        "USER": PG_USER,
+        "NAME": PG_DB_NAME,
+        "ENGINE": "workflow_manager.db.postgresql",
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "use_iam_auth": True,
+            "sslmode": "require",
+            "resolve_cname_enabled": False,
+            **(
+                {"pool": {"min_size": DB_POOL_MIN_SIZE, "max_size": DB_POOL_MAX_SIZE}}
+                if DB_POOL
+                else {}
+            ),
+        },
+    }
+}
+
+if PG_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": PG_REPLICA_HOST,
+    }
+
+DATABASE_READ_REPLICA = "replica" if PG_REPLICA_HOST else None
@@ -15,5 +15,15 @@ DATABASES = {
         "PASSWORD": "orcabus",  # pragma: allowlist-secret
         "HOST": os.getenv("DB_HOSTNAME", "localhost"),
         "PORT": os.getenv("DB_PORT", 5435),
-    }
+    },
+    # a second, independent DB for the read replica routing tests (routing is off by default, see
+    # DATABASE_READ_REPLICA), only created for tests that use it
+    "replica": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": "workflow_manager_replica",
+        "USER": "orcabus",
+        "PASSWORD": "orcabus",  # pragma: allowlist-secret
+        "HOST": os.getenv("DB_HOSTNAME", "localhost"),
+        "PORT": os.getenv("DB_PORT", 5435),
+    },
 }
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""AWS Django settings for the event processing Lambdas (handle_wru_event, handle_aru_event)
+
+Lean profile that only installs the models and the DB backend. None of the API stack (admin, auth, sessions,
+messages, CORS, DRF, drf-spectacular, camel-case, X-Ray) is needed to process events, and all of it adds to
+the Lambda cold start. Do not add imports here that pull those in (guarded by test_proc_settings).
+
+Usage:
+- export DJANGO_SETTINGS_MODULE=workflow_manager.settings.proc
+"""
+
+import os
+import uuid
+
+from .database import PG_HOST, PG_USER, PG_DB_NAME, DATABASES  # noqa
+
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", uuid.uuid4())
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    "workflow_manager",
+]
+
+MIDDLEWARE = []
+
+USE_I18N = False
+
+TIME_ZONE = "UTC"
+
+USE_TZ = True
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "console": {
+            "format": "%(asctime)s %(name)-12s %(levelname)-8s %(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "console",
+        },
+    },
+    "loggers": {
+        "": {
+            "level": "INFO",
+            "handlers": ["console"],
+        },
+    },
+}
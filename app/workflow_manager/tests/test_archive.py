@@ -0,0 +1,248 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from workflow_manager import archive
+from workflow_manager.models import (
+    ArchivedWorkflowRun,
+    Comment,
+    LibraryAssociation,
+    Payload,
+    State,
+    WorkflowRun,
+)
+from workflow_manager.tests.factories import (
+    LibraryFactory,
+    WorkflowFactory,
+    WorkflowRunFactory,
+)
+from workflow_manager.urls.base import api_base
+from workflow_manager_proc.domain.event import wru
+from workflow_manager_proc.services import workflow_run
+
+
+def archive_workflow_runs(**options) -> str:
+    out = io.StringIO()
+    with redirect_stdout(out):
+        call_command("archive_workflow_runs", **options)
+    return out.getvalue()
+
+
+class ArchiveWorkflowRunsTests(TestCase):
+    endpoint = f"/{api_base}workflowrun"
+
+    def setUp(self):
+        self.workflow = WorkflowFactory()
+        self.library = LibraryFactory()
+        self.payload = Payload.objects.create(
+            payload_ref_id="ready",
+            version="1",
+            data={"inputs": {"dataset": "X", "sample_id": "S1"}},
+        )
+        old = timezone.now() - timedelta(days=400)
+        self.runs = {
+            "old_succeeded": self.create_run("1", old, ["READY", "SUCCEEDED"]),
+            "old_failed": self.create_run("2", old, ["READY", "FAILED", "RESOLVED"]),
+            "old_running": self.create_run("3", old, ["READY", "RUNNING"]),
+            "recent_succeeded": self.create_run(
+                "4", timezone.now() - timedelta(hours=3), ["READY", "SUCCEEDED"]
+            ),
+        }
+
+    def create_run(self, portal_run_id, start, statuses) -> WorkflowRun:
+        wfr = WorkflowRunFactory(
+            portal_run_id=portal_run_id,
+            execution_id=portal_run_id,
+            workflow_run_name=f"run{portal_run_id}",
+            workflow=self.workflow,
+        )
+        for i, status in enumerate(statuses):
+            State.objects.create(
+                workflow_run=wfr,
+                status=status,
+                timestamp=start + timedelta(hours=i),
+                payload=self.payload if status == "READY" else None,
+            )
+        LibraryAssociation.objects.create(
+            workflow_run=wfr,
+            library=self.library,
+            association_date=start,
+            status="ACTIVE",
+        )
+        Comment.objects.create(
+            workflow_run=wfr, text=f"comment {portal_run_id}", created_by="me"
+        )
+        return wfr
+
+    def test_archive(self):
+        """
+        python manage.py test workflow_manager.tests.test_archive.ArchiveWorkflowRunsTests.test_archive
+        """
+        out = archive_workflow_runs(dry_run=True)
+        self.assertIn("Would archive 2 workflow runs", out)
+        self.assertEqual(ArchivedWorkflowRun.objects.count(), 0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            export = os.path.join(tmp, "archive.ndjson.gz")
+            out = archive_workflow_runs(batch_size=1, export=export)
+            with gzip.open(export, "rt") as f:
+                exported = [json.loads(line) for line in f]
+
+        self.assertIn("Archived 2 workflow runs", out)
+        archived_ids = {
+            self.runs["old_succeeded"].orcabus_id,
+            self.runs["old_failed"].orcabus_id,
+        }
+        self.assertEqual(
+            set(ArchivedWorkflowRun.objects.values_list("orcabus_id", flat=True)),
+            archived_ids,
+        )
+        self.assertEqual({d["orcabus_id"] for d in exported}, archived_ids)
+        # moved out of the live tables, with their history
+        self.assertEqual(
+            set(WorkflowRun.objects.values_list("portal_run_id", flat=True)),
+            {"3", "4"},
+        )
+        self.assertEqual(State.objects.count(), 4)
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(LibraryAssociation.objects.count(), 2)
+        # the payload is shared with the remaining runs
+        self.assertTrue(Payload.objects.filter(pk=self.payload.pk).exists())
+
+        archived = ArchivedWorkflowRun.objects.get(
+            pk=self.runs["old_failed"].orcabus_id
+        )
+        self.assertEqual(archived.status, "RESOLVED")
+        document = archived.document
+        self.assertEqual(document["portal_run_id"], "2")
+        self.assertEqual(
+            [s["status"] for s in document["states"]], ["READY", "FAILED", "RESOLVED"]
+        )
+        self.assertEqual(document["payloads"][0]["data"], self.payload.data)
+        self.assertEqual(document["comments"][0]["text"], "comment 2")
+        self.assertEqual(
+            document["library_associations"][0]["library"], self.library.orcabus_id
+        )
+
+        # nothing left to archive
+        self.assertIn("Archived 0 workflow runs", archive_workflow_runs())
+
+    def test_archive_skips_runs_in_use(self):
+        """
+        python manage.py test workflow_manager.tests.test_archive.ArchiveWorkflowRunsTests.test_archive_skips_runs_in_use
+        """
+        with mock.patch.object(archive, "lock_runs", return_value=[]):
+            out = archive_workflow_runs()
+        self.assertIn("Archived 0 workflow runs (2 in use, skipped)", out)
+        self.assertEqual(WorkflowRun.objects.count(), 4)
+
+        out = archive_workflow_runs(older_than_days=0)
+        self.assertIn("Archived 3 workflow runs", out)
+
+    def test_read_through(self):
+        """
+        python manage.py test workflow_manager.tests.test_archive.ArchiveWorkflowRunsTests.test_read_through
+        """
+        wfr = self.runs["old_succeeded"]
+        response = self.client.get(f"{self.endpoint}/{wfr.orcabus_id}")
+        self.assertEqual(response.status_code, 200)
+        live = response.json()
+
+        archive_workflow_runs()
+        response = self.client.get(f"{self.endpoint}/{wfr.orcabus_id}")
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            f"{self.endpoint}/{wfr.orcabus_id}", {"include_archived": "true"}
+        )
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertTrue(result["archived"])
+        self.assertIn("archivedAt", result)
+        for key in [
+            "orcabusId",
+            "portalRunId",
+            "workflow",
+            "libraries",
+            "currentState",
+        ]:
+            self.assertEqual(result[key], live[key], key)
+        self.assertEqual(len(result["states"]), 2)
+        # the payload data is returned as is (not camel-cased)
+        self.assertEqual(result["payloads"][0]["data"], self.payload.data)
+
+        # live runs are still returned as such
+        response = self.client.get(
+            f"{self.endpoint}/{self.runs['old_running'].orcabus_id}",
+            {"include_archived": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("archived", response.json())
+        response = self.client.get(
+            f"{self.endpoint}/wfr.{'0' * 26}", {"include_archived": "true"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_through_payload_data_as_stored(self):
+        """
+        python manage.py test workflow_manager.tests.test_archive.ArchiveWorkflowRunsTests.test_read_through_payload_data_as_stored
+        """
+        self.payload.data = {
+            "under_score": "foo",
+            "key-with-dash": "bar",
+            "PascalCase": "bash",
+            "inputs": {"genome_type": "alt", "genomes": {"GRCh38_umccr": {"fa_1": 1}}},
+            "engineParameters": {"logs_uri": "s3://bucket/logs/"},
+        }
+        self.payload.save()
+        live = self.client.get(f"/{api_base}payload/{self.payload.orcabus_id}").json()
+
+        wfr = self.runs["old_succeeded"]
+        archive_workflow_runs()
+        response = self.client.get(
+            f"{self.endpoint}/{wfr.orcabus_id}", {"include_archived": "true"}
+        )
+        self.assertEqual(response.status_code, 200)
+        # the data as stored, the same as from /payload (only the keys of the run itself are camel-cased)
+        (payload_json,) = response.json()["payloads"]
+        self.assertEqual(payload_json["data"], self.payload.data)
+        self.assertEqual(payload_json["data"], live["data"])
+        self.assertEqual(payload_json["payloadRefId"], live["payloadRefId"])
+
+    def test_late_update_of_archived_run(self):
+        """
+        python manage.py test workflow_manager.tests.test_archive.ArchiveWorkflowRunsTests.test_late_update_of_archived_run
+        """
+        wfr = self.runs["old_succeeded"]
+        archive_workflow_runs()
+        self.assertFalse(WorkflowRun.objects.filter(portal_run_id="1").exists())
+
+        path = os.path.join(
+            os.path.dirname(workflow_run.__file__),
+            "..",
+            "tests",
+            "fixtures",
+            "WRU_min.json",
+        )
+        with open(path) as f:
+            event = wru.AWSEvent.model_validate(json.load(f)).detail
+        event.portalRunId = wfr.portal_run_id
+        event.workflow.orcabusId = self.workflow.orcabus_id
+
+        # ignored: no new live run with the portal run id of the archived one, nothing emitted
+        with mock.patch.object(workflow_run, "emit_model_event") as emit:
+            self.assertIsNone(workflow_run.create_workflow_run(event))
+        emit.assert_not_called()
+        self.assertFalse(WorkflowRun.objects.filter(portal_run_id="1").exists())
+        self.assertEqual(
+            ArchivedWorkflowRun.objects.filter(portal_run_id="1").count(), 1
+        )
@@ -0,0 +1,256 @@
+import io
+import threading
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+
+import ulid
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from workflow_manager.models import (
+    Library,
+    LibraryAssociation,
+    Payload,
+    State,
+    WorkflowRun,
+)
+from workflow_manager.tests.factories import WorkflowRunFactory
+
+
+def generate_synthetic_data(**options) -> str:
+    out = io.StringIO()
+    with redirect_stdout(out):
+        call_command("generate_synthetic_data", no_analyze=True, **options)
+    return out.getvalue()
+
+
+def snapshot() -> dict:
+    return {
+        "runs": list(
+            WorkflowRun.objects.order_by("portal_run_id").values_list(
+                "orcabus_id", "portal_run_id", "workflow__name", "execution_id"
+            )
+        ),
+        "states": list(
+            State.objects.order_by("orcabus_id").values_list(
+                "orcabus_id", "workflow_run_id", "status", "timestamp", "payload_id"
+            )
+        ),
+        "payloads": list(
+            Payload.objects.order_by("orcabus_id").values_list(
+                "orcabus_id", "payload_ref_id", "data"
+            )
+        ),
+        "associations": list(
+            LibraryAssociation.objects.order_by("orcabus_id").values_list(
+                "workflow_run_id", "library_id"
+            )
+        ),
+    }
+
+
+class GenerateSyntheticDataTests(TestCase):
+
+    def test_generate(self):
+        """
+        python manage.py test workflow_manager.tests.test_commands.GenerateSyntheticDataTests.test_generate
+        """
+        out = generate_synthetic_data(runs=250, libraries=500, chunk_size=100)
+
+        self.assertIn("250/250 runs", out)
+        self.assertEqual(WorkflowRun.objects.count(), 250)
+        self.assertEqual(Library.objects.count(), 500)
+        self.assertEqual(WorkflowRun.contexts.through.objects.count(), 500)
+        # every run has a state history, starting with DRAFT, and at least one library
+        self.assertEqual(
+            State.objects.filter(status="DRAFT").values("workflow_run").count(), 250
+        )
+        self.assertGreaterEqual(State.objects.count(), 250)
+        self.assertGreaterEqual(LibraryAssociation.objects.count(), 250)
+        # states link the payloads of their run
+        self.assertEqual(
+            State.objects.filter(payload__isnull=False).count(), Payload.objects.count()
+        )
+
+        # the data is usable through the ORM
+        wfr = WorkflowRun.objects.order_by("portal_run_id").first()
+        self.assertTrue(wfr.orcabus_id.startswith("wfr."))
+        self.assertEqual(wfr.get_all_states()[0].status, "DRAFT")
+        self.assertIn(
+            "engineParameters", wfr.states.filter(payload__isnull=False)[0].payload.data
+        )
+
+    def test_deterministic(self):
+        """
+        python manage.py test workflow_manager.tests.test_commands.GenerateSyntheticDataTests.test_deterministic
+        """
+        generate_synthetic_data(runs=50, libraries=100, seed=7, chunk_size=20)
+        first = snapshot()
+
+        # loading the same seed again is refused
+        self.assertIn("clean the DB first", generate_synthetic_data(runs=50, seed=7))
+
+        for model in [LibraryAssociation, State, Payload, WorkflowRun, Library]:
+            model.objects.all().delete()
+        # the chunk size does not change the data
+        generate_synthetic_data(runs=50, libraries=100, seed=7, chunk_size=50)
+        self.assertEqual(snapshot(), first)
+
+        for model in [LibraryAssociation, State, Payload, WorkflowRun, Library]:
+            model.objects.all().delete()
+        generate_synthetic_data(runs=50, libraries=100, seed=8)
+        self.assertNotEqual(snapshot()["runs"], first["runs"])
+
+
+def compress_payloads(**options) -> str:
+    out = io.StringIO()
+    with redirect_stdout(out):
+        call_command("compress_payloads", **options)
+    return out.getvalue()
+
+
+class CompressPayloadsTests(TestCase):
+
+    def test_compress_payloads(self):
+        """
+        python manage.py test workflow_manager.tests.test_commands.CompressPayloadsTests.test_compress_payloads
+        """
+        large = {
+            "status": "READY",
+            "files": [f"s3://bucket/{i}.bam" for i in range(500)],
+        }
+        for i in range(5):
+            Payload.objects.create(payload_ref_id=f"large{i}", version="1", data=large)
+        Payload.objects.create(payload_ref_id="small", version="1", data={"a": 1})
+
+        out = compress_payloads(min_bytes=1000, batch_size=2, dry_run=True)
+        self.assertIn("Would convert 5 of 5 payloads", out)
+        self.assertFalse(Payload.objects.filter(data_codec__isnull=False).exists())
+
+        out = compress_payloads(min_bytes=1000, batch_size=2)
+        self.assertIn("Converted 5 of 5 payloads", out)
+        saved = int(out.split(" bytes (")[0].rsplit(" ", 1)[1])
+        self.assertGreater(saved, 0)
+        self.assertEqual(Payload.objects.filter(data_codec="zlib").count(), 5)
+        # only the summary is left in the column
+        self.assertEqual(Payload.objects.filter(data__files__isnull=True).count(), 6)
+        for pld in Payload.objects.all():
+            self.assertEqual(
+                pld.data, {"a": 1} if pld.payload_ref_id == "small" else large
+            )
+
+        # nothing left to do
+        self.assertIn("Converted 0 of 0 payloads", compress_payloads(min_bytes=1000))
+
+        out = compress_payloads(decompress=True)
+        self.assertIn("Converted 5 of 5 payloads", out)
+        self.assertFalse(Payload.objects.filter(data_codec__isnull=False).exists())
+        self.assertEqual(Payload.objects.filter(data__files__isnull=False).count(), 5)
+
+
+def delete_orphan_payloads(**options) -> str:
+    out = io.StringIO()
+    with redirect_stdout(out):
+        call_command("delete_orphan_payloads", **options)
+    return out.getvalue()
+
+
+def old_payload(ref_id: str, hours: int = 2) -> Payload:
+    created = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return Payload.objects.create(
+        orcabus_id=ulid.from_timestamp(created.timestamp()).str,
+        payload_ref_id=ref_id,
+        version="1",
+        data={"ref": ref_id},
+    )
+
+
+class DeleteOrphanPayloadsTests(TestCase):
+
+    def test_delete_orphan_payloads(self):
+        """
+        python manage.py test workflow_manager.tests.test_commands.DeleteOrphanPayloadsTests.test_delete_orphan_payloads
+        """
+        wfr = WorkflowRunFactory()
+        for i in range(5):
+            State.objects.create(
+                workflow_run=wfr,
+                status=f"STATUS{i}",
+                timestamp="2025-01-01T00:00:00Z",
+                payload=old_payload(f"used{i}"),
+            )
+        orphans = [old_payload(f"orphan{i}") for i in range(7)]
+        # too recent, may be about to be referenced
+        recent = Payload.objects.create(
+            payload_ref_id="recent", version="1", data={"ref": "recent"}
+        )
+
+        out = delete_orphan_payloads(batch_size=3, dry_run=True)
+        self.assertIn("Would delete 7 orphan payloads", out)
+        self.assertEqual(Payload.objects.count(), 13)
+
+        out = delete_orphan_payloads(batch_size=3)
+        self.assertIn("Deleted 7 orphan payloads, reclaimed ", out)
+        reclaimed = int(out.split("reclaimed ")[1].split(" ")[0])
+        self.assertGreater(reclaimed, 0)
+        self.assertFalse(
+            Payload.objects.filter(pk__in=[p.pk for p in orphans]).exists()
+        )
+        self.assertEqual(
+            set(Payload.objects.values_list("payload_ref_id", flat=True)),
+            {"recent", *[f"used{i}" for i in range(5)]},
+        )
+        self.assertEqual(State.objects.filter(payload__isnull=False).count(), 5)
+
+        self.assertIn("Deleted 0 orphan payloads", delete_orphan_payloads())
+        delete_orphan_payloads(min_age_hours=-1)
+        self.assertFalse(Payload.objects.filter(pk=recent.pk).exists())
+
+
+class DeleteOrphanPayloadsConcurrencyTests(TransactionTestCase):
+    """
+    Deletes orphan payloads while one of them is reused by a state being ingested (in another transaction).
+
+    python manage.py test workflow_manager.tests.test_commands.DeleteOrphanPayloadsConcurrencyTests
+    """
+
+    def test_reused_payload_is_kept(self):
+        orphan = old_payload("orphan")
+        other = old_payload("other")
+        wfr = WorkflowRunFactory()
+        locked, deleted = threading.Event(), threading.Event()
+        errors = []
+
+        def ingest():
+            try:
+                with transaction.atomic():
+                    pld = Payload(
+                        payload_ref_id="orphan", version="1", data={"ref": "orphan"}
+                    )
+                    self.assertFalse(Payload.objects.get_or_insert(pld))
+                    locked.set()
+                    deleted.wait(10)
+                    State.objects.create(
+                        workflow_run=wfr,
+                        status="READY",
+                        timestamp="2025-01-01T00:00:00Z",
+                        payload=pld,
+                    )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                locked.set()
+                connection.close()
+
+        thread = threading.Thread(target=ingest)
+        thread.start()
+        locked.wait(10)
+        out = delete_orphan_payloads()
+        deleted.set()
+        thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertIn("Deleted 1 orphan payloads", out)
+        self.assertFalse(Payload.objects.filter(pk=other.pk).exists())
+        self.assertEqual(State.objects.get().payload_id, orphan.pk)
@@ -0,0 +1,475 @@
+import importlib.util
+import io
+import json
+import unittest
+from unittest import mock
+
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, override_settings
+
+from workflow_manager import db
+from workflow_manager.db import budget, iam_auth, routers
+from workflow_manager.db.budget import SqlBudgetExceeded, sql_budget
+from workflow_manager.db.postgresql.base import DatabaseWrapper, IamAuthConnection
+from workflow_manager.models import Comment, State, Workflow
+from workflow_manager.tests.factories import (
+    StateFactory,
+    WorkflowFactory,
+    WorkflowRunFactory,
+)
+from workflow_manager.urls.base import api_base
+
+
+def make_wrapper(conn_max_age=600, **options) -> DatabaseWrapper:
+    """A separate connection to the (local) test DB, through the IAM auth backend."""
+    settings_dict = {
+        **connection.settings_dict,
+        "ENGINE": "workflow_manager.db.postgresql",
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": options,
+    }
+    return DatabaseWrapper(settings_dict, alias="db_tests")
+
+
+class IamAuthTokenTests(TestCase):
+
+    def setUp(self) -> None:
+        iam_auth.clear()
+        db.reset_connection_stats()
+        self.client_mock = mock.patch.object(iam_auth, "_rds_client")
+        self.rds_client_factory = self.client_mock.start()
+        self.rds_client = self.rds_client_factory.return_value
+        self.rds_client.generate_db_auth_token.side_effect = lambda **kw: str(
+            self.rds_client.generate_db_auth_token.call_count
+        )
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.client_mock.stop()
+        iam_auth.clear()
+        super().tearDown()
+
+    def test_token_cached(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.IamAuthTokenTests.test_token_cached
+        """
+        token = iam_auth.get_token("db.local", 5432, "orcabus", resolve_cname=False)
+        self.assertEqual(
+            token, iam_auth.get_token("db.local", 5432, "orcabus", resolve_cname=False)
+        )
+        self.rds_client.generate_db_auth_token.assert_called_once_with(
+            DBHostname="db.local", Port=5432, DBUsername="orcabus"
+        )
+
+        # a token per DB user
+        iam_auth.get_token("db.local", 5432, "other", resolve_cname=False)
+        self.assertEqual(self.rds_client.generate_db_auth_token.call_count, 2)
+
+        stats = db.connection_stats()
+        self.assertEqual(stats["iam_tokens"], 2)
+        self.assertEqual(stats["iam_token_cache_hits"], 1)
+
+    def test_token_refreshed_before_expiry(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.IamAuthTokenTests.test_token_refreshed_before_expiry
+        """
+        with mock.patch.object(iam_auth.time, "monotonic", return_value=1000.0):
+            token = iam_auth.get_token("db.local", resolve_cname=False)
+
+        expires = 1000.0 + iam_auth.IAM_TOKEN_TTL
+        with mock.patch.object(iam_auth.time, "monotonic", return_value=expires - 1):
+            self.assertEqual(token, iam_auth.get_token("db.local", resolve_cname=False))
+        with mock.patch.object(iam_auth.time, "monotonic", return_value=expires):
+            self.assertNotEqual(
+                token, iam_auth.get_token("db.local", resolve_cname=False)
+            )
+
+        self.assertEqual(self.rds_client.generate_db_auth_token.call_count, 2)
+
+    def test_connect_with_iam_auth(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.IamAuthTokenTests.test_connect_with_iam_auth
+        """
+        # the local DB takes the password as "token"
+        self.rds_client.generate_db_auth_token.side_effect = None
+        self.rds_client.generate_db_auth_token.return_value = connection.settings_dict[
+            "PASSWORD"
+        ]
+        wrapper = make_wrapper(use_iam_auth=True, resolve_cname_enabled=False)
+        try:
+            for _ in range(3):
+                wrapper.ensure_connection()
+                wrapper.close()
+        finally:
+            wrapper.close()
+
+        # three connections, one token
+        self.rds_client.generate_db_auth_token.assert_called_once()
+        stats = db.connection_stats()
+        self.assertEqual(stats["connections"], 3)
+        self.assertEqual(stats["iam_tokens"], 1)
+        self.assertEqual(stats["iam_token_cache_hits"], 2)
+
+    def test_iam_auth_options_not_passed_to_psycopg(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.IamAuthTokenTests.test_iam_auth_options_not_passed_to_psycopg
+        """
+        wrapper = make_wrapper(
+            use_iam_auth=True, region_name="ap-southeast-2", resolve_cname_enabled=False
+        )
+        params = wrapper.get_connection_params()
+
+        for option in ["use_iam_auth", "region_name", "resolve_cname_enabled"]:
+            self.assertNotIn(option, params)
+        self.assertEqual(params["password"], "1")
+        self.rds_client_factory.assert_called_with("ap-southeast-2")
+
+    def test_pool_connection_class(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.IamAuthTokenTests.test_pool_connection_class
+        """
+        wrapper = make_wrapper(
+            conn_max_age=0, use_iam_auth=True, resolve_cname_enabled=False, pool=True
+        )
+        connection_class = wrapper.settings_dict["OPTIONS"]["pool"]["connection_class"]
+
+        self.assertTrue(issubclass(connection_class, IamAuthConnection))
+        self.assertEqual(
+            connection_class.iam_options,
+            {"use_iam_auth": True, "resolve_cname_enabled": False},
+        )
+
+
+class ConnectionReuseTests(TestCase):
+
+    def setUp(self) -> None:
+        db.reset_connection_stats()
+        self.wrapper = make_wrapper()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.wrapper.close()
+        super().tearDown()
+
+    def query(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_connection_reused(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ConnectionReuseTests.test_connection_reused
+        """
+        pid = self.query()
+        for _ in range(3):
+            # what happens between two requests / Lambda invocations
+            self.wrapper.close_if_unusable_or_obsolete()
+            self.assertEqual(pid, self.query())
+
+        stats = db.connection_stats()
+        self.assertEqual(stats["connections"], 1)
+        self.assertGreater(stats["connect_total_s"], 0)
+        self.assertEqual(stats["connect_max_s"], stats["connect_last_s"])
+
+    def test_broken_connection_replaced(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ConnectionReuseTests.test_broken_connection_replaced
+        """
+        pid = self.query()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        # the health check notices the connection is gone and reconnects
+        self.wrapper.close_if_unusable_or_obsolete()
+        self.assertNotEqual(pid, self.query())
+        self.assertEqual(db.connection_stats()["connections"], 2)
+
+    def test_connection_max_age(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ConnectionReuseTests.test_connection_max_age
+        """
+        self.wrapper = make_wrapper(conn_max_age=0)
+        pid = self.query()
+        self.wrapper.close_if_unusable_or_obsolete()
+        self.assertNotEqual(pid, self.query())
+        self.assertEqual(db.connection_stats()["connections"], 2)
+
+    def test_refresh_connections_in_transaction(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ConnectionReuseTests.test_refresh_connections_in_transaction
+        """
+        # the test runs in a transaction, which must not be cut short
+        pg_connection = connection.connection
+        db.refresh_connections()
+        self.assertIs(pg_connection, connection.connection)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("psycopg_pool"), "requires psycopg[pool]"
+    )
+    def test_pool(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ConnectionReuseTests.test_pool
+        """
+        self.wrapper = make_wrapper(conn_max_age=0, pool={"min_size": 1, "max_size": 2})
+        try:
+            pid = self.query()
+            self.wrapper.close()
+            self.assertEqual(pid, self.query())
+        finally:
+            self.wrapper.close()
+            self.wrapper.close_pool()
+
+
+@override_settings(DATABASE_READ_REPLICA="replica")
+class ReplicaRoutingTests(TestCase):
+    """
+    The "replica" here is a second, independent test DB, so where a read went shows in what it returns.
+    """
+
+    databases = {"default", "replica"}
+    endpoint = f"/{api_base}workflowrun"
+
+    def setUp(self) -> None:
+        routers.reset_replica_availability()
+        self.wf = WorkflowFactory()
+        self.wfr = WorkflowRunFactory(workflow=self.wf)
+        StateFactory(workflow_run=self.wfr)
+        Workflow(
+            orcabus_id="01J5M2JFE1JPYV62RYQEG99REP",
+            name="ReplicaWorkflow",
+            version="1.0",
+            execution_engine_pipeline_id="pipeline",
+            execution_engine="ICA",
+        ).save(using="replica")
+        super().setUp()
+
+    def tearDown(self) -> None:
+        routers.reset_replica_availability()
+        super().tearDown()
+
+    def workflow_names(self):
+        response = self.client.get(f"/{api_base}workflow/")
+        self.assertEqual(response.status_code, 200)
+        return [w["name"] for w in response.json()["results"]]
+
+    def test_safe_requests_read_from_replica(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_safe_requests_read_from_replica
+        """
+        self.assertEqual(self.workflow_names(), ["ReplicaWorkflow"])
+        # only for the duration of the request
+        self.assertEqual(Workflow.objects.get().name, self.wf.name)
+
+    def test_no_replica_configured(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_no_replica_configured
+        """
+        with self.settings(DATABASE_READ_REPLICA=None):
+            self.assertEqual(self.workflow_names(), [self.wf.name])
+
+    def test_read_your_writes_on_primary(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_read_your_writes_on_primary
+        """
+        response = self.client.get(f"{self.endpoint}/{self.wfr.orcabus_id}/state/")
+        self.assertEqual(len(response.json()), 1)
+
+        response = self.client.post(
+            f"{self.endpoint}/{self.wfr.orcabus_id}/comment/",
+            data={"text": "New comment", "created_by": "tester"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Comment.objects.using("replica").count(), 0)
+
+        response = self.client.get(f"{self.endpoint}/{self.wfr.orcabus_id}/comment/")
+        self.assertEqual([c["text"] for c in response.json()], ["New comment"])
+
+    def test_fallback_to_primary(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_fallback_to_primary
+        """
+        with mock.patch.object(
+            connections["replica"],
+            "ensure_connection",
+            side_effect=OperationalError("replica down"),
+        ) as ensure_connection:
+            self.assertEqual(self.workflow_names(), [self.wf.name])
+            self.assertEqual(self.workflow_names(), [self.wf.name])
+
+        # not retried straight away
+        ensure_connection.assert_called_once()
+
+        with mock.patch.object(routers.time, "monotonic", return_value=10**9):
+            self.assertEqual(self.workflow_names(), ["ReplicaWorkflow"])
+
+    def test_replica_checked_once_per_request(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_replica_checked_once_per_request
+        """
+        with mock.patch(
+            "workflow_manager.db.middleware.get_replica_alias",
+            wraps=routers.get_replica_alias,
+        ) as get_replica_alias:
+            # a page of the list: its count and its records, both from the replica
+            self.assertEqual(self.workflow_names(), ["ReplicaWorkflow"])
+        get_replica_alias.assert_called_once()
+
+    def test_replica_fails_during_request(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_replica_fails_during_request
+        """
+        with mock.patch.object(
+            connections["replica"],
+            "cursor",
+            side_effect=OperationalError("replica gone"),
+        ) as cursor:
+            # the request is served again, from the primary
+            self.assertEqual(self.workflow_names(), [self.wf.name])
+            self.assertEqual(self.workflow_names(), [self.wf.name])
+        # and the replica is not used again straight away
+        cursor.assert_called_once()
+
+    def test_read_from_replica(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.ReplicaRoutingTests.test_read_from_replica
+        """
+        with routers.read_from_replica():
+            self.assertEqual(State.objects.count(), 0)
+            with routers.read_from_primary():
+                self.assertEqual(State.objects.count(), 1)
+            # writes always go to the primary
+            self.assertEqual(
+                routers.ReplicaRouter().db_for_write(State), connection.alias
+            )
+        self.assertEqual(State.objects.count(), 1)
+
+
+class SqlBudgetTests(TestCase):
+
+    def setUp(self) -> None:
+        self.wf = WorkflowFactory()
+        super().setUp()
+
+    def test_sql_budget(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.SqlBudgetTests.test_sql_budget
+        """
+        with sql_budget("test", report=False) as b:
+            Workflow.objects.count()
+            list(State.objects.all())
+            with budget.phase("serialization"):
+                pass
+            with budget.phase("serialization"):
+                pass
+            budget.count("wrscPayloadReferenced")
+            budget.count("wrscPayloadReferenced", 2)
+
+        self.assertEqual(b.queries, 2)
+        self.assertGreater(b.db_s, 0)
+        self.assertGreaterEqual(b.total_s, b.db_s)
+        self.assertEqual(len(b.slowest), 2)
+        self.assertIn("workflow_manager_", b.slowest[0]["sql"])
+        self.assertIn("serializationMs", b.metrics())
+        self.assertEqual(b.metrics()["wrscPayloadReferenced"], 3)
+        self.assertIsNone(budget.current_budget())
+        self.assertEqual(b.exceeded(), [])
+
+        # nothing to record outside of a budget
+        with budget.phase("serialization"):
+            Workflow.objects.count()
+        budget.count("wrscPayloadReferenced")
+
+    def test_strict_budget(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.SqlBudgetTests.test_strict_budget
+        """
+        with self.assertRaisesRegex(SqlBudgetExceeded, "2 queries > 1"):
+            with sql_budget("test", max_queries=1, strict=True):
+                Workflow.objects.count()
+                Workflow.objects.count()
+
+        with self.assertLogs(budget.logger, "WARNING") as logs:
+            with sql_budget("test", max_queries=1):
+                Workflow.objects.count()
+                Workflow.objects.count()
+        self.assertIn("SQL budget of 'test' exceeded", logs.output[-1])
+
+    def test_emf(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.SqlBudgetTests.test_emf
+        """
+        with (
+            mock.patch.object(budget, "SQL_METRICS", "emf"),
+            mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+        ):
+            with sql_budget("handle_wru_event"):
+                Workflow.objects.count()
+                with budget.phase("serialization"):
+                    pass
+                budget.count("wrscPayloadInlined")
+
+        emf = json.loads(stdout.getvalue())
+        self.assertEqual(emf["Operation"], "handle_wru_event")
+        self.assertEqual(emf["SqlQueries"], 1)
+        metrics = emf["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(metrics["Dimensions"], [["Operation"]])
+        self.assertEqual(
+            [m["Name"] for m in metrics["Metrics"]],
+            [
+                "SqlQueries",
+                "DbTime",
+                "Duration",
+                "SerializationTime",
+                "WrscPayloadInlined",
+            ],
+        )
+        self.assertEqual(emf["WrscPayloadInlined"], 1)
+
+    def test_report_on_error(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.SqlBudgetTests.test_report_on_error
+        """
+        with (
+            mock.patch.object(budget, "SQL_METRICS", "emf"),
+            mock.patch("sys.stdout", new_callable=io.StringIO) as stdout,
+        ):
+            with self.assertRaises(ValueError):
+                with sql_budget("handle_wru_event", max_queries=0, strict=True):
+                    Workflow.objects.count()
+                    raise ValueError("event failed")
+
+        emf = json.loads(stdout.getvalue())
+        self.assertEqual(emf["Operation"], "handle_wru_event")
+        self.assertEqual(emf["SqlQueries"], 1)
+
+    def test_middleware(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.SqlBudgetTests.test_middleware
+        """
+        with (
+            self.settings(SQL_BUDGET_SERVER_TIMING=True),
+            self.assertLogs(budget.logger, "INFO") as logs,
+        ):
+            response = self.client.get(f"/{api_base}workflow/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[0-9.]+;desc="2 queries", render;dur=[0-9.]+$',
+        )
+        metrics = json.loads(logs.records[-1].getMessage())["sqlBudget"]
+        self.assertEqual(metrics["name"], "GET workflow-list")
+        self.assertEqual(metrics["queries"], 2)
+
+        response = self.client.get(f"/{api_base}workflow/")
+        self.assertNotIn("Server-Timing", response)
+
+    def test_endpoint_budget(self):
+        """
+        python manage.py test workflow_manager.tests.test_db.SqlBudgetTests.test_endpoint_budget
+        """
+        # how tests hold an endpoint to its budget
+        with sql_budget("GET workflow-list", max_queries=2, strict=True):
+            self.client.get(f"/{api_base}workflow/")
@@ -9,6 +9,7 @@ from workflow_manager.aws_event_bridge.event import (
     EventBridgePublishError,
     emit_wrsc_api_event,
 )
+from workflow_manager_proc.domain.event import wrsc
 
 
 class WrscApiEventTestCase(SimpleTestCase):
@@ -84,3 +85,19 @@ class WrscApiEventTestCase(SimpleTestCase):
         logged = " ".join(logs.output)
         self.assertIn("wrsc-event-id", logged)
         self.assertIn("attempt=3", logged)
+
+    @patch.dict(os.environ, {"EVENT_BUS_NAME": "test-event-bus"})
+    @patch("workflow_manager.aws_event_bridge.event.libeb.emit_event")
+    def test_emit_wrsc_api_event_model(self, mock_emit_event):
+        mock_emit_event.return_value = {"FailedEntryCount": 0, "Entries": [{}]}
+        event = wrsc.WorkflowRunStateChange.model_validate(self.build_event())
+
+        # a model instance is emitted as is, without validating it again
+        with patch(
+            "workflow_manager.aws_event_bridge.event.type_adapter",
+            side_effect=AssertionError("validated again"),
+        ):
+            emit_wrsc_api_event(event)
+
+        detail = mock_emit_event.call_args.args[0]["Detail"]
+        self.assertEqual(detail, event.model_dump_json(exclude_none=True))
@@ -0,0 +1,126 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.test import TestCase
+
+from workflow_manager import fingerprint
+from workflow_manager.models import Payload, State
+from workflow_manager_proc.domain.event import wrsc
+
+
+def make_wrsc(**kwargs) -> wrsc.WorkflowRunStateChange:
+    event = {
+        "id": "",
+        "version": "1.0.0",
+        "timestamp": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "orcabusId": "wfr.01J5M2JFE1JPYV62RYQEG99CP1",
+        "portalRunId": "20250101abcdef01",
+        "workflowRunName": "umccr--automated--wgs--20250101abcdef01",
+        "workflow": {
+            "orcabusId": "wfl.01J5M2JFE1JPYV62RYQEG99CP2",
+            "name": "wgs",
+            "version": "4.2.0",
+            "codeVersion": "0.0.0",
+            "executionEngine": "ICA",
+            "executionEnginePipelineId": "pipeline",
+            "validationState": "VALIDATED",
+        },
+        "libraries": [
+            {
+                "orcabusId": "lib.01J5M2JFE1JPYV62RYQEG99CP3",
+                "libraryId": "L2400001",
+                "readsets": [
+                    {"orcabusId": "fqr.01J5M2JFE1JPYV62RYQEG99CP4", "rgid": "A.1"}
+                ],
+            },
+            {"orcabusId": "lib.01J5M2JFE1JPYV62RYQEG99CP5", "libraryId": "L2400002"},
+        ],
+        "computeEnv": "research",
+        "storageEnv": "clinical",
+        "status": "SUCCEEDED",
+    }
+    event.update(kwargs)
+    return wrsc.WorkflowRunStateChange.model_validate(event)
+
+
+class FingerprintTests(TestCase):
+
+    def test_scheme_1_compatible(self):
+        """
+        python manage.py test workflow_manager.tests.test_fingerprint.FingerprintTests.test_scheme_1_compatible
+        """
+        out_wrsc = make_wrsc()
+        keywords = sorted(
+            [
+                "1.0.0",
+                "wfr.01J5M2JFE1JPYV62RYQEG99CP1",
+                "20250101abcdef01",
+                "umccr--automated--wgs--20250101abcdef01",
+                "SUCCEEDED",
+                "wfl.01J5M2JFE1JPYV62RYQEG99CP2",
+                "lib.01J5M2JFE1JPYV62RYQEG99CP3",
+                "fqr.01J5M2JFE1JPYV62RYQEG99CP4",
+                "lib.01J5M2JFE1JPYV62RYQEG99CP5",
+                "research",
+                "clinical",
+            ]
+        )
+        self.assertEqual(
+            fingerprint.wrsc_fingerprint(out_wrsc, scheme=1),
+            hashlib.md5("".join(keywords).encode()).hexdigest(),
+        )
+
+        state = State(status="RUNNING", comment=None)
+        self.assertEqual(
+            fingerprint.state_fingerprint(state, scheme=1),
+            hashlib.md5(b"comment=Nonestatus=RUNNING").hexdigest(),
+        )
+
+    def test_scheme_2_field_tagged(self):
+        """
+        python manage.py test workflow_manager.tests.test_fingerprint.FingerprintTests.test_scheme_2_field_tagged
+        """
+        a = make_wrsc(computeEnv="research", storageEnv="clinical")
+        b = make_wrsc(computeEnv="clinical", storageEnv="research")
+
+        # scheme 1 does not know in which field a value is
+        self.assertEqual(
+            fingerprint.wrsc_fingerprint(a, scheme=1),
+            fingerprint.wrsc_fingerprint(b, scheme=1),
+        )
+        fp_a = fingerprint.wrsc_fingerprint(a, scheme=2)
+        self.assertNotEqual(fp_a, fingerprint.wrsc_fingerprint(b, scheme=2))
+        self.assertRegex(fp_a, r"^v2\.[0-9a-f]{32}$")
+
+        # values can not run into each other either
+        self.assertNotEqual(
+            fingerprint.digest("x", [("a", "bc"), ("b", "d")], scheme=2),
+            fingerprint.digest("x", [("a", "b"), ("b", "cd")], scheme=2),
+        )
+
+    def test_order_insensitive(self):
+        """
+        python manage.py test workflow_manager.tests.test_fingerprint.FingerprintTests.test_order_insensitive
+        """
+        a = make_wrsc()
+        b = make_wrsc(libraries=list(reversed(a.model_dump()["libraries"])))
+        for scheme in fingerprint.SCHEMES:
+            self.assertEqual(
+                fingerprint.wrsc_fingerprint(a, scheme=scheme),
+                fingerprint.wrsc_fingerprint(b, scheme=scheme),
+            )
+
+    def test_state_fingerprint(self):
+        """
+        python manage.py test workflow_manager.tests.test_fingerprint.FingerprintTests.test_state_fingerprint
+        """
+        for scheme in fingerprint.SCHEMES:
+            state = State(status="RUNNING", comment="restarted")
+            base = fingerprint.state_fingerprint(state, scheme=scheme)
+            state.payload = Payload(payload_ref_id="0" * 64, version="1", data={})
+            self.assertNotEqual(
+                base, fingerprint.state_fingerprint(state, scheme=scheme)
+            )
+
+        with self.assertRaises(ValueError):
+            fingerprint.state_fingerprint(state, scheme=3)
@@ -1,7 +1,8 @@
 import logging
 import uuid
+from unittest import mock
 
-from django.core.exceptions import ValidationError
+from django.core.exceptions import FieldError, ValidationError
 from django.test import TestCase
 from django.utils import timezone
 
@@ -12,11 +13,13 @@ from workflow_manager.models import (
     Comment,
     Library,
     LibraryAssociation,
+    Payload,
     Readset,
     RunContext,
     Workflow,
     WorkflowRun,
 )
+from workflow_manager.models import payload
 from workflow_manager.models.analysis_context import AnalysisContextUseCase
 from workflow_manager.models.run_context import RunContextUseCase
 
@@ -202,6 +205,255 @@ class WorkflowModelTests(TestCase):
         self.assertEqual(rs.library_orcabus_id, "lib.01J8ES4ZDRQAP2BN3SDYYV5PKW")
 
 
+class OrcaBusBaseModelSaveTests(TestCase):
+
+    def test_save_without_reload(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.OrcaBusBaseModelSaveTests.test_save_without_reload
+        """
+        from workflow_manager.tests.factories import WorkflowRunFactory
+
+        wfr = WorkflowRunFactory()
+        lib = Library.objects.create(library_id="L000001")
+        self.assertTrue(lib.orcabus_id.startswith("lib."))
+
+        # FK given as a plain ULID ends up prefixed, like after a reload from the DB
+        la = LibraryAssociation(
+            workflow_run_id=wfr.orcabus_id[-26:],
+            library=lib,
+            association_date=timezone.now(),
+            status="ACTIVE",
+        )
+        with self.assertNumQueries(0):
+            la.lean_clean()
+        la.save()
+        la_db = LibraryAssociation.objects.get(pk=la.orcabus_id)
+        self.assertEqual(la.orcabus_id, la_db.orcabus_id)
+        self.assertEqual(la.workflow_run_id, la_db.workflow_run_id)
+        self.assertEqual(la.workflow_run_id, wfr.orcabus_id)
+
+        # no SELECT after the INSERT anymore
+        c = Comment(workflow_run=wfr, text="foo", created_by="bar")
+        c.full_clean()
+        with self.assertNumQueries(3):  # FK + unique (PK) validation, INSERT
+            c.save()
+        self.assertTrue(c.orcabus_id.startswith("cmt."))
+
+    def test_bulk_create_validated(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.OrcaBusBaseModelSaveTests.test_bulk_create_validated
+        """
+        with self.assertNumQueries(1):
+            libs = Library.objects.bulk_create_validated(
+                [Library(library_id=f"L00000{i}") for i in range(5)]
+            )
+        self.assertEqual(Library.objects.count(), 5)
+        for lib in libs:
+            self.assertTrue(lib.orcabus_id.startswith("lib."))
+            self.assertFalse(lib._state.adding)
+
+        with self.assertRaises(ValidationError):
+            Library.objects.bulk_create_validated([Library(library_id=None)])
+        self.assertEqual(Library.objects.count(), 5)
+
+
+class InsertOnConflictTests(TestCase):
+
+    def test_insert_on_conflict(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.InsertOnConflictTests.test_insert_on_conflict
+        """
+        pld = Payload(payload_ref_id="abc", version="1.0.0", data={"foo": "bar"})
+        with self.assertNumQueries(1):
+            inserted = Payload.objects.insert_on_conflict(
+                pld, ["payload_ref_id", "version"]
+            )
+        self.assertTrue(inserted)
+        self.assertTrue(pld.orcabus_id.startswith("pld."))
+        self.assertFalse(pld._state.adding)
+        self.assertEqual(Payload.objects.get(pk=pld.orcabus_id).data, {"foo": "bar"})
+
+        # DO NOTHING on conflict leaves the instance untouched
+        dup = Payload(payload_ref_id="abc", version="1.0.0", data={"foo": "bar"})
+        self.assertIsNone(
+            Payload.objects.insert_on_conflict(dup, ["payload_ref_id", "version"])
+        )
+        self.assertTrue(dup._state.adding)
+
+        # get_or_insert resolves to the existing record instead
+        self.assertFalse(Payload.objects.get_or_insert(dup))
+        self.assertEqual(dup.orcabus_id, pld.orcabus_id)
+        self.assertEqual(Payload.objects.count(), 1)
+
+    def test_workflow_run_upsert(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.InsertOnConflictTests.test_workflow_run_upsert
+        """
+        wfr = WorkflowRun(portal_run_id="202405012397abcd", workflow_run_name="run")
+        self.assertTrue(WorkflowRun.objects.upsert(wfr))
+        self.assertIsNone(wfr.execution_id)
+
+        def row_ctid():
+            # the location of the row version, changes with every update
+            return WorkflowRun.objects.extra(select={"v": "ctid::text"}).values_list(
+                "v", flat=True
+            )[0]
+
+        # the execution_id is filled in once, on the existing record
+        again = WorkflowRun(portal_run_id="202405012397abcd", execution_id="exec-1")
+        self.assertFalse(WorkflowRun.objects.upsert(again))
+        self.assertEqual(again.orcabus_id, wfr.orcabus_id)
+        self.assertEqual(again.workflow_run_name, "run")
+        self.assertEqual(again.execution_id, "exec-1")
+        ctid = row_ctid()
+
+        # afterwards the record is only read: neither overwritten nor rewritten
+        for execution_id in ["exec-2", None]:
+            other = WorkflowRun(
+                portal_run_id="202405012397abcd", execution_id=execution_id
+            )
+            self.assertFalse(WorkflowRun.objects.upsert(other))
+            self.assertEqual(other.orcabus_id, wfr.orcabus_id)
+            self.assertEqual(other.execution_id, "exec-1")
+            self.assertFalse(other._state.adding)
+        self.assertEqual(row_ctid(), ctid)
+        self.assertEqual(WorkflowRun.objects.count(), 1)
+
+    def test_insert_on_conflict_validates(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.InsertOnConflictTests.test_insert_on_conflict_validates
+        """
+        with self.assertRaises(ValidationError):
+            Workflow.objects.insert_on_conflict(
+                Workflow(
+                    name="test_workflow",
+                    version="0.0.1",
+                    execution_engine="CIA",
+                    execution_engine_pipeline_id=str(uuid.uuid4()),
+                ),
+                ["orcabus_id"],
+            )
+        self.assertEqual(Workflow.objects.count(), 0)
+
+
+class PayloadCompressionTests(TestCase):
+    data = {
+        "status": "READY",
+        "version": 2,
+        "inputs": {"files": [f"s3://bucket/sample_{i}.fastq.gz" for i in range(50)]},
+        "comment": "x" * 300,
+    }
+
+    def stored(self, payload: Payload) -> tuple:
+        return Payload.objects.filter(pk=payload.orcabus_id).values_list(
+            "data", "data_codec", "data_size"
+        )[0]
+
+    def test_compressed(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.PayloadCompressionTests.test_compressed
+        """
+        for codec in ["zlib", "zstd"] if payload.zstandard else ["zlib"]:
+            with (
+                mock.patch.object(payload, "PAYLOAD_COMPRESSION", codec),
+                mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 1000),
+            ):
+                saved = Payload(payload_ref_id=codec, version="1", data=self.data)
+                saved.save()
+                inserted = Payload(payload_ref_id=codec, version="2", data=self.data)
+                Payload.objects.get_or_insert(inserted)
+                small = Payload(payload_ref_id=codec, version="3", data={"a": 1})
+                small.save()
+
+            for pld in [saved, inserted]:
+                # the data column only holds the summary
+                data, data_codec, data_size = self.stored(pld)
+                self.assertEqual(data, {"status": "READY", "version": 2})
+                self.assertEqual(data_codec, codec)
+                self.assertEqual(data_size, len(payload.encode_data(self.data)))
+                # the full data in Python
+                self.assertEqual(pld.data, self.data)
+                self.assertEqual(Payload.objects.get(pk=pld.pk).data, self.data)
+
+            self.assertEqual(self.stored(small), ({"a": 1}, None, None))
+
+        # stored uncompressed again when saved with compression off
+        saved = Payload.objects.get(pk=saved.pk)
+        saved.save()
+        self.assertEqual(self.stored(saved), (self.data, None, None))
+
+    def test_save_update_fields(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.PayloadCompressionTests.test_save_update_fields
+        """
+        with (
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION", "zlib"),
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 1000),
+        ):
+            pld = Payload(payload_ref_id="ref", version="1", data={"a": 1})
+            pld.save()
+            self.assertEqual(self.stored(pld), ({"a": 1}, None, None))
+
+            # the storage fields are written with the data
+            pld.data = self.data
+            pld.save(update_fields=["data"])
+            data, data_codec, data_size = self.stored(pld)
+            self.assertEqual(data, {"status": "READY", "version": 2})
+            self.assertEqual(data_codec, "zlib")
+            self.assertEqual(Payload.objects.get(pk=pld.pk).data, self.data)
+
+            pld.data = {"a": 2}
+            pld.save(update_fields=["data"])
+            self.assertEqual(self.stored(pld), ({"a": 2}, None, None))
+            self.assertEqual(Payload.objects.get(pk=pld.pk).data, {"a": 2})
+
+    def test_data_lookups(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.PayloadCompressionTests.test_data_lookups
+        """
+        with (
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION", "zlib"),
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 1000),
+        ):
+            Payload(payload_ref_id="large", version="1", data=self.data).save()
+
+            # the summary answers containment of its (top level, short scalar) values exactly
+            for document in [{"status": "READY"}, {"status": "READY", "version": 2}]:
+                self.assertEqual(
+                    Payload.objects.filter(data__contains=document).count(), 1
+                )
+            self.assertFalse(
+                Payload.objects.filter(data__contains={"version": 3}).exists()
+            )
+
+            # anything else would silently miss the large payloads
+            for lookup in [
+                {"data__contains": {"inputs": {"files": []}}},
+                {"data__contains": {"comment": "x" * 300}},
+                {"data__inputs__files__0": "s3://bucket/sample_0.fastq.gz"},
+                {"data__has_key": "inputs"},
+                {"data": self.data},
+            ]:
+                with self.assertRaises(FieldError, msg=lookup):
+                    Payload.objects.filter(**lookup).exists()
+            self.assertTrue(Payload.objects.filter(data__isnull=False).exists())
+
+        # all lookups with compression off
+        self.assertTrue(Payload.objects.filter(data__has_key="status").exists())
+
+    def test_summarise_data(self):
+        """
+        python manage.py test workflow_manager.tests.test_models.PayloadCompressionTests.test_summarise_data
+        """
+        self.assertEqual(
+            payload.summarise_data(
+                {"a": "x", "b": None, "c": 1.5, "d": True, "e": [], "f": "x" * 257}
+            ),
+            {"a": "x", "b": None, "c": 1.5, "d": True},
+        )
+        self.assertEqual(payload.summarise_data([1, 2]), {})
+
+
 class CommentModelTests(TestCase):
     def setUp(self):
         from workflow_manager.tests.factories import WorkflowRunFactory
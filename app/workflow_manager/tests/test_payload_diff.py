@@ -0,0 +1,181 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from workflow_manager import payload_diff
+from workflow_manager.models import Payload, State
+from workflow_manager.tests.factories import WorkflowRunFactory
+from workflow_manager.urls.base import api_base
+from workflow_manager_proc.services.event_utils import hash_payload_data
+
+
+class PayloadDiffTests(TestCase):
+
+    def setUp(self):
+        payload_diff.clear()
+
+    def test_diff(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_diff.PayloadDiffTests.test_diff
+        """
+        a = {
+            "inputs": {"dataset": "X", "lanes": [1, 2, 3], "flag": True},
+            "tags": ["wgs"],
+            "a/b": {"c~d": 1},
+            "same": {"deep": [{"x": 1}]},
+        }
+        b = {
+            "inputs": {"dataset": "Y", "lanes": [1, 2], "flag": 1, "genome": "hg38"},
+            "tags": {"wgs": True},
+            "a/b": {"c~d": 1.0},
+            "same": {"deep": [{"x": 1}]},
+        }
+        changes, truncated = payload_diff.diff(a, b)
+        self.assertFalse(truncated)
+        self.assertEqual(
+            changes,
+            [
+                {"op": "replace", "path": "/inputs/dataset", "a": "X", "b": "Y"},
+                {"op": "remove", "path": "/inputs/lanes/2", "a": 3},
+                {"op": "replace", "path": "/inputs/flag", "a": True, "b": 1},
+                {"op": "add", "path": "/inputs/genome", "b": "hg38"},
+                {"op": "replace", "path": "/tags", "a": ["wgs"], "b": {"wgs": True}},
+            ],
+        )
+        self.assertEqual(payload_diff.diff(a, a), ([], False))
+        self.assertEqual(
+            payload_diff.diff({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2}})[0][0]["path"],
+            "/a~1b/c~0d",
+        )
+        self.assertEqual(
+            payload_diff.diff(None, {"x": 1}),
+            ([{"op": "replace", "path": "", "a": None, "b": {"x": 1}}], False),
+        )
+
+    def test_diff_bounded(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_diff.PayloadDiffTests.test_diff_bounded
+        """
+        changes, truncated = payload_diff.diff(
+            list(range(100)), list(range(1, 101)), max_changes=10
+        )
+        self.assertTrue(truncated)
+        self.assertEqual(len(changes), 10)
+
+        # deep documents are walked without recursion
+        deep_a, deep_b = {}, {}
+        node_a, node_b = deep_a, deep_b
+        for _ in range(5000):
+            node_a["x"], node_b["x"] = {}, {}
+            node_a, node_b = node_a["x"], node_b["x"]
+        node_b["y"] = 1
+        changes, truncated = payload_diff.diff(deep_a, deep_b)
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]["path"], "/x" * 5000 + "/y")
+
+    def test_cached_diff_bounded(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_diff.PayloadDiffTests.test_cached_diff_bounded
+        """
+        small = lambda: ({"x": 1}, {"x": 2})
+        large = lambda: ({"x": "a" * 1000}, {"x": "b" * 1000})
+        with mock.patch.object(
+            payload_diff,
+            "_cache",
+            payload_diff.LRUCache(1000, payload_diff._result_size),
+        ):
+            with mock.patch.object(
+                payload_diff, "diff", wraps=payload_diff.diff
+            ) as mock_diff:
+                # larger than the whole cache: computed every time
+                for _ in range(2):
+                    changes, _ = payload_diff.cached_diff("a", "b", large)
+                    self.assertEqual(changes[0]["b"], "b" * 1000)
+                self.assertEqual(mock_diff.call_count, 2)
+
+                for _ in range(2):
+                    payload_diff.cached_diff("c", "d", small)
+                self.assertEqual(mock_diff.call_count, 3)
+            # bounded by the JSON of the changes, not the number of diffs
+            self.assertEqual(
+                payload_diff._cache.currsize,
+                len('[{"op":"replace","path":"/x","a":1,"b":2}]'),
+            )
+
+    def test_diff_endpoint(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_diff.PayloadDiffTests.test_diff_endpoint
+        """
+        endpoint = f"/{api_base}payload/diff"
+        draft_data = {"inputs": {"dataset": "X", "sample_id": "S1"}}
+        ready_data = {
+            "inputs": {"dataset": "X", "sample_id": "S1"},
+            "ready": {"ready_by": "me"},
+        }
+        draft = Payload.objects.create(
+            payload_ref_id=hash_payload_data(draft_data), version="1", data=draft_data
+        )
+        ready = Payload.objects.create(
+            payload_ref_id=hash_payload_data(ready_data), version="1", data=ready_data
+        )
+        wfr = WorkflowRunFactory()
+        states = {}
+        for status, pld in [("DRAFT", draft), ("READY", ready), ("RUNNING", None)]:
+            states[status] = State.objects.create(
+                workflow_run=wfr,
+                status=status,
+                timestamp="2025-01-01T00:00:00Z",
+                payload=pld,
+            )
+
+        expected = [{"op": "add", "path": "/ready", "b": {"ready_by": "me"}}]
+        with mock.patch.object(
+            payload_diff, "diff", wraps=payload_diff.diff
+        ) as mock_diff:
+            response = self.client.get(
+                endpoint, {"a": draft.orcabus_id, "b": ready.orcabus_id}
+            )
+            self.assertEqual(response.status_code, 200)
+            result = response.json()
+            self.assertEqual(result["changes"], expected)
+            self.assertFalse(result["truncated"])
+            self.assertEqual(result["b"]["payloadRefId"], ready.payload_ref_id)
+
+            # by state, the same pair of refIds: from the cache
+            response = self.client.get(
+                endpoint,
+                {
+                    "a": states["DRAFT"].orcabus_id,
+                    "b": states["READY"].orcabus_id,
+                },
+            )
+            self.assertEqual(response.json()["changes"], expected)
+            self.assertEqual(
+                response.json()["a"],
+                {"orcabusId": draft.orcabus_id, "payloadRefId": draft.payload_ref_id},
+            )
+            self.assertEqual(mock_diff.call_count, 1)
+
+        # the payload data is returned as is (not camel-cased)
+        response = self.client.get(
+            endpoint, {"a": ready.orcabus_id, "b": draft.orcabus_id}
+        )
+        self.assertEqual(
+            response.json()["changes"],
+            [{"op": "remove", "path": "/ready", "a": {"ready_by": "me"}}],
+        )
+        response = self.client.get(
+            endpoint, {"a": draft.orcabus_id, "b": draft.orcabus_id}
+        )
+        self.assertEqual(response.json()["changes"], [])
+
+        response = self.client.get(endpoint, {"a": draft.orcabus_id})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            endpoint, {"a": draft.orcabus_id, "b": states["RUNNING"].orcabus_id}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            endpoint, {"a": draft.orcabus_id, "b": "pld." + "0" * 26}
+        )
+        self.assertEqual(response.status_code, 404)
@@ -1,10 +1,12 @@
 import logging
 import uuid
+from unittest import mock
 
 from django.test import TestCase
 
-from workflow_manager.models import Payload
+from workflow_manager.models import Payload, payload
 from workflow_manager.urls.base import api_base
+from workflow_manager_proc.services.event_utils import hash_payload_data
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -62,3 +64,226 @@ class PayloadViewSetTestCase(TestCase):
         engine_parameters_keys = engine_parameters.keys()
         self.assertIn("logsUri", engine_parameters_keys)
         self.assertIn("logs_uri", engine_parameters_keys)
+
+    def test_payload_by_ref(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_viewset.PayloadViewSetTestCase.test_payload_by_ref
+        """
+        data = {"inputs": {"genome": "hg38", "sizes": [1, 2.5]}, "tags": None}
+        ref_id = hash_payload_data(data)
+        Payload.objects.create(payload_ref_id=ref_id, version="1.0.0", data=data)
+        Payload.objects.create(payload_ref_id=ref_id, version="2.0.0", data=data)
+
+        response = self.client.get(f"{self.endpoint}/ref/{ref_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json(), data)
+        self.assertEqual(response["ETag"], f'"{ref_id}"')
+
+        # unchanged, as the refId is the hash of the data
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                f"{self.endpoint}/ref/{ref_id}", HTTP_IF_NONE_MATCH=f'"{ref_id}"'
+            )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(f"{self.endpoint}/ref/{'0' * 64}")
+        self.assertEqual(response.status_code, 404)
+
+    def test_compressed_payload(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_viewset.PayloadViewSetTestCase.test_compressed_payload
+        """
+        data = {
+            "status": "READY",
+            "files": [f"s3://bucket/{i}.bam" for i in range(100)],
+        }
+        with (
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION", "zlib"),
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 100),
+        ):
+            pld = Payload.objects.create(payload_ref_id="ref", version="1", data=data)
+        self.assertEqual(Payload.objects.filter(data_codec="zlib").count(), 1)
+
+        # the data is decompressed transparently, the storage fields are not exposed
+        response = self.client.get(f"{self.endpoint}/{pld.orcabus_id}")
+        self.assertEqual(response.json()["data"], data)
+        self.assertNotIn("dataCompressed", response.json())
+        self.assertEqual(self.client.get(f"{self.endpoint}/ref/ref").json(), data)
+
+    def test_data_filters(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_viewset.PayloadViewSetTestCase.test_data_filters
+        """
+        hg38 = Payload.objects.create(
+            payload_ref_id="a",
+            version="1",
+            data={"inputs": {"dataset": "X", "genome": "hg38", "lanes": 2}},
+        )
+        Payload.objects.create(
+            payload_ref_id="b",
+            version="1",
+            data={"inputs": {"dataset": "X", "genome": "hg19", "lanes": "2"}},
+        )
+
+        def ids(params):
+            response = self.client.get(f"{self.endpoint}/", params)
+            self.assertEqual(response.status_code, 200)
+            return sorted(p["payloadRefId"] for p in response.json()["results"])
+
+        self.assertEqual(
+            ids({"data_contains": '{"inputs": {"dataset": "X"}}'}), ["a", "b"]
+        )
+        self.assertEqual(
+            ids({"data_contains": '{"inputs": {"dataset": "X", "genome": "hg38"}}'}),
+            ["a"],
+        )
+        self.assertEqual(ids({"data_path": "inputs.genome=hg19"}), ["b"])
+        # JSON scalars are compared as such, quoted to compare as string
+        self.assertEqual(ids({"data_path": "inputs.lanes=2"}), ["a"])
+        self.assertEqual(ids({"data_path": 'inputs.lanes="2"'}), ["b"])
+        # all filters must match
+        self.assertEqual(
+            ids({"data_path": ["inputs.dataset=X", "inputs.genome=hg38"]}), ["a"]
+        )
+        self.assertEqual(
+            ids({"data_contains": '{"inputs": {"genome": "hg38"}}', "version": "2"}),
+            [],
+        )
+        self.assertEqual(
+            self.client.get(
+                f"{self.endpoint}/{hg38.orcabus_id}", {"data_path": "inputs.lanes=2"}
+            ).status_code,
+            200,
+        )
+
+        for params in [
+            {"data_contains": "[1, 2]"},
+            {"data_contains": "{}"},
+            {"data_contains": "not json"},
+            {"data_contains": '{"a": ' * 10 + "1" + "}" * 10},
+            {"data_path": "inputs.genome"},
+            {"data_path": "inputs..genome=hg38"},
+            {"data_path": "inputs[0].genome=hg38"},
+            {"data__inputs__genome": "hg38"},
+        ]:
+            response = self.client.get(f"{self.endpoint}/", params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_data_filters_compressed(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_viewset.PayloadViewSetTestCase.test_data_filters_compressed
+        """
+        data = {
+            "status": "READY",
+            "inputs": {
+                "dataset": "X",
+                "files": [f"s3://bucket/{i}.bam" for i in range(100)],
+            },
+        }
+        with (
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION", "zlib"),
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 1000),
+        ):
+            Payload.objects.create(payload_ref_id="large", version="1", data=data)
+            Payload.objects.create(
+                payload_ref_id="small",
+                version="1",
+                data={"status": "READY", "inputs": {"dataset": "X"}},
+            )
+            self.assertEqual(Payload.objects.filter(data_codec="zlib").count(), 1)
+
+            # top level short values are in the summary of the large payload too
+            for params in [
+                {"data_contains": '{"status": "READY"}'},
+                {"data_path": "status=READY"},
+            ]:
+                response = self.client.get(f"{self.endpoint}/", params)
+                self.assertEqual(
+                    sorted(p["payloadRefId"] for p in response.json()["results"]),
+                    ["large", "small"],
+                )
+
+            # the rest would miss the large payload: refused
+            for params in [
+                {"data_contains": '{"inputs": {"dataset": "X"}}'},
+                {"data_path": "inputs.dataset=X"},
+            ]:
+                response = self.client.get(f"{self.endpoint}/", params)
+                self.assertEqual(response.status_code, 400, params)
+                self.assertIn("compressed", str(response.json()))
+            response = self.client.get(
+                f"/{api_base}workflowrun/", {"payload_path": "inputs.dataset=X"}
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_search_compressed(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_viewset.PayloadViewSetTestCase.test_search_compressed
+        """
+        with (
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION", "zlib"),
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 100),
+        ):
+            Payload.objects.create(
+                payload_ref_id="large-ref",
+                version="1",
+                data={
+                    "status": "READY",
+                    "files": [f"s3://bucket/{i}.bam" for i in range(100)],
+                },
+            )
+            response = self.client.get(f"{self.endpoint}/", {"search": "large"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [p["payloadRefId"] for p in response.json()["results"]], ["large-ref"]
+            )
+            # the data is not searched
+            response = self.client.get(f"{self.endpoint}/", {"search": "READY"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["results"], [])
+
+    def test_data_projection(self):
+        """
+        python manage.py test workflow_manager.tests.test_payload_viewset.PayloadViewSetTestCase.test_data_projection
+        """
+        data = {
+            "inputs": {"dataset": "X", "lanes": [1, 2]},
+            "outputs": {"bam": "s3://bucket/x.bam", "vcf": "s3://bucket/x.vcf"},
+            "files": [f"s3://bucket/{i}.bam" for i in range(100)],
+        }
+        Payload.objects.create(payload_ref_id="plain", version="1", data=data)
+        with (
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION", "zlib"),
+            mock.patch.object(payload, "PAYLOAD_COMPRESSION_MIN_BYTES", 100),
+        ):
+            Payload.objects.create(payload_ref_id="compressed", version="1", data=data)
+
+        response = self.client.get(
+            f"{self.endpoint}/",
+            {"paths": "outputs,inputs.dataset,inputs.lanes.1,missing.key"},
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(
+                result["data"],
+                {
+                    "outputs": data["outputs"],
+                    "inputs.dataset": "X",
+                    "inputs.lanes.1": 2,
+                    "missing.key": None,
+                },
+                result["payloadRefId"],
+            )
+
+        response = self.client.get(f"{self.endpoint}/", {"include_data": "false"})
+        self.assertEqual(response.status_code, 200)
+        for result in response.json()["results"]:
+            self.assertNotIn("data", result)
+            self.assertIn("payloadRefId", result)
+
+        for paths in ["inputs[0]", ",".join(f"k{i}" for i in range(21))]:
+            response = self.client.get(f"{self.endpoint}/", {"paths": paths})
+            self.assertEqual(response.status_code, 400, paths)
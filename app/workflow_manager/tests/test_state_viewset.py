@@ -71,7 +71,10 @@ class StateViewSetTestCase(TestCase):
         self.assertEqual(data["status"], "RESOLVED")
         self.assertEqual(data["comment"], "resolved ok")
         mock_emit_wrsc.assert_called_once()
-        wrsc_event = mock_emit_wrsc.call_args.args[0]
+        # as emitted (None fields are omitted)
+        wrsc_event = mock_emit_wrsc.call_args.args[0].model_dump(
+            mode="json", exclude_none=True
+        )
         self.assertEqual(wrsc_event["status"], "RESOLVED")
         self.assertEqual(wrsc_event["orcabusId"], self.wfr_failed.orcabus_id)
         self.assertEqual(wrsc_event["workflow"]["orcabusId"], self.wf.orcabus_id)
@@ -337,7 +340,10 @@ class StateViewSetTestCase(TestCase):
             ).exists()
         )
         self.assertEqual(mock_emit_wrsc.call_count, 2)
-        wrsc_events = [call.args[0] for call in mock_emit_wrsc.call_args_list]
+        wrsc_events = [
+            call.args[0].model_dump(mode="json", exclude_none=True)
+            for call in mock_emit_wrsc.call_args_list
+        ]
         self.assertTrue(all("payload" not in event for event in wrsc_events))
         self.assertCountEqual(
             [event["orcabusId"] for event in wrsc_events],
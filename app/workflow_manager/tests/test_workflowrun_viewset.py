@@ -1,6 +1,6 @@
 from django.test import TestCase
 
-from workflow_manager.models import WorkflowRun
+from workflow_manager.models import Payload, State, WorkflowRun
 from workflow_manager.tests.fixtures.sim_workflow import TestData
 from workflow_manager.urls.base import api_base
 
@@ -97,3 +97,39 @@ class WorkflowRunViewSetTestCase(TestCase):
         wfr = WorkflowRun.objects.first()
         response = self.client.get(f"{self.endpoint}/{wfr.orcabus_id}/")
         self.assertEqual(response.status_code, 200)
+
+    def test_list_with_payload_filters(self):
+        """
+        python manage.py test workflow_manager.tests.test_workflowrun_viewset.WorkflowRunViewSetTestCase.test_list_with_payload_filters
+        """
+        wfr = WorkflowRun.objects.first()
+        state = State.objects.filter(workflow_run=wfr, status="READY").first()
+        state.payload = Payload.objects.create(
+            payload_ref_id="ready",
+            version="1",
+            data={"inputs": {"dataset": "X"}, "outputs": "s3://bucket/x/"},
+        )
+        state.save()
+
+        def ids(params):
+            response = self.client.get(f"{self.endpoint}/", params)
+            self.assertEqual(response.status_code, 200)
+            return [r["orcabusId"] for r in response.json()["results"]]
+
+        self.assertEqual(ids({"payload_path": "inputs.dataset=X"}), [wfr.orcabus_id])
+        self.assertEqual(
+            ids(
+                {
+                    "payload_contains": '{"outputs": "s3://bucket/x/"}',
+                    "payload_status": "ready",
+                }
+            ),
+            [wfr.orcabus_id],
+        )
+        self.assertEqual(
+            ids({"payload_path": "inputs.dataset=X", "payload_status": "DRAFT"}), []
+        )
+        self.assertEqual(ids({"payload_path": "inputs.dataset=Y"}), [])
+
+        response = self.client.get(f"{self.endpoint}/", {"payload_path": "inputs"})
+        self.assertEqual(response.status_code, 400)
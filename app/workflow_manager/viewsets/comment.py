@@ -47,6 +47,7 @@ class BaseCommentViewSet(PatchOnlyViewSet, mixins.DestroyModelMixin):
     pagination_class = None
     lookup_url_kwarg = "comment_orcabus_id"
     lookup_value_regex = "[^/]+"
+    db_read_primary = True  # read-your-writes, see db.routers
     # PatchOnlyViewSet excludes PUT; we extend it with DELETE for soft-delete.
     http_method_names = ["get", "post", "patch", "delete", "head", "options", "trace"]
 
@@ -1,21 +1,179 @@
-from drf_spectacular.utils import extend_schema
+from typing import List, Optional
 
-from workflow_manager.models.payload import Payload
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+
+from workflow_manager import payload_diff
+from workflow_manager.models.payload import Payload, data_projection, decompress
+from workflow_manager.models.state import State
 from workflow_manager.serializers.payload import (
+    PayloadMinSerializer,
+    PayloadProjectionSerializer,
     PayloadSerializer,
     PayloadListParamSerializer,
 )
 from workflow_manager.viewsets.base import BaseViewSet
+from workflow_manager.viewsets.utils import (
+    filter_payload_data,
+    parse_data_paths,
+    payload_data_filters,
+)
+
+# the data filters, answered with the GIN index on the data (see `payload_data_filters`)
+DATA_FILTER_PARAMS = ["data_contains", "data_path"]
 
 
 class PayloadViewSet(BaseViewSet):
     serializer_class = PayloadSerializer
-    search_fields = Payload.get_base_fields()
+    # not the data: a substring scan of every payload (and refused on compressed data), see the data filters instead
+    search_fields = [
+        f
+        for f in Payload.get_base_fields()
+        if f not in ["data", *Payload.STORAGE_FIELDS]
+    ]
 
     @extend_schema(parameters=[PayloadListParamSerializer])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    def get_data_paths(self) -> Optional[List[str]]:
+        """
+        The paths of the data to return (`paths`), an empty list for none (`include_data=false`), None for all.
+        """
+        query_params = self.request.query_params
+        if query_params.get("include_data", "").strip().lower() in ("false", "0"):
+            return []
+        paths = parse_data_paths("paths", query_params.getlist("paths"))
+        return paths or None
+
+    def get_serializer_class(self):
+        data_paths = self.get_data_paths()
+        if data_paths is None:
+            return PayloadSerializer
+        return PayloadProjectionSerializer if data_paths else PayloadMinSerializer
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "data_paths": self.get_data_paths()}
+
     def get_queryset(self):
         query_params = self.request.query_params.copy()
-        return Payload.objects.get_by_keyword(self.queryset, **query_params)
+        documents = payload_data_filters(query_params, *DATA_FILTER_PARAMS)
+        for param in [*DATA_FILTER_PARAMS, "paths", "include_data"]:
+            query_params.pop(param, None)
+        if any(k == "data" or k.startswith("data__") for k in query_params):
+            # arbitrary lookups on the data are not indexed
+            raise ValidationError(
+                {"data": "Filter the data with data_contains or data_path."}
+            )
+        qs = Payload.objects.get_by_keyword(self.queryset, **query_params)
+        qs = filter_payload_data(qs, documents)
+
+        data_paths = self.get_data_paths()
+        if data_paths is not None:
+            # only compressed data (where the column holds a summary) is loaded in full
+            qs = qs.defer("data")
+        if data_paths:
+            qs = qs.annotate(data_projection=data_projection(data_paths))
+        elif data_paths == []:
+            qs = qs.defer("data_compressed")
+        return qs
+
+    @extend_schema(
+        responses=OpenApiTypes.OBJECT,
+        description=(
+            "The data of the payload with the given refId (e.g. of a WorkflowRunStateChange event whose payload was "
+            "sent by reference). The refId is the hash of the data: responses carry it as ETag and can be cached "
+            "indefinitely."
+        ),
+    )
+    @action(detail=False, methods=["GET"], url_path=r"ref/(?P<ref_id>[^/]+)")
+    def ref(self, request, ref_id=None):
+        etag = f'"{ref_id}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            # the stored JSON as is, without parsing and rendering it again
+            row = (
+                Payload.objects.filter(payload_ref_id=ref_id)
+                .values_list(Cast("data", TextField()), "data_compressed", "data_codec")
+                .first()
+            )
+            if row is None:
+                raise NotFound(f"No payload with refId {ref_id}")
+            data, compressed, codec = row
+            if compressed is not None:
+                data = decompress(bytes(compressed), codec)
+            response = HttpResponse(data, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "max-age=31536000, immutable"
+        return response
+
+    @staticmethod
+    def resolve_payload(param: str, orcabus_id: str) -> dict:
+        """The payload with the given id, or the payload of the state with the given id (`stt.` prefix)."""
+        if orcabus_id.startswith("stt."):
+            row = (
+                State.objects.filter(orcabus_id=orcabus_id)
+                .values_list("payload__orcabus_id", "payload__payload_ref_id")
+                .first()
+            )
+            if row is None or row[0] is None:
+                raise NotFound(f"No payload for state {orcabus_id} ({param})")
+        else:
+            row = (
+                Payload.objects.filter(orcabus_id=orcabus_id)
+                .values_list("orcabus_id", "payload_ref_id")
+                .first()
+            )
+            if row is None:
+                raise NotFound(f"No payload {orcabus_id} ({param})")
+        return {"orcabusId": row[0], "payloadRefId": row[1]}
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name,
+                str,
+                required=True,
+                description=f"The {side} payload, by payload or state (stt. prefix) orcabus id",
+            )
+            for name, side in [("a", "first"), ("b", "second")]
+        ],
+        responses=OpenApiTypes.OBJECT,
+        description=(
+            "The structural diff of the data of two payloads (e.g. of the DRAFT and READY states of a run): the "
+            "changes from a to b, as add / remove / replace operations at JSON Pointer paths (at most "
+            f"{payload_diff.PAYLOAD_DIFF_MAX_CHANGES}, `truncated` if there are more)."
+        ),
+    )
+    @action(detail=False, methods=["GET"])
+    def diff(self, request):
+        ids = {}
+        for param in ["a", "b"]:
+            ids[param] = (request.query_params.get(param) or "").strip()
+            if not ids[param]:
+                raise ValidationError({param: "This parameter is required."})
+        a = self.resolve_payload("a", ids["a"])
+        b = self.resolve_payload("b", ids["b"])
+
+        def load():
+            payloads = Payload.objects.in_bulk([a["orcabusId"], b["orcabusId"]])
+            return (
+                payloads[a["orcabusId"]].data,
+                payloads[b["orcabusId"]].data,
+            )
+
+        changes, truncated = payload_diff.cached_diff(
+            a["payloadRefId"], b["payloadRefId"], load
+        )
+        # rendered as is: the changes hold payload data, whose keys must not be camel-cased
+        return JsonResponse(
+            {"a": a, "b": b, "changes": changes, "truncated": truncated},
+            encoder=DjangoJSONEncoder,
+        )
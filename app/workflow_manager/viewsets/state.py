@@ -11,6 +11,7 @@ from django.utils import timezone
 
 from workflow_manager.aws_event_bridge.event import emit_wrsc_api_event
 from workflow_manager.models import State, WorkflowRun
+from workflow_manager_proc.domain.event.wrsc import WorkflowRunStateChange
 from workflow_manager_proc.services.workflow_run import (
     map_workflow_run_new_state_to_wrsc,
 )
@@ -99,7 +100,7 @@ class StateTransitionValidationMixin:
         workflow_run: WorkflowRun,
         request_status: str,
         request_comment: str,
-    ) -> tuple[State, dict]:
+    ) -> tuple[State, WorkflowRunStateChange]:
         """Create a manual state and emit its WRSC event in the caller's transaction."""
         logger.info(
             "Creating manual workflow-run state: workflow_run_id=%s status=%s",
@@ -122,13 +123,14 @@ class StateTransitionValidationMixin:
         wrsc_event = map_workflow_run_new_state_to_wrsc(
             workflow_run,
             instance,
-        ).model_dump(mode="json", exclude_none=True)
-        wrsc_event.pop("payload", None)
+        )
+        # the manual state change event does not carry the payload
+        wrsc_event.payload = None
         logger.info(
             "Manual WRSC event built: workflow_run_id=%s state_id=%s event_id=%s status=%s",
             workflow_run.orcabus_id,
             instance.orcabus_id,
-            wrsc_event.get("id"),
+            wrsc_event.id,
             request_status,
         )
 
@@ -137,7 +139,7 @@ class StateTransitionValidationMixin:
             "Manual WRSC event emitted: workflow_run_id=%s state_id=%s event_id=%s status=%s",
             workflow_run.orcabus_id,
             instance.orcabus_id,
-            wrsc_event.get("id"),
+            wrsc_event.id,
             request_status,
         )
         return instance, wrsc_event
@@ -185,6 +187,7 @@ class StateViewSet(
     http_method_names = ["get", "post", "patch"]
     pagination_class = None
     lookup_value_regex = "[^/]+"  # to allow id prefix
+    db_read_primary = True  # read-your-writes, see db.routers
 
     def get_queryset(self):
         return State.objects.filter(workflow_run=self.kwargs["orcabus_id"])
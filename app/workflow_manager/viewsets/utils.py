@@ -10,9 +10,12 @@ from collections import defaultdict
 from datetime import datetime, timezone as dt_timezone
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import json
+
 import jwt
 from django.db.models import (
     Case,
+    Exists,
     F,
     Func,
     IntegerField,
@@ -26,12 +29,17 @@ from django.db.models import (
 )
 from django.db.models.functions import Cast, Coalesce, Lower, RowNumber
 from django.utils.dateparse import parse_datetime
-from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.settings import api_settings
 
 from workflow_manager.models.analysis import Analysis
 from workflow_manager.models.analysis_run import AnalysisRun
 from workflow_manager.models.analysis_run_state import AnalysisRunState
+from workflow_manager.models.payload import (
+    SUMMARY_MAX_STRING_LENGTH,
+    compression_enabled,
+    summary_covers,
+)
 from workflow_manager.models.state import State
 from workflow_manager.models.workflow import Workflow
 from workflow_manager.models.workflow_run import WorkflowRun
@@ -83,6 +91,10 @@ NON_KEYWORD_QUERY_PARAMS = frozenset(
         "end_time",
         "is_ongoing",
         "status",
+        "payload_contains",
+        "payload_path",
+        "payload_status",
+        "include_archived",
         api_settings.SEARCH_PARAM,
         api_settings.ORDERING_PARAM,
         PaginationConstant.PAGE,
@@ -148,6 +160,147 @@ def build_keyword_params(query_params) -> dict[str, list[str]]:
     return out
 
 
+# ---------------------------------------------------------------------------
+# Payload data filters
+# ---------------------------------------------------------------------------
+
+# Limits of the payload data filters: they are all answered with the `jsonb_path_ops` GIN index on the payload data
+# (containment `@>`), bounded so a filter cannot grow into an expensive index search.
+PAYLOAD_FILTER_MAX_BYTES = 4096
+PAYLOAD_FILTER_MAX_DEPTH = 8
+PAYLOAD_FILTER_PATH_KEY = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+
+def _json_depth(value: Any) -> int:
+    if isinstance(value, dict):
+        return 1 + max((_json_depth(v) for v in value.values()), default=0)
+    if isinstance(value, list):
+        return 1 + max((_json_depth(v) for v in value), default=0)
+    return 0
+
+
+def parse_data_contains(param: str, value: str) -> dict:
+    """
+    Parse a containment filter, a JSON object the payload data must contain (e.g. ``{"inputs": {"dataset": "X"}}``).
+    """
+    if len(value.encode("utf-8")) > PAYLOAD_FILTER_MAX_BYTES:
+        raise ValidationError(
+            {param: f"At most {PAYLOAD_FILTER_MAX_BYTES} bytes are supported."}
+        )
+    try:
+        document = json.loads(value)
+    except ValueError:
+        raise ValidationError({param: "Expected a JSON object."})
+    if not isinstance(document, dict) or not document:
+        raise ValidationError({param: "Expected a non-empty JSON object."})
+    if _json_depth(document) > PAYLOAD_FILTER_MAX_DEPTH:
+        raise ValidationError(
+            {param: f"At most {PAYLOAD_FILTER_MAX_DEPTH} levels are supported."}
+        )
+    return document
+
+
+def parse_data_path(param: str, value: str) -> dict:
+    """
+    Parse a path equality filter ``<key>.<key>...=<value>`` (e.g. ``inputs.dataset=X``) into the equivalent
+    containment document (``{"inputs": {"dataset": "X"}}``), so it is answered by the same index.
+    The value is taken as JSON if it is a JSON scalar (number, boolean, null or quoted string), else as string.
+    """
+    path, sep, raw = value.partition("=")
+    keys = path.split(".")
+    if not sep or not all(PAYLOAD_FILTER_PATH_KEY.match(k) for k in keys):
+        raise ValidationError(
+            {
+                param: "Expected <key>.<key>...=<value> (keys of letters, digits, _ or -)."
+            }
+        )
+    if len(keys) > PAYLOAD_FILTER_MAX_DEPTH:
+        raise ValidationError(
+            {param: f"At most {PAYLOAD_FILTER_MAX_DEPTH} keys are supported."}
+        )
+    if len(raw.encode("utf-8")) > PAYLOAD_FILTER_MAX_BYTES:
+        raise ValidationError(
+            {param: f"At most {PAYLOAD_FILTER_MAX_BYTES} bytes are supported."}
+        )
+    try:
+        document = json.loads(raw)
+    except ValueError:
+        document = raw
+    if isinstance(document, (dict, list)):
+        document = raw
+    for key in reversed(keys):
+        document = {key: document}
+    return document
+
+
+def payload_data_filters(
+    query_params, contains_param: str, path_param: str
+) -> List[dict]:
+    """
+    The containment documents of the payload data filters in the query (all must match), validated.
+
+    While payloads are stored compressed, the data column of a large payload only holds its summary, so only filters
+    on top level null, boolean, number or short string values (which the summary answers exactly, see
+    `summary_covers`) are accepted.
+    """
+    documents = [
+        (contains_param, parse_data_contains(contains_param, v))
+        for v in query_params.getlist(contains_param)
+        if v.strip()
+    ]
+    documents += [
+        (path_param, parse_data_path(path_param, v.strip()))
+        for v in query_params.getlist(path_param)
+        if v.strip()
+    ]
+    if compression_enabled():
+        for param, document in documents:
+            if not summary_covers(document):
+                raise ValidationError(
+                    {
+                        param: (
+                            "While payloads are stored compressed, only top level keys with null, boolean, number or "
+                            f"short (up to {SUMMARY_MAX_STRING_LENGTH} characters) string values can be filtered on."
+                        )
+                    }
+                )
+    return [document for _, document in documents]
+
+
+PAYLOAD_PROJECTION_MAX_PATHS = 20
+
+
+def parse_data_paths(param: str, values: List[str]) -> List[str]:
+    """
+    Parse the paths of a data projection, ``<key>.<key>...`` (comma separated or repeated, e.g.
+    ``outputs,inputs.dataset``).
+    """
+    paths = [p.strip() for v in values for p in v.split(",") if p.strip()]
+    if len(paths) > PAYLOAD_PROJECTION_MAX_PATHS:
+        raise ValidationError(
+            {param: f"At most {PAYLOAD_PROJECTION_MAX_PATHS} paths are supported."}
+        )
+    for path in paths:
+        keys = path.split(".")
+        if not all(PAYLOAD_FILTER_PATH_KEY.match(k) for k in keys):
+            raise ValidationError(
+                {param: "Expected <key>.<key>... (keys of letters, digits, _ or -)."}
+            )
+        if len(keys) > PAYLOAD_FILTER_MAX_DEPTH:
+            raise ValidationError(
+                {param: f"At most {PAYLOAD_FILTER_MAX_DEPTH} keys are supported."}
+            )
+    return list(dict.fromkeys(paths))
+
+
+def filter_payload_data(
+    qs: QuerySet, documents: List[dict], prefix: str = ""
+) -> QuerySet:
+    for document in documents:
+        qs = qs.filter(**{f"{prefix}data__contains": document})
+    return qs
+
+
 # ---------------------------------------------------------------------------
 # Search Q builders (per model)
 # ---------------------------------------------------------------------------
@@ -213,7 +366,8 @@ def filtered_workflow_runs_queryset(
     Shared queryset builder for workflow-run list, ongoing, unresolved, and stats endpoints.
 
     Applies keyword filters, ``start_time`` / ``end_time`` (range on latest state timestamp),
-    ``is_ongoing``, optional ``status`` on the latest state, and free-text search.
+    ``is_ongoing``, optional ``status`` on the latest state, the payload data filters (``payload_contains`` /
+    ``payload_path``, on any state or the states of ``payload_status``), and free-text search.
     Ordering is **not** applied here; the calling viewset is responsible for sorting.
 
     The ``latest_state_time`` annotation uses a correlated **Subquery** (not ``Max``) so it
@@ -275,6 +429,21 @@ def filtered_workflow_runs_queryset(
     if apply_status_filter and status:
         qs = qs.filter(latest_status=status.upper())
 
+    payload_documents = payload_data_filters(
+        query_params, "payload_contains", "payload_path"
+    )
+    if payload_documents:
+        # runs with a state whose payload matches (all filters), optionally a state of the given status
+        states = filter_payload_data(
+            State.objects.filter(workflow_run=OuterRef("pk")),
+            payload_documents,
+            prefix="payload__",
+        )
+        payload_status = (query_params.get("payload_status") or "").strip()
+        if payload_status:
+            states = states.filter(status=payload_status.upper())
+        qs = qs.filter(Exists(states))
+
     search_term = (query_params.get(api_settings.SEARCH_PARAM) or "").strip()
     if search_term:
         qs = qs.filter(_workflow_run_search_q(search_term)).distinct()
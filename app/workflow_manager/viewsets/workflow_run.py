@@ -1,8 +1,12 @@
 from django.db.models import Q, Exists, OuterRef, Subquery
-from drf_spectacular.utils import extend_schema
+from django.http import Http404
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
+from workflow_manager.models.archived_workflow_run import ArchivedWorkflowRun
 from workflow_manager.models.workflow_run import WorkflowRun
 from workflow_manager.models.state import State
 from workflow_manager.serializers.workflow_run import (
@@ -56,6 +60,40 @@ class WorkflowRunViewSet(BaseViewSet):
         self.serializer_class = WorkflowRunSerializer
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "include_archived",
+                OpenApiTypes.BOOL,
+                description=(
+                    "If 'true', also look up archived runs: returned as archived (with their states, payloads, "
+                    "comments and library associations, and `archived: true`)."
+                ),
+            )
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            include_archived = request.query_params.get("include_archived", "")
+            if include_archived.strip().lower() != "true":
+                raise
+            archived = ArchivedWorkflowRun.objects.filter(
+                orcabus_id=kwargs[self.lookup_url_kwarg]
+            ).first()
+            if archived is None:
+                raise
+            # the payload data is returned as stored, like from /payload (`data` is not camel-cased, see
+            # JSON_UNDERSCOREIZE)
+            return Response(
+                {
+                    **archived.document,
+                    "archived": True,
+                    "archived_at": archived.archived_at,
+                }
+            )
+
     def get_queryset(self):
         """
         Same shared filters as stats (see ``filtered_workflow_runs_queryset``).
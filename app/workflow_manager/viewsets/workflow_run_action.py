@@ -39,6 +39,7 @@ logger = logging.getLogger(__name__)
 class WorkflowRunActionViewSet(ViewSet):
     lookup_value_regex = "[^/]+"  # to allow orcabus id prefix
     queryset = WorkflowRun.objects.prefetch_related("states").all()
+    db_read_primary = True  # read-your-writes, see db.routers
 
     @extend_schema(
         responses=AllowedRerunWorkflowSerializer, description="Allowed rerun workflows"
@@ -33,7 +33,7 @@ class Payload(BaseModel):
     orcabusId: str
     refId: str
     version: str
-    data: dict[str, Any]
+    data: dict[str, Any] | None = None
 
 
 class Library(BaseModel):
@@ -5,12 +5,17 @@ django.setup()
 # --- keep ^^^ at top of the module
 import logging
 
+from workflow_manager.db import refresh_connections
+from workflow_manager.db.budget import sql_budget
 from workflow_manager_proc.domain.event import wru
-from workflow_manager_proc.services import workflow_run
+from workflow_manager_proc.services import workflow_run, reference_cache
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+if reference_cache.REFERENCE_WARM_UP:
+    reference_cache.warm_up()
+
 
 def handler(event, context):
     """
@@ -23,10 +28,16 @@ def handler(event, context):
         - relay the state change as WorkflowManager WRSC event if applicable
     """
     logger.info(f"Processing {event}, {context}")
+    refresh_connections()
+
+    if reference_cache.is_warm_up_event(event):
+        reference_cache.warm_up()
+        return
 
-    input_wru_with_envelope = wru.AWSEvent.model_validate(event)
-    input_wru: wru.WorkflowRunUpdate = input_wru_with_envelope.detail
+    with sql_budget("handle_wru_event"):
+        input_wru_with_envelope = wru.AWSEvent.model_validate(event)
+        input_wru: wru.WorkflowRunUpdate = input_wru_with_envelope.detail
 
-    workflow_run.create_workflow_run(input_wru)
+        workflow_run.create_workflow_run(input_wru)
 
     logger.info(f"{__name__} done.")
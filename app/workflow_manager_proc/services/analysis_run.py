@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 
@@ -6,6 +5,7 @@ from django.db import transaction
 from django.db.models.query import QuerySet
 from django.utils import timezone
 
+from workflow_manager import fingerprint
 from workflow_manager.models.analysis import Analysis
 from workflow_manager.models.analysis_run import AnalysisRun
 from workflow_manager.models.analysis_run_state import AnalysisRunState
@@ -14,8 +14,8 @@ from workflow_manager.models.readset import Readset
 from workflow_manager.models.run_context import RunContext, RunContextUseCase
 from workflow_manager.models.utils import Status
 from workflow_manager_proc.domain.event import arsc, aru
-from workflow_manager_proc.services import analysis_run_utils
-from workflow_manager_proc.services.event_utils import emit_event, EventType
+from workflow_manager_proc.services import analysis_run_utils, reference_cache
+from workflow_manager_proc.services.event_utils import emit_model_event
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -31,11 +31,7 @@ def create_analysis_run(event: aru.AnalysisRunUpdate) -> None:
     db_record = _create_analysis_run(event)
     mapped_arsc = _map_analysis_run_to_arsc(db_record)
     logger.info("Emitting ARSC.")
-    emit_event(
-        event_type=EventType.ARSC,
-        event_bus=EVENT_BUS_NAME,
-        event_json=mapped_arsc.model_dump_json(),
-    )
+    emit_model_event(event_bus=EVENT_BUS_NAME, event=mapped_arsc)
     logger.info("ARSC emitted.")
 
 
@@ -65,9 +61,7 @@ def _create_analysis_run(event: aru.AnalysisRunUpdate) -> AnalysisRun:
         logger.info(
             f"Looking for Analysis ({analysis_event.name}:{analysis_event.version}) with id {analysis_event.orcabusId}."
         )
-        analysis_db: Analysis = Analysis.objects.get(
-            orcabus_id=analysis_event.orcabusId
-        )
+        analysis_db: Analysis = reference_cache.get_analysis(analysis_event.orcabusId)
     except Exception as e:
         logger.error("No Analysis record found!")
         raise e
@@ -121,15 +115,15 @@ def _create_analysis_run(event: aru.AnalysisRunUpdate) -> AnalysisRun:
                     analysis_run.readsets.add(db_rs)
 
         if event.computeEnv:
-            rc = RunContext.objects.get_by_keyword(
-                usecase=RunContextUseCase.COMPUTE.value, name=event.computeEnv
-            ).first()
+            rc = reference_cache.get_run_context(
+                name=event.computeEnv, usecase=RunContextUseCase.COMPUTE.value
+            )
             analysis_run.contexts.add(rc)
 
         if event.storageEnv:
-            rc = RunContext.objects.get_by_keyword(
-                usecase=RunContextUseCase.STORAGE.value, name=event.storageEnv
-            ).first()
+            rc = reference_cache.get_run_context(
+                name=event.storageEnv, usecase=RunContextUseCase.STORAGE.value
+            )
             analysis_run.contexts.add(rc)
 
     logger.info(analysis_run)
@@ -143,11 +137,7 @@ def finalise_analysis_run(event: aru.AnalysisRunUpdate):
     db_record = _finalise_analysis_run(event)
     mapped_arsc = _map_analysis_run_to_arsc(db_record)
     logger.info("Emitting ARSC.")
-    emit_event(
-        event_type=EventType.ARSC,
-        event_bus=EVENT_BUS_NAME,
-        event_json=mapped_arsc.model_dump_json(),
-    )
+    emit_model_event(event_bus=EVENT_BUS_NAME, event=mapped_arsc)
     # TODO: add WorkflowRun DRAFT generation for workflows in analysis
     _create_workflow_runs_for_analysis_run(mapped_arsc)
     logger.info("ARSC emitted.")
@@ -205,13 +195,13 @@ def _finalise_analysis_run(event: aru.AnalysisRunUpdate) -> AnalysisRun:
     # but if it does not exist or they are not the same, we need to update
     # It does not matter if the entry exists or not the value from the event takes precedence
     if event.computeEnv:
-        compute_context: RunContext = RunContext.objects.get(
+        compute_context: RunContext = reference_cache.get_run_context(
             name=event.computeEnv, usecase=RunContextUseCase.COMPUTE.value
         )  # name + usecase => unique
         analysis_run_db.contexts.add(compute_context)
 
     if event.storageEnv:
-        storage_context: RunContext = RunContext.objects.get(
+        storage_context: RunContext = reference_cache.get_run_context(
             name=event.storageEnv, usecase=RunContextUseCase.STORAGE.value
         )  # name + usecase => unique
         analysis_run_db.contexts.add(storage_context)
@@ -348,39 +338,7 @@ def get_arsc_hash(ar_state: arsc.AnalysisRunStateChange) -> str:
         logger.info("ARSC already has a hash id. Skipping calculation.")
         return ar_state.id
 
-    # extract valuable keys from ARSC
-    keywords = list()
-
-    # ARSC values
-    keywords.append(ar_state.version)
-    keywords.append(ar_state.orcabusId)
-    # keywords.append(arsc.timestamp.isoformat())  # ignoring time changes for now
-    keywords.append(ar_state.status)
-    keywords.append(ar_state.analysisRunName)
-    keywords.append(ar_state.computeEnv)
-    keywords.append(ar_state.storageEnv)
-    keywords.append(ar_state.analysis.orcabusId)
-
-    # add libraries and their readsets
-    if ar_state.libraries:
-        for lib in ar_state.libraries:
-            keywords.append(lib.orcabusId)
-            if lib.readsets:
-                for readset in lib.readsets:
-                    keywords.append(readset.orcabusId)
-
-    # filter out any None values
-    keywords = list(filter(None, keywords))
-    # sort the list of keywords to avoid issues with record order
-    keywords.sort()
-    logger.info(f"ANR hash keys: {keywords}")
-
-    # create hash value
-    md5_object = hashlib.md5()
-    for key in keywords:
-        md5_object.update(key.encode("utf-8"))
-
-    return md5_object.hexdigest()
+    return fingerprint.arsc_fingerprint(ar_state)
 
 
 def _create_workflow_runs_for_analysis_run(
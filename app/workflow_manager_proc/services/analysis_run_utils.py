@@ -4,6 +4,7 @@ from typing import List
 from workflow_manager.models import Analysis, Workflow, Library, Status
 from workflow_manager.models.utils import create_portal_run_id
 from workflow_manager_proc.domain.event import wru, arsc
+from workflow_manager_proc.services import reference_cache
 from workflow_manager_proc.services.workflow_run import create_workflow_run
 
 logger = logging.getLogger(__name__)
@@ -15,8 +16,8 @@ wfr_name_prefix = "umccr--automated"
 def create_workflows_runs_from_analysis_run(
     analysis_run: arsc.AnalysisRunStateChange,
 ) -> None:
-    analysis_db: Analysis = Analysis.objects.get(
-        orcabus_id=analysis_run.analysis.orcabusId
+    analysis_db: Analysis = reference_cache.get_analysis(
+        analysis_run.analysis.orcabusId
     )
 
     # extract the libraries this analysis run is linked to
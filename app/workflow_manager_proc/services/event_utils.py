@@ -1,8 +1,12 @@
 import boto3
+import functools
+import json
 import logging
 import rfc8785
 import hashlib
 from enum import Enum
+from pydantic import TypeAdapter
+from workflow_manager.db import budget
 from workflow_manager_proc.domain.event import arsc, wrsc
 
 logger = logging.getLogger(__name__)
@@ -17,6 +21,12 @@ class EventType(Enum):
     ARSC = "AnalysisRunStateChange"
 
 
+@functools.cache
+def type_adapter(model: type) -> TypeAdapter:
+    """A (cached, as building one is not cheap) TypeAdapter for validating or dumping plain data as the model."""
+    return TypeAdapter(model)
+
+
 def emit_event(event_type: EventType, event_bus: str, event_json):
     """
     Parameters:
@@ -28,12 +38,36 @@ def emit_event(event_type: EventType, event_bus: str, event_json):
     # Check that the provided event json matches the schema requirements
     # TODO: check that this actually works
     if event_type == EventType.WRSC:
-        wrsc.WorkflowRunStateChange.model_validate_json(event_json)
+        type_adapter(wrsc.WorkflowRunStateChange).validate_json(event_json)
     elif event_type == EventType.ARSC:
-        arsc.AnalysisRunStateChange.model_validate_json(event_json)
+        type_adapter(arsc.AnalysisRunStateChange).validate_json(event_json)
     else:
         raise Exception(f"Unsupported event type: {event_type}")
 
+    return _put_event(event_type, event_bus, event_json)
+
+
+def emit_model_event(
+    event_bus: str, event: wrsc.WorkflowRunStateChange | arsc.AnalysisRunStateChange
+):
+    """
+    Emit an event the service has built itself: the model instance is trusted to be valid and serialised once,
+    without the round trip through `emit_event`'s validation of the JSON.
+
+    Parameters:
+        event_bus: the name of the event bus to emit the message to
+        event: the WorkflowRunStateChange or AnalysisRunStateChange to emit
+    """
+    event_type = EventType(type(event).__name__)
+    # a payload sent by reference goes without data (rather than null data)
+    payload = getattr(event, "payload", None)
+    exclude = {"payload": {"data"}} if payload and payload.data is None else None
+    with budget.phase("serialization"):
+        event_json = event.model_dump_json(exclude=exclude)
+    return _put_event(event_type, event_bus, event_json)
+
+
+def _put_event(event_type: EventType, event_bus: str, event_json: str):
     response = client.put_events(
         Entries=[
             {
@@ -51,6 +85,78 @@ def emit_event(event_type: EventType, event_bus: str, event_json):
     return response
 
 
+# integers beyond this are not exactly representable as JSON (IEEE 754 double) numbers
+_MAX_SAFE_INTEGER = 2**53 - 1
+
+
+class _NotCanonicalSubset(Exception):
+    pass
+
+
+def _prepare_canonical(obj):
+    """
+    Check that `obj` only uses the JSON subset for which `json.dumps` (sorted keys, compact) produces the RFC 8785
+    serialisation, and return it with its integral floats as ints (e.g. 2.0 is "2" in RFC 8785). The input is
+    never modified: containers are only copied if something inside them had to be converted.
+    Raises _NotCanonicalSubset otherwise.
+    """
+    t = type(obj)
+    if t is str or t is bool or obj is None:
+        return obj
+    if t is int:
+        if -_MAX_SAFE_INTEGER <= obj <= _MAX_SAFE_INTEGER:
+            return obj
+        raise _NotCanonicalSubset()
+    if t is float:
+        # repr and RFC 8785 (ECMAScript) agree on non-integral numbers in fixed notation
+        if obj.is_integer() and abs(obj) < 1e16:
+            return int(obj)
+        if 1e-4 <= abs(obj) < 1e16:
+            return obj
+        raise _NotCanonicalSubset()
+    if t is dict:
+        converted = None
+        for key, value in obj.items():
+            # RFC 8785 sorts keys by UTF-16 code units, which only differs from sorting by code points above U+D7FF
+            if type(key) is not str or (not key.isascii() and max(key) > "\ud7ff"):
+                raise _NotCanonicalSubset()
+            prepared = _prepare_canonical(value)
+            if prepared is not value:
+                if converted is None:
+                    converted = dict(obj)
+                converted[key] = prepared
+        return obj if converted is None else converted
+    if t is list or t is tuple:
+        converted = None
+        for i, value in enumerate(obj):
+            prepared = _prepare_canonical(value)
+            if prepared is not value:
+                if converted is None:
+                    converted = list(obj)
+                converted[i] = prepared
+        return obj if converted is None else converted
+    raise _NotCanonicalSubset()
+
+
+def canonical_json(data) -> bytes:
+    """
+    The canonical JSON (RFC 8785) of `data` as UTF-8 bytes.
+    Payloads within the common JSON subset (see `_prepare_canonical`) are serialised with the (C) json encoder,
+    anything else (e.g. floats in exponent notation, large integers, non-BMP object keys) with `rfc8785`.
+    """
+    try:
+        prepared = _prepare_canonical(data)
+        return json.dumps(
+            prepared,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            allow_nan=False,
+        ).encode("utf-8")
+    except (_NotCanonicalSubset, RecursionError, UnicodeEncodeError):
+        return rfc8785.dumps(data)
+
+
 def hash_payload_data(data: dict) -> str:
     """
     Generates a unique hash for the JSON represented as dict.
@@ -61,6 +167,9 @@ def hash_payload_data(data: dict) -> str:
     Returns: a hash of the input.
 
     """
-    data_canonical = rfc8785.dumps(data)
-    data_hash = hashlib.sha256(data_canonical).hexdigest()
-    return data_hash
+    return hash_canonical_json(canonical_json(data))
+
+
+def hash_canonical_json(data_canonical: bytes) -> str:
+    """The hash of payload data (see `hash_payload_data`) from its canonical JSON (see `canonical_json`)."""
+    return hashlib.sha256(data_canonical).hexdigest()
@@ -0,0 +1,229 @@
+"""
+In-process cache for the (rarely changing) reference data the event processors look up on every event:
+Workflow, Analysis, RunContext and AnalysisContext records.
+
+The cache lives for as long as the (warm) Lambda container and is bounded in size and age: each model has its own
+TTL cache that evicts the least recently used entries once full. Records are only remembered once the transaction
+that loaded them has committed, so nothing from a rolled back transaction outlives it.
+
+Invalidation:
+    - any save/delete of a cached model within this process drops the cached entries of that model
+    - `invalidate(model)` / `clear()` can be called explicitly (e.g. from tests or a control event)
+    - changes made elsewhere (e.g. via the API) are picked up once the entries expire (REFERENCE_CACHE_TTL)
+
+Warm start:
+    `warm_up()` loads a snapshot of all active reference data (one query per table) and seeds the caches with it,
+    so the first events after a cold start don't pay for the lookups one by one. The Lambdas run it at init when
+    REFERENCE_WARM_UP is enabled, and on a `{"warmUp": true}` event (see `is_warm_up_event`).
+
+Scope:
+    Only the event processors use the cache and the snapshot. The API (where reference data is edited) reads it from
+    the DB, loaded with the rows it belongs to (`select_related` / `prefetch_related` in the viewsets).
+"""
+
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Hashable, Mapping, NamedTuple, Optional, Tuple, Type
+
+from cachetools import TTLCache
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+
+from workflow_manager.models import (
+    Analysis,
+    AnalysisContext,
+    RunContext,
+    Workflow,
+    ValidationState,
+)
+from workflow_manager.models.analysis import AnalysisStatus
+from workflow_manager.models.analysis_context import AnalysisContextStatus
+from workflow_manager.models.run_context import RunContextStatus
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+REFERENCE_CACHE_TTL = int(os.environ.get("REFERENCE_CACHE_TTL", 300))  # seconds
+REFERENCE_CACHE_MAXSIZE = int(
+    os.environ.get("REFERENCE_CACHE_MAXSIZE", 256)
+)  # entries per model
+REFERENCE_WARM_UP = os.environ.get("REFERENCE_WARM_UP", "false").lower() == "true"
+
+CACHED_MODELS = (Workflow, Analysis, RunContext, AnalysisContext)
+
+_lock = threading.RLock()
+_caches = {
+    model: TTLCache(maxsize=REFERENCE_CACHE_MAXSIZE, ttl=REFERENCE_CACHE_TTL)
+    for model in CACHED_MODELS
+}
+
+
+def _get_or_load(model: Type[Model], key: Hashable, loader: Callable[[], Model]):
+    with _lock:
+        obj = _caches[model].get(key)
+    if obj is not None:
+        return obj
+
+    obj = loader()
+
+    def remember():
+        with _lock:
+            _caches[model][key] = obj
+
+    # runs straight away outside of a transaction
+    transaction.on_commit(remember)
+    return obj
+
+
+def get_workflow(orcabus_id: str) -> Workflow:
+    """Raises Workflow.DoesNotExist if there is no such record (misses are not cached)."""
+    key = orcabus_id[-26:]
+    return _get_or_load(Workflow, key, lambda: Workflow.objects.get(orcabus_id=key))
+
+
+def get_analysis(orcabus_id: str) -> Analysis:
+    """Raises Analysis.DoesNotExist if there is no such record (misses are not cached)."""
+    key = orcabus_id[-26:]
+    return _get_or_load(Analysis, key, lambda: Analysis.objects.get(orcabus_id=key))
+
+
+def get_run_context(name: str, usecase: str) -> RunContext:
+    """Raises RunContext.DoesNotExist if there is no such record (misses are not cached)."""
+    return _get_or_load(
+        RunContext,
+        (name, usecase),
+        lambda: RunContext.objects.get(name=name, usecase=usecase),
+    )
+
+
+def get_or_create_run_context(name: str, usecase: str) -> RunContext:
+    return _get_or_load(
+        RunContext,
+        (name, usecase),
+        lambda: RunContext.objects.get_or_create(name=name, usecase=usecase)[0],
+    )
+
+
+def get_analysis_context(name: str, usecase: str) -> AnalysisContext:
+    """Raises AnalysisContext.DoesNotExist if there is no such record (misses are not cached)."""
+    return _get_or_load(
+        AnalysisContext,
+        (name, usecase),
+        lambda: AnalysisContext.objects.get(name=name, usecase=usecase),
+    )
+
+
+class ReferenceSnapshot(NamedTuple):
+    """Read-only view of the active reference data at the time it was loaded."""
+
+    workflows: Mapping[str, Workflow]  # by OrcaBus ID (without prefix)
+    analyses: Mapping[str, Analysis]  # by OrcaBus ID (without prefix)
+    run_contexts: Mapping[Tuple[str, str], RunContext]  # by (name, usecase)
+    analysis_contexts: Mapping[Tuple[str, str], AnalysisContext]  # by (name, usecase)
+    loaded_at: float
+
+
+_snapshot: Optional[ReferenceSnapshot] = None
+
+
+def load_snapshot() -> ReferenceSnapshot:
+    """
+    Load all active reference data, one query per table. Inactive records (e.g. deprecated workflows) are left
+    out, lookups for those still go to the DB.
+    """
+    workflows = Workflow.objects.exclude(
+        validation_state__in=[ValidationState.DEPRECATED, ValidationState.FAILED]
+    )
+    analyses = Analysis.objects.filter(status=AnalysisStatus.ACTIVE)
+    run_contexts = RunContext.objects.filter(status=RunContextStatus.ACTIVE)
+    analysis_contexts = AnalysisContext.objects.filter(
+        status=AnalysisContextStatus.ACTIVE
+    )
+    return ReferenceSnapshot(
+        workflows=MappingProxyType({w.orcabus_id[-26:]: w for w in workflows}),
+        analyses=MappingProxyType({a.orcabus_id[-26:]: a for a in analyses}),
+        run_contexts=MappingProxyType({(c.name, c.usecase): c for c in run_contexts}),
+        analysis_contexts=MappingProxyType(
+            {(c.name, c.usecase): c for c in analysis_contexts}
+        ),
+        loaded_at=time.time(),
+    )
+
+
+def get_snapshot() -> Optional[ReferenceSnapshot]:
+    """The snapshot of the last warm up (if any)."""
+    return _snapshot
+
+
+def warm_up() -> Optional[ReferenceSnapshot]:
+    """
+    Load a reference data snapshot and seed the caches with it. Failures are logged, not raised: a failed
+    warm up only means the lookups fall back to the DB.
+    """
+    start = time.perf_counter()
+    try:
+        snapshot = load_snapshot()
+    except Exception as e:
+        logger.warning(f"Reference data warm up failed: {e}")
+        return None
+
+    def seed():
+        global _snapshot
+        with _lock:
+            for model, entries in [
+                (Workflow, snapshot.workflows),
+                (Analysis, snapshot.analyses),
+                (RunContext, snapshot.run_contexts),
+                (AnalysisContext, snapshot.analysis_contexts),
+            ]:
+                for key, obj in entries.items():
+                    _caches[model][key] = obj
+            _snapshot = snapshot
+
+    transaction.on_commit(seed)
+    logger.info(
+        f"Reference data warmed up in {(time.perf_counter() - start) * 1000:.1f}ms: "
+        f"{len(snapshot.workflows)} workflows, {len(snapshot.analyses)} analyses, "
+        f"{len(snapshot.run_contexts)} run contexts, {len(snapshot.analysis_contexts)} analysis contexts."
+    )
+    return snapshot
+
+
+def is_warm_up_event(event) -> bool:
+    """A lightweight warm-up event (e.g. from a schedule): {"warmUp": true}"""
+    return isinstance(event, dict) and event.get("warmUp") is True
+
+
+def invalidate(model: Optional[Type[Model]] = None) -> None:
+    """Drop all cached entries of the given model (or of all models)."""
+    with _lock:
+        for m in [model] if model else CACHED_MODELS:
+            _caches[m].clear()
+
+
+def clear() -> None:
+    global _snapshot
+    invalidate()
+    _snapshot = None
+
+
+def cache_info() -> dict:
+    with _lock:
+        return {m.__name__: len(_caches[m]) for m in CACHED_MODELS}
+
+
+def _on_change(sender, **kwargs):
+    invalidate(sender)
+
+
+for _model in CACHED_MODELS:
+    post_save.connect(
+        _on_change, sender=_model, dispatch_uid=f"reference_cache_{_model.__name__}"
+    )
+    post_delete.connect(
+        _on_change, sender=_model, dispatch_uid=f"reference_cache_{_model.__name__}"
+    )
@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 import uuid
@@ -6,7 +5,10 @@ import uuid
 from django.db import transaction
 from django.utils import timezone
 
+from workflow_manager import fingerprint
+from workflow_manager.db import budget
 from workflow_manager.models import (
+    ArchivedWorkflowRun,
     WorkflowRun,
     Workflow,
     Library,
@@ -21,12 +23,13 @@ from workflow_manager.models.run_context import (
     RunContextUseCase,
     RunContextStatus,
 )
-from workflow_manager.models.utils import WorkflowRunUtil
+from workflow_manager.models.utils import WorkflowRunUtil, lock_workflow_run
 from workflow_manager_proc.domain.event import wrsc, wru
+from workflow_manager_proc.services import reference_cache
 from workflow_manager_proc.services.event_utils import (
-    emit_event,
-    EventType,
-    hash_payload_data,
+    canonical_json,
+    emit_model_event,
+    hash_canonical_json,
 )
 
 logger = logging.getLogger()
@@ -37,6 +40,11 @@ EVENT_BUS_NAME = os.environ.get("EVENT_BUS_NAME")
 WRSC_SCHEMA_VERSION = (
     "1.0.0"  # TODO: set somewhere more global (and check against schema?)
 )
+# the largest WRSC (bytes of JSON of the whole event) to inline the payload data in, else it is sent by reference.
+# EventBridge limits an entry to 256KB (262144 bytes), which also counts its Source and DetailType: leave a margin.
+WRSC_MAX_BYTES = int(os.environ.get("WRSC_MAX_BYTES", 256_000))
+# the JSON added to a WRSC by the payload data, on top of the data itself
+PAYLOAD_DATA_MEMBER_BYTES = len(',"data":')
 
 
 def sanitize_orcabus_id(orcabus_id: str) -> str:
@@ -51,11 +59,7 @@ def create_workflow_run(event: wru.WorkflowRunUpdate):
     if out_wrsc:
         # new state resulted in state transition, we can relay the WRSC
         logger.info("Emitting WRSC.")
-        emit_event(
-            event_type=EventType.WRSC,
-            event_bus=EVENT_BUS_NAME,
-            event_json=out_wrsc.model_dump_json(),
-        )
+        emit_model_event(event_bus=EVENT_BUS_NAME, event=out_wrsc)
     else:
         # ignore - state has not been updated
         logger.info(f"WorkflowRun state not updated. No event to emit.")
@@ -72,6 +76,8 @@ def _create_workflow_run(
     Procedure:
         - check whether a corresponding Workflow record exists (it should according to the pre-planning approach)
             - if not exist, create (support on-the-fly approach)
+        - acquire the per-run lock, so concurrent events for the same portalRunId are processed one after another
+        - ignore (late) events of a workflow run that has been archived already
         - check whether a WorkflowRun record exists (it should if this is not the first/initial state)
             - if not exist, create
             - associate any libraries at this point (later updates/linking is not supported at this point)
@@ -87,6 +93,17 @@ def _create_workflow_run(
     # We expect a corresponding Workflow has to exist for each workflow run
     workflow = get_workflow(event)
 
+    # Serialise with any concurrent processing of the same workflow run (held until the transaction ends).
+    # Without it, concurrent events could both miss the WorkflowRun lookup or both read the same current state.
+    lock_workflow_run(event.portalRunId)
+
+    # A run moved to the archive (see workflow_manager.archive, under the same lock) is not created again
+    if ArchivedWorkflowRun.objects.filter(portal_run_id=event.portalRunId).exists():
+        logger.warning(
+            f"WorkflowRun {event.portalRunId} is archived, ignoring update: {event.status}"
+        )
+        return None
+
     # Then create the actual workflow run entry if it does not exist
     wfr = create_or_get_workflow_run(event, workflow)
 
@@ -112,7 +129,7 @@ def _create_workflow_run(
 def get_workflow(event: wru.WorkflowRunUpdate):
     try:
         logger.info(f"Looking for Workflow ({event.workflow}).")
-        workflow: Workflow = Workflow.objects.get(orcabus_id=event.workflow.orcabusId)
+        workflow: Workflow = reference_cache.get_workflow(event.workflow.orcabusId)
         return workflow
     except Exception as e:
         logger.error("No Workflow record found! Raising exception.")
@@ -122,19 +139,18 @@ def get_workflow(event: wru.WorkflowRunUpdate):
 def create_or_get_workflow_run(
     event: wru.WorkflowRunUpdate, workflow: Workflow
 ) -> WorkflowRun:
-    try:
-        wfr: WorkflowRun = WorkflowRun.objects.get(portal_run_id=event.portalRunId)
-    except Exception:
-        logger.info("No WorkflowRun record found! Creating new entry.")
-        wfr = WorkflowRun(
-            portal_run_id=event.portalRunId,
-            workflow_run_name=event.workflowRunName,
-            execution_id=event.executionId,
-            workflow=workflow,
-        )
-        logger.info(wfr)
-        logger.info("Persisting WorkflowRun record.")
-        wfr.save()
+    wfr = WorkflowRun(
+        portal_run_id=event.portalRunId,
+        workflow_run_name=event.workflowRunName,
+        execution_id=event.executionId,
+        workflow=workflow,
+    )
+    # Single upsert on the portal_run_id: either creates the record or loads the existing one
+    # (filling in the execution_id if it was not known before)
+    created = WorkflowRun.objects.upsert(wfr)
+
+    if created:
+        logger.info(f"No WorkflowRun record found! Created new entry: {wfr}")
 
         # NOTE: the library linking is expected to be established at workflow run creation time.
         #       Later changes will currently be ignored.
@@ -142,10 +158,6 @@ def create_or_get_workflow_run(
         # if the workflow run is linked to library record(s), create the association(s)
         establish_workflow_run_libraries(event, wfr)
 
-    if event.executionId and not wfr.execution_id:
-        wfr.execution_id = event.executionId
-        wfr.save()
-
     return wfr
 
 
@@ -155,6 +167,7 @@ def establish_workflow_run_libraries(
     if not event.libraries:
         return
 
+    associations = []
     for input_rec in event.libraries:
         # make sure OrcaBus ID format is sanitized (without prefix) for lookups
         orca_id = sanitize_orcabus_id(input_rec.orcabusId)
@@ -170,13 +183,18 @@ def establish_workflow_run_libraries(
             )
 
         # create the library association
-        LibraryAssociation.objects.create(
-            workflow_run=wfr,
-            library=db_lib,
-            association_date=timezone.now(),
-            status=ASSOCIATION_STATUS,
+        associations.append(
+            LibraryAssociation(
+                workflow_run=wfr,
+                library=db_lib,
+                association_date=timezone.now(),
+                status=ASSOCIATION_STATUS,
+            )
         )
 
+    # persist all associations at once
+    LibraryAssociation.objects.bulk_create_validated(associations)
+
 
 def establish_workflow_run_readsets(
     event: wru.WorkflowRunUpdate, wfr: WorkflowRun
@@ -228,7 +246,7 @@ def establish_workflow_run_contexts(
 ) -> None:
     # process computeEnv
     if event.computeEnv:
-        compute_run_ctx, _ = RunContext.objects.get_or_create(
+        compute_run_ctx = reference_cache.get_or_create_run_context(
             name=event.computeEnv,
             usecase=RunContextUseCase.COMPUTE.value,
         )
@@ -236,7 +254,7 @@ def establish_workflow_run_contexts(
 
     # process storageEnv
     if event.storageEnv:
-        storage_run_ctx, _ = RunContext.objects.get_or_create(
+        storage_run_ctx = reference_cache.get_or_create_run_context(
             name=event.storageEnv,
             usecase=RunContextUseCase.STORAGE.value,
         )
@@ -253,27 +271,23 @@ def update_workflow_run_to_new_state(
     )
 
     # Handle the payload
-    # If we already have that payload in the DB we reuse it,
+    # If we already have that payload in the DB we reuse it (resolved on persist),
     # otherwise we create a new record
     if event.payload:
         # Make sure the provided refId is either not set or matches the expected hash value
-        calculated_data_hash = hash_payload_data(event.payload.data)
+        data_canonical = canonical_json(event.payload.data)
+        calculated_data_hash = hash_canonical_json(data_canonical)
         data_hash = event.payload.refId if event.payload.refId else calculated_data_hash
         assert (
             calculated_data_hash == data_hash
         ), "Provided Payload data hash does not match expected value"
-        try:
-            pld: Payload = Payload.objects.get(
-                payload_ref_id=data_hash, version=event.payload.version
-            )
-        except Exception:
-            pld = Payload(
-                payload_ref_id=hash_payload_data(
-                    event.payload.data
-                ),  # use a hash of the payload data as refId
-                version=event.payload.version,
-                data=event.payload.data,
-            )
+        pld = Payload(
+            payload_ref_id=calculated_data_hash,  # use a hash of the payload data as refId
+            version=event.payload.version,
+            data=event.payload.data,
+        )
+        # to size the WRSC without serialising the data again
+        pld.data_json_size = len(data_canonical)
         new_state.payload = pld
 
     # Attempt to transition to new state (will persist new state if successful)
@@ -350,7 +364,6 @@ def map_workflow_run_new_state_to_wrsc(
             orcabusId=new_state.payload.orcabus_id,
             refId=new_state.payload.payload_ref_id,
             version=new_state.payload.version,
-            data=new_state.payload.data,
         )
 
     # Set RunContext
@@ -376,9 +389,30 @@ def map_workflow_run_new_state_to_wrsc(
     # Set ID by applying hash function
     out_wrsc.id = get_wrsc_hash(out_wrsc)
 
+    # Set the payload data, unless the WRSC gets too large: then it is sent by reference (without the data),
+    # to be fetched from the API by refId. The data does not change the ID.
+    if new_state.payload:
+        if is_inline_payload(out_wrsc, new_state.payload):
+            out_wrsc.payload.data = new_state.payload.data
+            budget.count("wrscPayloadInlined")
+        else:
+            logger.info(f"Payload {out_wrsc.payload.refId} sent by reference.")
+            budget.count("wrscPayloadReferenced")
+
     return out_wrsc
 
 
+def is_inline_payload(out_wrsc: wrsc.WorkflowRunStateChange, payload: Payload) -> bool:
+    """If the WRSC (without payload data yet) with the payload data included stays within WRSC_MAX_BYTES."""
+    data_size = payload.data_json_size
+    if data_size is None:
+        data_size = len(canonical_json(payload.data))
+    event_size = len(
+        out_wrsc.model_dump_json(exclude={"payload": {"data"}}).encode("utf-8")
+    )
+    return event_size + PAYLOAD_DATA_MEMBER_BYTES + data_size <= WRSC_MAX_BYTES
+
+
 def get_wrsc_hash(out_wrsc: wrsc.WorkflowRunStateChange) -> str:
     # if there is already a hash then we simply return that
     # TODO: allow force creation
@@ -386,52 +420,4 @@ def get_wrsc_hash(out_wrsc: wrsc.WorkflowRunStateChange) -> str:
     if out_wrsc.id:
         return out_wrsc.id
 
-    # extract valuable keys from out_wrsc
-    keywords = list()
-
-    # out_wrsc values
-    # TODO: we may want to add the field names as well to avoid potential issues same values in different fields. Though very unlikely.
-    keywords.append(out_wrsc.version)
-    # keywords.append(out_wrsc.timestamp.isoformat())  # ignoring time changes for now
-    keywords.append(out_wrsc.orcabusId)
-    keywords.append(out_wrsc.portalRunId)
-    keywords.append(out_wrsc.workflowRunName)
-    if out_wrsc.executionId:
-        keywords.append(out_wrsc.executionId)
-    keywords.append(out_wrsc.status)
-    keywords.append(out_wrsc.workflow.orcabusId)
-
-    if out_wrsc.payload:
-        # use the refId field which holds a hash of the payload data
-        keywords.append(out_wrsc.payload.refId)
-
-    if out_wrsc.analysisRun:
-        keywords.append(out_wrsc.analysisRun.orcabusId)
-
-    # add libraries
-    if out_wrsc.libraries:
-        for lib in out_wrsc.libraries:
-            keywords.append(lib.orcabusId)
-
-            # add readsets
-            if lib.readsets:
-                for rs in lib.readsets:
-                    keywords.append(rs.orcabusId)
-
-    if out_wrsc.computeEnv:
-        keywords.append(out_wrsc.computeEnv)
-
-    if out_wrsc.storageEnv:
-        keywords.append(out_wrsc.storageEnv)
-
-    # filter out any None values
-    keywords = list(filter(None, keywords))
-    # sort the list of keywords to avoid issues with record order
-    keywords.sort()
-
-    # create hash value
-    md5_object = hashlib.md5()
-    for key in keywords:
-        md5_object.update(key.encode("utf-8"))
-
-    return md5_object.hexdigest()
+    return fingerprint.wrsc_fingerprint(out_wrsc)
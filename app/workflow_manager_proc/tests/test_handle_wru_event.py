@@ -47,6 +47,18 @@ class WruEventHandlerUnitTests(WorkflowManagerProcUnitTestCase):
         self.assertEqual(WorkflowRun.objects.count(), 0)
         self.assertEqual(Library.objects.count(), 0)
 
+    def test_handle_warm_up_event(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_handle_wru_event.WruEventHandlerUnitTests.test_handle_warm_up_event
+        """
+        _ = WorkflowFactory()
+
+        # only loads the reference data (one query per table), no event processing
+        with self.assertNumQueries(4):
+            handle_wru_event.handler({"warmUp": True}, None)
+
+        self.assertEqual(WorkflowRun.objects.count(), 0)
+
     def test_handle_wru_event(self):
         """
         python manage.py test workflow_manager_proc.tests.test_handle_wru_event.WruEventHandlerUnitTests.test_handle_wru_event
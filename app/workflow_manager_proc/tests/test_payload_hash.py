@@ -1,8 +1,16 @@
+import copy
 import json
 import logging
+import math
+import os
+import random
 
+import rfc8785
 from django.test import TestCase
-from workflow_manager_proc.services.event_utils import hash_payload_data
+from workflow_manager_proc.services.event_utils import (
+    canonical_json,
+    hash_payload_data,
+)
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -229,3 +237,104 @@ class PayloadHashUnitTestCase(TestCase):
         json_2_hash = hash_payload_data(json.loads(json_2))
 
         self.assertNotEqual(json_1_hash, json_2_hash, "Hashes do not match!")
+
+
+def random_json(rnd: random.Random, depth: int = 0):
+    """A random JSON value, including the edge cases of RFC 8785 (numbers, escapes, key order)."""
+    kind = rnd.choice(
+        ["dict", "list"]
+        if depth == 0
+        else ["dict", "list", "scalar", "scalar", "scalar"]
+    )
+    if kind == "dict" and depth < 4:
+        return {
+            random_string(rnd): random_json(rnd, depth + 1)
+            for _ in range(rnd.randint(0, 6))
+        }
+    if kind == "list" and depth < 4:
+        return [random_json(rnd, depth + 1) for _ in range(rnd.randint(0, 6))]
+    return rnd.choice(
+        [
+            None,
+            True,
+            False,
+            rnd.randint(-1000, 1000),
+            rnd.choice([0, 2**53 - 1, -(2**53) + 1]),
+            float(rnd.randint(-(10**6), 10**6)),
+            -0.0,
+            rnd.uniform(-1000, 1000),
+            rnd.uniform(0, 1) * 10 ** rnd.randint(-30, 30),
+            random_string(rnd),
+        ]
+    )
+
+
+def random_string(rnd: random.Random) -> str:
+    alphabet = 'abcXYZ019 _-"\\/\b\f\n\r\t\x00\x1f\x7fé中\ud7ff\ue000\uffff😀𝄞'
+    return "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 8)))
+
+
+class CanonicalJsonTestCase(TestCase):
+
+    def test_matches_rfc8785(self) -> None:
+        """
+        python manage.py test workflow_manager_proc.tests.test_payload_hash.CanonicalJsonTestCase.test_matches_rfc8785
+        """
+        rnd = random.Random(8785)
+        for _ in range(2000):
+            data = random_json(rnd)
+            self.assertEqual(canonical_json(data), rfc8785.dumps(data), data)
+
+    def test_edge_cases(self) -> None:
+        """
+        python manage.py test workflow_manager_proc.tests.test_payload_hash.CanonicalJsonTestCase.test_edge_cases
+        """
+        for data in [
+            {"a": 2.0, "b": -0.0, "c": 1e-7, "d": 1e21, "e": 1e16, "f": 123.456},
+            {"n": 9007199254740994.0, "m": 0.0001, "o": 1e-4 / 3},
+            {"\ue000": 1, "😀": 2, "\ud7ff": 3, "a": 4},
+            {"s": "\x00\x08\x0c\x1f\x7f\u2028\u2029</script>"},
+            ("tuple", 1, [2, (3,)]),
+            [],
+            {},
+        ]:
+            self.assertEqual(canonical_json(data), rfc8785.dumps(data), data)
+
+    def test_unsupported(self) -> None:
+        """
+        python manage.py test workflow_manager_proc.tests.test_payload_hash.CanonicalJsonTestCase.test_unsupported
+        """
+        # rejected just like by rfc8785
+        for data in [
+            {"a": math.nan},
+            [math.inf],
+            {"a": 2**53},
+            {1: "a"},
+            {"a": object()},
+            "\ud800",
+        ]:
+            with self.assertRaises(rfc8785.CanonicalizationError):
+                rfc8785.dumps(data)
+            with self.assertRaises(rfc8785.CanonicalizationError):
+                canonical_json(data)
+
+    def test_input_not_modified(self) -> None:
+        """
+        python manage.py test workflow_manager_proc.tests.test_payload_hash.CanonicalJsonTestCase.test_input_not_modified
+        """
+        data = {"b": [1.0, {"c": 2.0}], "a": 1.5}
+        original = copy.deepcopy(data)
+        self.assertEqual(canonical_json(data), b'{"a":1.5,"b":[1,{"c":2}]}')
+        self.assertEqual(data, original)
+        self.assertIs(type(data["b"][0]), float)
+
+    def test_fixture_ref_id(self) -> None:
+        """
+        python manage.py test workflow_manager_proc.tests.test_payload_hash.CanonicalJsonTestCase.test_fixture_ref_id
+        """
+        # the refId of the fixture was calculated with rfc8785
+        with open(
+            os.path.join(os.path.dirname(__file__), "fixtures", "WRU_max.json")
+        ) as f:
+            payload = json.load(f)["detail"]["payload"]
+        self.assertEqual(hash_payload_data(payload["data"]), payload["refId"])
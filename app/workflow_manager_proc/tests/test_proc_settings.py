@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# None of these are needed to process events (see settings.proc)
+FORBIDDEN_MODULES = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "corsheaders",
+    "rest_framework",
+    "drf_spectacular",
+    "djangorestframework_camel_case",
+    "aws_xray_sdk",
+]
+
+# generous, only meant to catch substantial regressions (the lean profile takes well below 1s locally)
+IMPORT_TIME_BUDGET_MS = int(os.environ.get("PROC_IMPORT_TIME_BUDGET_MS", 5000))
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Parse the `python -X importtime` report into {module: cumulative import time in microseconds}.
+    Report lines look like: `import time:       212 |       1234 |   package.module`
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def importtime(code: str, settings_module: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": settings_module},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return parse_importtime(proc.stderr)
+
+
+class ProcSettingsImportTests(SimpleTestCase):
+
+    def test_handler_imports(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_proc_settings.ProcSettingsImportTests.test_handler_imports
+        """
+        for handler in ["handle_wru_event", "handle_aru_event"]:
+            module = f"workflow_manager_proc.lambdas.{handler}"
+            modules = importtime(
+                f"import {module}; from django.apps import apps; apps.get_model('workflow_manager', 'WorkflowRun')",
+                "workflow_manager.settings.proc",
+            )
+
+            self.assertIn(module, modules)
+            imported = [
+                m
+                for m in modules
+                if any(m == f or m.startswith(f + ".") for f in FORBIDDEN_MODULES)
+            ]
+            self.assertEqual(imported, [], f"{handler} imports {imported}")
+            self.assertLess(modules[module] / 1000, IMPORT_TIME_BUDGET_MS)
+
+    def test_parse_importtime(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_proc_settings.ProcSettingsImportTests.test_parse_importtime
+        """
+        report = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       212 |        212 |   foo.bar\n"
+            "import time:       100 |        312 | foo\n"
+            "some other output\n"
+        )
+        self.assertEqual(parse_importtime(report), {"foo.bar": 212, "foo": 312})
@@ -0,0 +1,116 @@
+from django.test import TestCase
+
+from workflow_manager.models import Analysis, RunContext, Workflow
+from workflow_manager.models.run_context import RunContextUseCase
+from workflow_manager.tests.factories import WorkflowFactory
+from workflow_manager_proc.services import reference_cache
+
+
+class ReferenceCacheUnitTests(TestCase):
+
+    def setUp(self) -> None:
+        reference_cache.clear()
+        self.wfl = WorkflowFactory()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        reference_cache.clear()
+        super().tearDown()
+
+    def test_get_workflow(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_reference_cache.ReferenceCacheUnitTests.test_get_workflow
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                wfl = reference_cache.get_workflow(self.wfl.orcabus_id)
+        self.assertEqual(wfl.orcabus_id, self.wfl.orcabus_id)
+
+        # prefixed and plain ids hit the same entry
+        with self.assertNumQueries(0):
+            self.assertEqual(reference_cache.get_workflow(self.wfl.orcabus_id), wfl)
+            self.assertEqual(
+                reference_cache.get_workflow(self.wfl.orcabus_id[-26:]), wfl
+            )
+
+    def test_not_cached_before_commit(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_reference_cache.ReferenceCacheUnitTests.test_not_cached_before_commit
+        """
+        # without the commit (callbacks discarded) nothing is remembered
+        with self.captureOnCommitCallbacks(execute=False):
+            reference_cache.get_or_create_run_context(
+                "research", RunContextUseCase.COMPUTE.value
+            )
+        self.assertEqual(reference_cache.cache_info()["RunContext"], 0)
+
+    def test_missing_record(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_reference_cache.ReferenceCacheUnitTests.test_missing_record
+        """
+        with self.assertRaises(Analysis.DoesNotExist):
+            reference_cache.get_analysis("ana.01J5M2JFE1JPYV62RYQEG99CPW")
+        with self.assertRaises(RunContext.DoesNotExist):
+            reference_cache.get_run_context("foo", RunContextUseCase.STORAGE.value)
+
+    def test_invalidate_on_change(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_reference_cache.ReferenceCacheUnitTests.test_invalidate_on_change
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            reference_cache.get_workflow(self.wfl.orcabus_id)
+            reference_cache.get_or_create_run_context(
+                "research", RunContextUseCase.COMPUTE.value
+            )
+        self.assertEqual(reference_cache.cache_info()["Workflow"], 1)
+        self.assertEqual(reference_cache.cache_info()["RunContext"], 1)
+
+        # any save of the model drops its entries
+        wfl = Workflow.objects.get(pk=self.wfl.orcabus_id)
+        wfl.validation_state = "VALIDATED"
+        wfl.save()
+        self.assertEqual(reference_cache.cache_info()["Workflow"], 0)
+        self.assertEqual(reference_cache.cache_info()["RunContext"], 1)
+
+        reference_cache.invalidate(RunContext)
+        self.assertEqual(reference_cache.cache_info()["RunContext"], 0)
+
+    def test_warm_up(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_reference_cache.ReferenceCacheUnitTests.test_warm_up
+        """
+        deprecated = Workflow.objects.create(
+            name="OldWorkflow",
+            version="0.1",
+            execution_engine="ICA",
+            validation_state="DEPRECATED",
+        )
+        RunContext.objects.create(name="research", usecase="COMPUTE")
+        RunContext.objects.create(name="old", usecase="COMPUTE", status="INACTIVE")
+
+        # one query per table
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(4):
+                snapshot = reference_cache.warm_up()
+
+        self.assertEqual(reference_cache.get_snapshot(), snapshot)
+        self.assertEqual(list(snapshot.workflows), [self.wfl.orcabus_id[-26:]])
+        self.assertEqual(list(snapshot.run_contexts), [("research", "COMPUTE")])
+        with self.assertRaises(TypeError):
+            snapshot.workflows["foo"] = self.wfl
+
+        # active records are served from the seeded caches, inactive ones still from the DB
+        with self.assertNumQueries(0):
+            reference_cache.get_workflow(self.wfl.orcabus_id)
+            reference_cache.get_run_context("research", "COMPUTE")
+        with self.assertNumQueries(1):
+            reference_cache.get_workflow(deprecated.orcabus_id)
+
+    def test_is_warm_up_event(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_reference_cache.ReferenceCacheUnitTests.test_is_warm_up_event
+        """
+        self.assertTrue(reference_cache.is_warm_up_event({"warmUp": True}))
+        self.assertFalse(reference_cache.is_warm_up_event({"warmUp": "yes"}))
+        self.assertFalse(reference_cache.is_warm_up_event({"detail": {}}))
+        self.assertFalse(reference_cache.is_warm_up_event(None))
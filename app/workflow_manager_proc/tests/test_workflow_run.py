@@ -1,9 +1,11 @@
+import json
 import os
 from unittest import mock
 
 from django.utils import timezone
-from mockito import when, unstub
+from mockito import when, unstub, verify
 
+from workflow_manager.db.budget import sql_budget
 from workflow_manager.models import (
     Workflow,
     WorkflowRun,
@@ -19,7 +21,11 @@ from workflow_manager.models.run_context import RunContextUseCase
 from workflow_manager.tests.factories import WorkflowRunFactory, WorkflowFactory
 from workflow_manager_proc.domain.event import wrsc
 from workflow_manager_proc.services import workflow_run
-from workflow_manager_proc.services.event_utils import hash_payload_data
+from workflow_manager_proc.services.event_utils import (
+    canonical_json,
+    emit_model_event,
+    hash_payload_data,
+)
 from workflow_manager_proc.tests.case import WorkflowManagerProcUnitTestCase, logger
 
 
@@ -48,6 +54,21 @@ class WorkflowRunSrvUnitTests(WorkflowManagerProcUnitTestCase):
         self.assertEqual(State.objects.count(), 1)
         self.assertEqual(Payload.objects.count(), 0)
 
+    def test_create_workflow_run_emits_wrsc(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_create_workflow_run_emits_wrsc
+        """
+        _ = WorkflowFactory()
+        self.load_mock_wru_max()
+        out_wrsc = workflow_run.create_workflow_run(self.mock_wru_max)
+
+        # the WRSC built by the service is serialised once and not validated again
+        self.mock_boto3.put_events.assert_called_once()
+        entry = self.mock_boto3.put_events.call_args.kwargs["Entries"][0]
+        self.assertEqual(entry["DetailType"], "WorkflowRunStateChange")
+        self.assertEqual(entry["Detail"], out_wrsc.model_dump_json())
+        wrsc.WorkflowRunStateChange.model_validate_json(entry["Detail"])
+
     def test_create_workflow_run_with_multiple_drafts(self):
         """
         python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_create_workflow_run_with_multiple_drafts
@@ -224,6 +245,35 @@ class WorkflowRunSrvUnitTests(WorkflowManagerProcUnitTestCase):
         self.assertEqual(State.objects.count(), 0)
         self.assertEqual(Payload.objects.count(), 0)
 
+    def test_create_workflow_run_emits_each_new_state(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_create_workflow_run_emits_each_new_state
+        """
+        _ = WorkflowFactory()
+        self.load_mock_wru_draft_1()
+        draft_a = self.mock_wru_draft_1
+        draft_b = draft_a.model_copy(deep=True)
+        draft_b.payload.data = {**draft_a.payload.data, "tags": {"updated": True}}
+        when(workflow_run).emit_model_event(...).thenReturn(None)
+
+        # DRAFT(A), then DRAFT(B) (processed by another container, emitted from there), then DRAFT(A) again:
+        # the second DRAFT(A) is a new state of the run, so it is persisted and emitted from here
+        draft_a.timestamp = timezone.now()
+        first = workflow_run.create_workflow_run(draft_a)
+        draft_b.timestamp = timezone.now()
+        self.assertIsNotNone(workflow_run._create_workflow_run(draft_b))
+        draft_a.timestamp = timezone.now()
+        again = workflow_run.create_workflow_run(draft_a)
+        self.assertIsNotNone(again)
+        self.assertEqual(first.id, again.id)
+        self.assertEqual(State.objects.count(), 3)
+        verify(workflow_run, times=2).emit_model_event(...)
+
+        # a redelivered DRAFT(A) does not change the current state: nothing is persisted or emitted
+        self.assertIsNone(workflow_run.create_workflow_run(draft_a))
+        self.assertEqual(State.objects.count(), 3)
+        verify(workflow_run, times=2).emit_model_event(...)
+
     def test_get_workflow(self):
         """
         python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_get_workflow
@@ -611,6 +661,94 @@ class WorkflowRunSrvUnitTests(WorkflowManagerProcUnitTestCase):
             "99995678-238c-4200-b632-d5dd8c8db94a",
         )
 
+    def test_create_or_get_workflow_run_statements(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_create_or_get_workflow_run_statements
+        """
+        _ = WorkflowFactory()
+        self.load_mock_wru_min()
+        wfl_persisted_in_db = workflow_run.get_workflow(self.mock_wru_min)
+        wfr = workflow_run.create_or_get_workflow_run(
+            self.mock_wru_min, wfl_persisted_in_db
+        )
+        self.assertTrue(wfr.orcabus_id.startswith("wfr."))
+        self.assertIsNone(wfr.execution_id)
+
+        # an existing run is loaded with the single upsert statement (which also fills in the execution_id)
+        self.load_mock_wru_max()
+        with self.assertNumQueries(1):
+            wfr2 = workflow_run.create_or_get_workflow_run(
+                self.mock_wru_max, wfl_persisted_in_db
+            )
+        self.assertEqual(wfr.orcabus_id, wfr2.orcabus_id)
+        self.assertEqual(wfr2.execution_id, self.mock_wru_max.executionId)
+
+        # an execution_id is never overwritten
+        self.mock_wru_max.executionId = "another-execution-id"
+        wfr3 = workflow_run.create_or_get_workflow_run(
+            self.mock_wru_max, wfl_persisted_in_db
+        )
+        self.assertNotEqual(wfr3.execution_id, "another-execution-id")
+        self.assertEqual(WorkflowRun.objects.count(), 1)
+
+    def test_update_workflow_run_to_new_state_statements(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_update_workflow_run_to_new_state_statements
+        """
+        _ = WorkflowFactory()
+        self.load_mock_wru_max()
+        wfl_persisted_in_db = workflow_run.get_workflow(self.mock_wru_max)
+        wfr = workflow_run.create_or_get_workflow_run(
+            self.mock_wru_max, wfl_persisted_in_db
+        )
+
+        # state history lookup, payload insert and state insert
+        with self.assertNumQueries(3):
+            success, state = workflow_run.update_workflow_run_to_new_state(
+                self.mock_wru_max, wfr
+            )
+        self.assertTrue(success)
+        self.assertTrue(state.orcabus_id.startswith("stt."))
+        self.assertTrue(state.payload.orcabus_id.startswith("pld."))
+
+        # the same payload on a later state is shared, not duplicated
+        self.mock_wru_max.status = "RUNNING"
+        self.mock_wru_max.timestamp = timezone.now()
+        success, state2 = workflow_run.update_workflow_run_to_new_state(
+            self.mock_wru_max, wfr
+        )
+        self.assertTrue(success)
+        self.assertEqual(state.payload.orcabus_id, state2.payload.orcabus_id)
+        self.assertEqual(
+            State.objects.get(status="RUNNING").payload_id, state.payload.orcabus_id
+        )
+        self.assertEqual(Payload.objects.count(), 1)
+        self.assertEqual(State.objects.count(), 2)
+
+    def test_update_workflow_run_to_new_state_redelivered(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_update_workflow_run_to_new_state_redelivered
+        """
+        _ = WorkflowFactory()
+        self.load_mock_wru_min()
+        self.mock_wru_min.timestamp = timezone.now()
+        wfl_persisted_in_db = workflow_run.get_workflow(self.mock_wru_min)
+        wfr = workflow_run.create_or_get_workflow_run(
+            self.mock_wru_min, wfl_persisted_in_db
+        )
+
+        success, _ = workflow_run.update_workflow_run_to_new_state(
+            self.mock_wru_min, wfr
+        )
+        self.assertTrue(success)
+
+        # a redelivered DRAFT (same status and timestamp) is ignored instead of failing on the unique constraint
+        success, _ = workflow_run.update_workflow_run_to_new_state(
+            self.mock_wru_min, wfr
+        )
+        self.assertFalse(success)
+        self.assertEqual(State.objects.count(), 1)
+
     def test_map_workflow_run_new_state_to_wrsc(self):
         """
         python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_map_workflow_run_new_state_to_wrsc
@@ -639,6 +777,53 @@ class WorkflowRunSrvUnitTests(WorkflowManagerProcUnitTestCase):
 
         self.assertIsNotNone(validated_out_wrsc)
 
+    def test_map_workflow_run_new_state_to_wrsc_payload_by_reference(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_map_workflow_run_new_state_to_wrsc_payload_by_reference
+        """
+        _ = WorkflowFactory()
+        self.load_mock_wru_max()
+        wfl_persisted_in_db = workflow_run.get_workflow(self.mock_wru_max)
+        wfr_persisted_in_db = workflow_run.create_or_get_workflow_run(
+            self.mock_wru_max, wfl_persisted_in_db
+        )
+        _, new_state = workflow_run.update_workflow_run_to_new_state(
+            self.mock_wru_max, wfr_persisted_in_db
+        )
+
+        with sql_budget("test", report=False) as b:
+            inlined = workflow_run.map_workflow_run_new_state_to_wrsc(
+                wfr_persisted_in_db, new_state
+            )
+            # the payload data alone would fit, but not the whole event
+            data_size = len(canonical_json(self.mock_wru_max.payload.data))
+            self.assertEqual(new_state.payload.data_json_size, data_size)
+            with (
+                mock.patch.object(workflow_run, "WRSC_MAX_BYTES", data_size + 10),
+                mock.patch.object(workflow_run, "canonical_json") as serialise,
+            ):
+                referenced = workflow_run.map_workflow_run_new_state_to_wrsc(
+                    wfr_persisted_in_db, new_state
+                )
+            # sized from the JSON produced for the refId, not serialised again
+            serialise.assert_not_called()
+
+        self.assertEqual(inlined.payload.data, self.mock_wru_max.payload.data)
+        self.assertIsNone(referenced.payload.data)
+        self.assertEqual(referenced.payload.refId, inlined.payload.refId)
+        # the same event, whether the payload is inlined or not
+        self.assertEqual(referenced.id, inlined.id)
+        self.assertEqual(
+            b.counts, {"wrscPayloadInlined": 1, "wrscPayloadReferenced": 1}
+        )
+
+        # sent without data (rather than null data)
+        emit_model_event("FooBus", referenced)
+        entry = self.mock_boto3.put_events.call_args.kwargs["Entries"][0]
+        detail = json.loads(entry["Detail"])
+        self.assertNotIn("data", detail["payload"])
+        self.assertEqual(detail["payload"]["refId"], inlined.payload.refId)
+
     def test_get_wrsc_hash(self):
         """
         python manage.py test workflow_manager_proc.tests.test_workflow_run.WorkflowRunSrvUnitTests.test_get_wrsc_hash
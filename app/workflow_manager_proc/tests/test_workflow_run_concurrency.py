@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from workflow_manager.models import (
+    WorkflowRun,
+    State,
+    LibraryAssociation,
+)
+from workflow_manager.models.utils import (
+    get_workflow_run_lock_key,
+    lock_workflow_run,
+)
+from workflow_manager.tests.factories import WorkflowFactory
+from workflow_manager_proc.domain.event import wru
+from workflow_manager_proc.services import workflow_run, reference_cache
+
+
+def fire_concurrently(func, args_list: list) -> list:
+    """
+    Call `func` once per entry of `args_list`, each in its own thread (and thus its own DB connection).
+    All threads are released at the same time to maximise contention.
+    Returns the exceptions raised by the individual calls (None for calls that succeeded).
+    """
+    barrier = threading.Barrier(len(args_list))
+    errors = [None] * len(args_list)
+
+    def worker(idx, args):
+        try:
+            barrier.wait()
+            func(*args)
+        except Exception as e:
+            errors[idx] = e
+        finally:
+            # each thread opened its own connection, which would otherwise block the test DB teardown
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(i, args))
+        for i, args in enumerate(args_list)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return errors
+
+
+class WorkflowRunConcurrencyTests(TransactionTestCase):
+    """
+    Fires parallel WRU events at a single workflow run. This needs real transactions (and committed data),
+    so it can't be a regular (transaction wrapped) TestCase.
+
+    python manage.py test workflow_manager_proc.tests.test_workflow_run_concurrency
+    """
+
+    parallelism = 8
+
+    def setUp(self) -> None:
+        self.env_mock = mock.patch.dict(os.environ, {"EVENT_BUS_NAME": "FooBus"})
+        self.env_mock.start()
+        self.emit_mock = mock.patch.object(workflow_run, "emit_model_event")
+        self.mock_emit_event = self.emit_mock.start()
+        # data is committed here, don't let cached records leak from one test into the next
+        reference_cache.clear()
+        WorkflowFactory()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.emit_mock.stop()
+        self.env_mock.stop()
+        super().tearDown()
+
+    @staticmethod
+    def _make_event(status: str, timestamp) -> wru.WorkflowRunUpdate:
+        abs_file_path = os.path.join(os.path.dirname(__file__), "fixtures/WRU_min.json")
+        with open(abs_file_path) as f:
+            event = wru.AWSEvent.model_validate(json.load(f)).detail
+        event.status = status
+        event.timestamp = timestamp
+        return event
+
+    def test_parallel_duplicate_drafts(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run_concurrency.WorkflowRunConcurrencyTests.test_parallel_duplicate_drafts
+        """
+        ts = timezone.now()
+        events = [(self._make_event("DRAFT", ts),) for _ in range(self.parallelism)]
+
+        errors = fire_concurrently(workflow_run.create_workflow_run, events)
+
+        self.assertEqual([e for e in errors if e], [])
+        self.assertEqual(WorkflowRun.objects.count(), 1)
+        self.assertEqual(State.objects.count(), 1)
+        # the libraries are only linked once, by whoever created the run
+        self.assertEqual(LibraryAssociation.objects.count(), 2)
+        self.assertEqual(self.mock_emit_event.call_count, 1)
+
+    def test_parallel_competing_terminal_states(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run_concurrency.WorkflowRunConcurrencyTests.test_parallel_competing_terminal_states
+        """
+        ts = timezone.now()
+        workflow_run.create_workflow_run(self._make_event("DRAFT", ts))
+        workflow_run.create_workflow_run(
+            self._make_event("READY", ts + timedelta(seconds=1))
+        )
+        workflow_run.create_workflow_run(
+            self._make_event("RUNNING", ts + timedelta(seconds=2))
+        )
+
+        terminal_ts = ts + timedelta(seconds=3)
+        statuses = ["SUCCEEDED", "FAILED", "ABORTED"] * 3
+        events = [(self._make_event(s, terminal_ts),) for s in statuses]
+
+        errors = fire_concurrently(workflow_run.create_workflow_run, events)
+
+        self.assertEqual([e for e in errors if e], [])
+        self.assertEqual(WorkflowRun.objects.count(), 1)
+
+        history = list(
+            State.objects.order_by("timestamp", "orcabus_id").values_list(
+                "status", flat=True
+            )
+        )
+        # exactly one terminal state wins, all others are rejected as the run is already complete
+        self.assertEqual(history[:3], ["DRAFT", "READY", "RUNNING"])
+        self.assertEqual(len(history), 4)
+        self.assertIn(history[3], ["SUCCEEDED", "FAILED", "ABORTED"])
+        self.assertEqual(self.mock_emit_event.call_count, 4)
+
+    def test_lock_requires_atomic_block(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run_concurrency.WorkflowRunConcurrencyTests.test_lock_requires_atomic_block
+        """
+        from django.db.transaction import TransactionManagementError
+
+        with self.assertRaises(TransactionManagementError):
+            lock_workflow_run("202405012397gatc")
+
+    def test_lock_key(self):
+        """
+        python manage.py test workflow_manager_proc.tests.test_workflow_run_concurrency.WorkflowRunConcurrencyTests.test_lock_key
+        """
+        key = get_workflow_run_lock_key("202405012397gatc")
+        self.assertEqual(key, get_workflow_run_lock_key("202405012397gatc"))
+        self.assertNotEqual(key, get_workflow_run_lock_key("202405012397gatd"))
+        # must fit into a Postgres bigint
+        self.assertTrue(-(2**63) <= key < 2**63)
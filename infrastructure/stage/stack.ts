@@ -202,6 +202,13 @@ export class WorkflowManagerStack extends GitStack {
       index: 'workflow_manager_proc/lambdas/handle_wru_event.py',
       handler: 'handler',
       timeout: Duration.seconds(28),
+      environment: {
+        ...this.lambdaEnv,
+        // lean settings profile without the API stack, see settings/proc.py
+        DJANGO_SETTINGS_MODULE: 'workflow_manager.settings.proc',
+        // load the reference data (workflows, analyses, contexts) at init, see reference_cache.warm_up
+        REFERENCE_WARM_UP: 'true',
+      },
     });
 
     this.mainBus.grantPutEventsTo(procFn);
@@ -225,6 +232,13 @@ export class WorkflowManagerStack extends GitStack {
       index: 'workflow_manager_proc/lambdas/handle_aru_event.py',
       handler: 'handler',
       timeout: Duration.seconds(28),
+      environment: {
+        ...this.lambdaEnv,
+        // lean settings profile without the API stack, see settings/proc.py
+        DJANGO_SETTINGS_MODULE: 'workflow_manager.settings.proc',
+        // load the reference data (workflows, analyses, contexts) at init, see reference_cache.warm_up
+        REFERENCE_WARM_UP: 'true',
+      },
     });
 
     this.mainBus.grantPutEventsTo(procFn);